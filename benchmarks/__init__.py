@@ -0,0 +1,3 @@
+"""
+Benchmarks for curses_fzf, run them with ``python -m benchmarks``.
+"""
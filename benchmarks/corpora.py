@@ -0,0 +1,112 @@
+"""
+Deterministic synthetic corpora for the benchmarks.
+The same size and seed always generate the same items, so runs on different
+versions or machines score exactly the same strings.
+"""
+import random
+from typing import Any, Callable, Dict, List, NamedTuple
+
+SEED = 20260308
+
+_DIRS = [
+    "src", "lib", "tests", "docs", "build", "vendor", "scripts", "config", "assets", "tools",
+    "core", "utils", "api", "models", "views", "handlers", "internal", "cmd", "pkg", "web",
+]
+_NAMES = [
+    "main", "index", "utils", "helpers", "config", "settings", "server", "client", "parser",
+    "scoring", "render", "cache", "engine", "worker", "loader", "reader", "writer", "test_api",
+    "fuzzyfinder", "candidates", "README", "CHANGELOG", "setup", "schema", "routes", "models",
+]
+_EXTENSIONS = [".py", ".rs", ".go", ".js", ".ts", ".md", ".txt", ".yaml", ".json", ".toml", ".c", ".h"]
+_LEVELS = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+_SERVICES = ["api-gateway", "auth", "billing", "scheduler", "search", "storage", "mailer", "worker"]
+_MESSAGES = [
+    "request completed in {n}ms",
+    "connection to {host} timed out after {n}s",
+    "user {n} logged in from {host}",
+    "cache miss for key session:{n}",
+    "retrying job {n} (attempt 3 of 5)",
+    "failed to parse payload from {host}: unexpected token",
+    "scheduled task cleanup finished, removed {n} files",
+    "slow query on table orders took {n}ms",
+]
+_MEALS = [
+    "apple pie", "banana split", "beef stroganoff", "vegetable stir-fry", "chicken curry",
+    "caesar salad", "mushroom risotto", "fish and chips", "pancakes", "tomato soup",
+    "lentil stew", "cheese burger", "sushi platter", "pad thai", "greek yogurt",
+]
+_ADJECTIVES = ["spicy", "classic", "vegan", "homemade", "grilled", "crispy", "smoked", "fresh"]
+_TAGS = ["sweet", "fruit", "cold", "savory", "meat", "vegetarian", "spicy", "hot", "healthy", "fish"]
+
+
+def file_paths(size: int, seed: int = SEED) -> List[str]:
+    """
+    File paths like the output of ``find`` in a source tree.
+    """
+    rng = random.Random(seed)
+    items = []
+    for _ in range(size):
+        depth = rng.randint(1, 5)
+        parts = [rng.choice(_DIRS) for _ in range(depth)]
+        items.append("/".join(parts) + "/" + rng.choice(_NAMES) + rng.choice(_EXTENSIONS))
+    return items
+
+
+def log_lines(size: int, seed: int = SEED) -> List[str]:
+    """
+    Application log lines with timestamp, level, service and message.
+    """
+    rng = random.Random(seed)
+    items = []
+    for i in range(size):
+        message = rng.choice(_MESSAGES).format(
+            n=rng.randint(1, 99999), host=f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}")
+        items.append(
+            f"2026-03-{1 + i * 28 // max(size, 1):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+            f"{rng.randint(0, 59):02d} {rng.choice(_LEVELS)} [{rng.choice(_SERVICES)}] {message}")
+    return items
+
+
+def records(size: int, seed: int = SEED) -> List[Dict[str, Any]]:
+    """
+    Dict records like the meals in ``examples/data_dict.yaml``.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "available": rng.random() < 0.8,
+            "calories": rng.randint(80, 1200),
+            "id": i + 1,
+            "name": f"{rng.choice(_ADJECTIVES)} {rng.choice(_MEALS)}",
+            "price": round(rng.uniform(1, 30), 2),
+            "tags": rng.sample(_TAGS, rng.randint(1, 3)),
+        }
+        for i in range(size)
+    ]
+
+
+def display_record(item: Dict[str, Any]) -> str:
+    """
+    The display function for :func:`records`.
+    """
+    return f"{item['id']:>7} {item['name']} ({', '.join(item['tags'])}) {item['price']:.2f}"
+
+
+class Corpus(NamedTuple):
+    """
+    A corpus generator, the display function for its items and the queries
+    typed (one keystroke per character) on it.
+    """
+    generate: Callable[[int], List[Any]]
+    display: Callable[[Any], str]
+    queries: List[str]
+
+
+CORPORA: Dict[str, Corpus] = {
+    "paths": Corpus(file_paths, str, ["src/scoring.py", "tstapi"]),
+    "logs": Corpus(log_lines, str, ["error timed out", "slwqry"]),
+    "records": Corpus(records, display_record, ["spicy curry", "vgnpd"]),
+}
+"""
+The available corpora by name.
+"""
@@ -0,0 +1,147 @@
+"""
+Time the scoring functions and :meth:`~curses_fzf.FuzzyFinder.calculate_filtered`
+on the synthetic corpora, keystroke by keystroke, and report the latency
+percentiles as JSON.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from curses_fzf import FuzzyFinder, __version__, scoring_full_words, scoring_fzf
+
+from .corpora import CORPORA, SEED
+
+DEFAULT_SIZES = [10000, 100000]
+
+
+def keystrokes(query: str) -> List[str]:
+    """
+    The queries seen while typing the given query, one per keystroke.
+    """
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def percentile(ordered: Sequence[float], p: float) -> float:
+    """
+    The ``p``-th percentile (nearest rank) of the sorted samples.
+    """
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    The latency statistics of the samples, in milliseconds.
+    """
+    ordered = sorted(samples)
+    return {
+        "samples": len(ordered),
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def bench_score_function(score: Callable[[str, str], Any], candidates: List[str], query: str) -> List[float]:
+    """
+    Time scoring all candidates with the score function once per keystroke.
+    """
+    samples = []
+    for typed in keystrokes(query):
+        start = time.perf_counter()
+        for candidate in candidates:
+            score(typed, candidate)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_calculate_filtered(items: List[Any], display: Callable[[Any], str], query: str) -> List[float]:
+    """
+    Time :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` once per keystroke,
+    like the main loop does while the query is typed.
+    """
+    fzf = FuzzyFinder(display=display)
+    fzf.all_items = items
+    # the initial list shown before the first keystroke is not timed
+    fzf.calculate_filtered()
+    samples = []
+    for char in query:
+        fzf.kb_add_to_query_cursor(char)
+        start = time.perf_counter()
+        fzf.calculate_filtered()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+BENCHMARKS = ["scoring_fzf", "scoring_full_words", "calculate_filtered"]
+
+
+def run(corpora: List[str], sizes: List[int], benchmarks: List[str], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Run the benchmarks, returns one result per benchmark, corpus, size and query.
+    """
+    results = []
+    for name in corpora:
+        corpus = CORPORA[name]
+        for size in sizes:
+            items = corpus.generate(size)
+            # plain strings and the public API only, so the script runs against older releases too
+            candidates = [corpus.display(item) for item in items]
+            for query in corpus.queries:
+                for benchmark in benchmarks:
+                    samples: List[float] = []
+                    for _ in range(repeat):
+                        if benchmark == "scoring_fzf":
+                            samples += bench_score_function(scoring_fzf, candidates, query)
+                        elif benchmark == "scoring_full_words":
+                            samples += bench_score_function(scoring_full_words, candidates, query)
+                        else:
+                            samples += bench_calculate_filtered(items, corpus.display, query)
+                    result = {"benchmark": benchmark, "corpus": name, "size": size, "query": query}
+                    result.update(summarize(samples))
+                    results.append(result)
+                    print(f"{benchmark:>20} {name:>8} {size:>8} {query!r:>20} "
+                          f"p50 {result['p50_ms']:9.2f}ms  p99 {result['p99_ms']:9.2f}ms", file=sys.stderr)
+    return results
+
+
+def _csv(value: str) -> List[str]:
+    return [part for part in value.split(",") if part]
+
+
+def main(argv: Any = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpora", type=_csv, default=list(CORPORA),
+                        help=f"comma separated corpora (default: {','.join(CORPORA)})")
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in _csv(value)], default=DEFAULT_SIZES,
+                        help="comma separated corpus sizes, e.g. 10000,100000,1000000 "
+                             f"(default: {','.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--benchmarks", type=_csv, default=BENCHMARKS,
+                        help=f"comma separated benchmarks (default: {','.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=1, help="typed query repetitions (default: 1)")
+    parser.add_argument("--output", "-o", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.corpora if name not in CORPORA] + \
+        [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown corpora or benchmarks: {', '.join(unknown)}")
+    report = {
+        "curses_fzf": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "seed": SEED,
+        "results": run(args.corpora, args.sizes, args.benchmarks, args.repeat),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
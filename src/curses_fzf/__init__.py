@@ -1,8 +1,10 @@
 from .__about__ import __version__
 from .colors import Color, ColorTheme
+from .engines import ScoringEngine, NumpyEngine, ProcessPoolEngine
 from .errors import CursesFzfException, CursesFzfAborted, CursesFzfAssertion, CursesFzfIndexOutOfBounds
 from .fuzzyfinder import FuzzyFinder
-from .scoring import ScoringResult, scoring_fzf, scoring_full_words
+from .scoring import ScoringResult, scoring_extended, scoring_fzf, scoring_fzf_v2, scoring_full_words
+from .store import StringStore
 
 __all__ = [
     "__version__",
@@ -13,7 +15,13 @@ __all__ = [
     "CursesFzfAssertion",
     "CursesFzfIndexOutOfBounds",
     "FuzzyFinder",
+    "NumpyEngine",
+    "ProcessPoolEngine",
+    "ScoringEngine",
     "ScoringResult",
+    "StringStore",
+    "scoring_extended",
     "scoring_fzf",
+    "scoring_fzf_v2",
     "scoring_full_words",
 ]
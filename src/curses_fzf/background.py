@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import threading
+from io import IOBase
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+Cancelled = Callable[[], bool]
+Publish = Callable[[Any], None]
+Job = Callable[[Cancelled, Publish], Any]
+
+
+class BackgroundWorker:
+    """
+    Runs jobs on a daemon thread, one at a time.
+    Submitting a new job cancels the job in flight, which is expected to check
+    its ``cancelled()`` callback regularly and return early.
+
+    A job is called as ``job(cancelled, publish)``.
+    It can ``publish(value)`` partial results while it runs, its return value is
+    the final result.
+    Results (and exceptions) of cancelled jobs are discarded.
+    """
+
+    def __init__(self, name: str = "curses-fzf-worker") -> None:
+        self.name: str = name
+        self._condition = threading.Condition()
+        self._generation: int = 0
+        self._job: Optional[Tuple[int, Job]] = None
+        self._result: Optional[Tuple[int, bool, Any, Optional[BaseException]]] = None
+        self._busy_generation: int = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed: bool = False
+
+    @property
+    def running(self) -> bool:
+        """
+        ``True`` until the final result of the latest submitted job was read
+        by :meth:`~BackgroundWorker.poll`.
+        """
+        with self._condition:
+            return self._busy_generation == self._generation and self._generation > 0
+
+    def submit(self, job: Job) -> None:
+        """
+        Run the given job, cancelling the job in flight (if any).
+        """
+        with self._condition:
+            self._generation += 1
+            self._busy_generation = self._generation
+            self._job = (self._generation, job)
+            self._result = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        """
+        Cancel the job in flight (if any), its results are discarded.
+        """
+        with self._condition:
+            self._generation += 1
+            self._busy_generation = 0
+            self._job = None
+            self._result = None
+
+    def poll(self) -> Optional[Tuple[bool, Any]]:
+        """
+        Get the newest unread result of the latest job as ``(final, value)``,
+        ``None`` if there is no new result.
+        Exceptions raised by the job are re-raised here.
+        """
+        with self._condition:
+            if self._result is None or self._result[0] != self._generation:
+                return None
+            _, final, value, error = self._result
+            self._result = None
+            if final:
+                self._busy_generation = 0
+        if error is not None:
+            raise error
+        return final, value
+
+    def close(self) -> None:
+        """
+        Cancel the job in flight and stop the thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._generation += 1
+            self._job = None
+            self._condition.notify()
+
+    def _store(self, generation: int, final: bool, value: Any, error: Optional[BaseException] = None) -> None:
+        with self._condition:
+            if generation == self._generation:
+                self._result = (generation, final, value, error)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._job is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                generation, job = self._job  # type: ignore[misc]
+                self._job = None
+
+            def cancelled(generation: int = generation) -> bool:
+                return generation != self._generation
+
+            def publish(value: Any, generation: int = generation) -> None:
+                self._store(generation, False, value)
+            try:
+                value = job(cancelled, publish)
+            except BaseException as e:  # noqa: B036
+                self._store(generation, True, None, e)
+            else:
+                self._store(generation, True, value)
+
+
+class ItemReader:
+    """
+    Consumes an iterable of items on a daemon thread and appends them to the
+    given list, so :class:`~curses_fzf.FuzzyFinder` can show and filter the
+    items that arrived so far, while the producer is still running.
+
+    Args:
+        iterable (Iterable[Any]): The items to consume, e.g. a generator or an
+            open file (whose lines are stripped of their line endings).
+        items (List[Any]): The list to append the items to.
+    """
+
+    def __init__(self, iterable: Iterable[Any], items: List[Any]) -> None:
+        if isinstance(iterable, IOBase):
+            iterable = _file_lines(iterable)
+        self.items: List[Any] = items
+        self.error: Optional[BaseException] = None
+        """
+        The exception raised by the iterable, if any.
+        """
+        self._iterable: Iterable[Any] = iterable
+        self._done = threading.Event()
+        self._stopped: bool = False
+        self._thread = threading.Thread(target=self._run, name="curses-fzf-reader", daemon=True)
+        self._thread.start()
+
+    @property
+    def done(self) -> bool:
+        """
+        ``True`` once the iterable is exhausted (or raised an exception).
+        """
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the iterable is exhausted, returns :attr:`~ItemReader.done`.
+        """
+        return self._done.wait(timeout)
+
+    def stop(self) -> None:
+        """
+        Stop appending items, the thread ends after the next item arrived.
+        """
+        self._stopped = True
+
+    def _run(self) -> None:
+        try:
+            for item in self._iterable:
+                if self._stopped:
+                    break
+                self.items.append(item)
+        except BaseException as e:  # noqa: B036
+            self.error = e
+        finally:
+            self._done.set()
+
+
+def _file_lines(file: IOBase) -> Iterator[str]:
+    """
+    The lines of a text or binary file without line endings.
+    """
+    for line in file:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        yield line.rstrip("\r\n")
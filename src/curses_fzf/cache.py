@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A least recently used cache, bounded by the total weight of its values
+    instead of their number, e.g. the number of matches of cached query results.
+
+    Values heavier than ``max_weight`` are not cached at all, a ``max_weight``
+    of ``0`` disables the cache.
+
+    Args:
+        max_weight (int): The maximum total weight of all cached values.
+        weigh (Callable[[V], int]): The function to get the weight of a value.
+            Default is ``1`` for every value.
+    """
+
+    def __init__(self, max_weight: int, weigh: Callable[[V], int] = lambda value: 1) -> None:
+        self.max_weight: int = max_weight
+        self.weigh: Callable[[V], int] = weigh
+        self.weight: int = 0
+        """
+        The total weight of all cached values.
+        """
+        self.hits: int = 0
+        """
+        The number of :meth:`~LRUCache.get` calls that found a value.
+        """
+        self.misses: int = 0
+        """
+        The number of :meth:`~LRUCache.get` calls that found no value.
+        """
+        self._entries: OrderedDict[K, Tuple[V, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Get the value cached for the given key and mark it as recently used.
+
+        Returns:
+            Optional[V]: The cached value, ``None`` if there is none.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Cache the value for the given key, evicting the least recently used
+        values until the total weight fits.
+        """
+        self.discard(key)
+        weight = self.weigh(value)
+        if weight > self.max_weight:
+            return
+        self._entries[key] = (value, weight)
+        self.weight += weight
+        while self.weight > self.max_weight:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.weight -= evicted
+
+    def discard(self, key: K) -> None:
+        """
+        Remove the value cached for the given key, if any.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[1]
+
+    def clear(self) -> None:
+        """
+        Remove all cached values, the hit and miss counters are kept.
+        """
+        self._entries.clear()
+        self.weight = 0
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Set, Union, overload
+
+RE_WORD = re.compile(r"\S+")
+
+SEPARATORS: Set[str] = set(" \t/\\_-.:;|,()[]{}<>\"'`")
+"""
+A set of characters that commonly indicate "word boundaries" in generic text
+and paths.
+Those are chosen similarly to fzf's original heuristics.
+"""
+
+MASK_CHUNK_SIZE: int = 1024
+"""
+The number of consecutive candidates that share an OR-ed character mask in
+:class:`CandidateIndex`, so chunks without a query character can be skipped at once.
+"""
+
+_char_bits: Dict[str, int] = {}
+
+
+def _char_bit(char: str) -> int:
+    """
+    The bit of a character in a 64 bit character mask: one bit per lowercase
+    letter and digit, all other characters share the remaining bits.
+    Whitespace has no bit.
+    """
+    code = ord(char)
+    if char.isspace():
+        bit = 0
+    elif 97 <= code <= 122:  # a-z
+        bit = 1 << (code - 97)
+    elif 48 <= code <= 57:  # 0-9
+        bit = 1 << (code - 22)
+    else:
+        bit = 1 << (36 + code % 28)
+    _char_bits[char] = bit
+    return bit
+
+
+def char_mask(text: str) -> int:
+    """
+    A bitmask of the characters in the given (lowercase) text, whitespace is ignored.
+    If a text contains all characters of another text, its mask contains all
+    bits of the other mask, so ``mask & query_mask != query_mask`` proves a
+    candidate can't match.
+    """
+    mask = 0
+    bits = _char_bits
+    for char in set(text):
+        bit = bits.get(char)
+        mask |= _char_bit(char) if bit is None else bit
+    return mask
+
+
+def _is_boundary(text: str, position: int, separators: Set[str] = SEPARATORS) -> bool:
+    """
+    Check if the given position in text is a boundary,
+    see :meth:`~curses_fzf.ScoringResult.is_boundary`.
+    """
+    if position <= 0:
+        return True
+    prev = text[position - 1]
+    cur = text[position]
+    if prev in separators:
+        return True
+    if prev.islower() and cur.isupper():
+        return True
+    if prev.isalpha() and cur.isdigit():
+        return True
+    if prev.isdigit() and cur.isalpha():
+        return True
+    return False
+
+
+class Candidate(str):
+    """
+    A :meth:`~curses_fzf.FuzzyFinder.display` string as passed to the
+    :meth:`~curses_fzf.FuzzyFinder.score` function.
+
+    Since it is a :py:obj:`str`, it can be passed to any scoring function.
+    It has no ``__dict__``, so it costs no more memory than a plain string.
+    Its lowercase form and word split are not stored, they are computed and
+    cached per match by :class:`~curses_fzf.ScoringResult`.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (Candidate, (str(self),))
+
+
+class CandidateIndex:
+    """
+    The :class:`Candidate` of each item in a list of items, built once per
+    :meth:`~curses_fzf.FuzzyFinder.find` call, so :meth:`~curses_fzf.FuzzyFinder.display`
+    is called only once per item.
+
+    Items appended to the list are added on the next :meth:`~CandidateIndex.sync`,
+    any other change of the list requires a new index.
+
+    The character masks used by :meth:`~CandidateIndex.prefilter` are computed
+    on the first prefiltered scan.
+
+    If ``retain`` is ``False`` (e.g. for a compact
+    :class:`~curses_fzf.store.StringStore`), only the masks are kept and the
+    candidates are created from the items each time they are accessed, trading
+    :meth:`~curses_fzf.FuzzyFinder.display` calls for memory.
+
+    Args:
+        items (Sequence[Any]): The items to index.
+        display (Callable[[Any], str]): The function to convert an item to its
+            display string.
+        retain (bool): Whether to keep the candidates.
+            Default is ``True``.
+    """
+
+    def __init__(self, items: Sequence[Any], display: Callable[[Any], str], retain: bool = True) -> None:
+        self.items: Sequence[Any] = items
+        self.display: Callable[[Any], str] = display
+        self.retain: bool = retain
+        self.candidates: Union[List[Candidate], _CandidateView] = [] if retain else _CandidateView(self)
+        self.masks: array[int] = array("Q")
+        """
+        The :func:`char_mask` of each lowercase candidate (once computed).
+        """
+        self.chunk_masks: List[int] = []
+        """
+        The OR-ed :attr:`~CandidateIndex.masks` of every :data:`MASK_CHUNK_SIZE` candidates.
+        """
+        self._size: int = 0
+        self.sync()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> Candidate:
+        return self.candidates[index]
+
+    def is_valid_for(self, items: Sequence[Any], display: Callable[[Any], str]) -> bool:
+        """
+        Check if this index can be (extended and) used for the given items and
+        display function.
+        """
+        return items is self.items and display is self.display and \
+            len(items) >= self._size
+
+    def sync(self) -> None:
+        """
+        Add the candidates of all items appended since the last call.
+        """
+        if not self.retain:
+            self._size = len(self.items)
+            return
+        display = self.display
+        candidates: List[Candidate] = self.candidates  # type: ignore[assignment]
+        candidates.extend(Candidate(display(item)) for item in self.items[len(candidates):])
+        self._size = len(candidates)
+
+    def sync_masks(self) -> None:
+        """
+        Compute the masks of all candidates added since the last call.
+        """
+        start = len(self.masks)
+        if start == self._size:
+            return
+        candidates = self.candidates
+        self.masks.extend(char_mask(candidates[index].lower()) for index in range(start, self._size))
+        masks = self.masks
+        # the last chunk may have been incomplete
+        del self.chunk_masks[start // MASK_CHUNK_SIZE:]
+        for chunk_start in range(len(self.chunk_masks) * MASK_CHUNK_SIZE, len(masks), MASK_CHUNK_SIZE):
+            chunk_mask = 0
+            for mask in masks[chunk_start:chunk_start + MASK_CHUNK_SIZE]:
+                chunk_mask |= mask
+            self.chunk_masks.append(chunk_mask)
+
+    def prefilter(self, query_mask: int, indices: Sequence[int]) -> Iterable[int]:
+        """
+        Drop the indices of candidates that don't contain all characters of the
+        query's :func:`char_mask`, skipping whole chunks of candidates if possible.
+
+        Args:
+            query_mask (int): The :func:`char_mask` of the lowercase query.
+            indices (Sequence[int]): The indices of the candidates to check,
+                in ascending order.
+
+        Returns:
+            Iterable[int]: The remaining indices in ascending order.
+        """
+        if not query_mask:
+            return indices
+        self.sync_masks()
+        if isinstance(indices, range) and indices.step == 1:
+            return self._prefilter_range(query_mask, indices)
+        masks = self.masks
+        return (index for index in indices if masks[index] & query_mask == query_mask)
+
+    def _prefilter_range(self, query_mask: int, indices: range) -> Iterator[int]:
+        masks = self.masks
+        chunk_masks = self.chunk_masks
+        for chunk in range(indices.start // MASK_CHUNK_SIZE, (indices.stop - 1) // MASK_CHUNK_SIZE + 1):
+            if chunk_masks[chunk] & query_mask != query_mask:
+                continue
+            chunk_start = chunk * MASK_CHUNK_SIZE
+            for index in range(max(indices.start, chunk_start), min(indices.stop, chunk_start + MASK_CHUNK_SIZE)):
+                if masks[index] & query_mask == query_mask:
+                    yield index
+
+
+class _CandidateView(Sequence):  # type: ignore[type-arg]
+    """
+    The :attr:`CandidateIndex.candidates` of a non-retaining index: each access
+    creates the candidate from the item.
+    """
+
+    def __init__(self, index: CandidateIndex) -> None:
+        self._index: CandidateIndex = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @overload
+    def __getitem__(self, index: int) -> Candidate: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Candidate]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        size = self._index._size
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("candidate index out of range")
+        return Candidate(self._index.display(self._index.items[index]))
@@ -0,0 +1,105 @@
+"""
+Select lines of a file or of stdin with :class:`~curses_fzf.FuzzyFinder` and
+print the selection to stdout.
+"""
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+from .__about__ import __version__
+from .errors import CursesFzfAborted
+from .fuzzyfinder import FuzzyFinder
+from .store import LineStore
+
+EXIT_NO_MATCH = 1
+EXIT_ERROR = 2
+EXIT_ABORTED = 130
+
+
+@contextmanager
+def _controlling_terminal() -> Iterator[None]:
+    """
+    Let curses use the controlling terminal, if stdin or stdout are redirected
+    (e.g. ``selected=$(find | curses-fzf)``), and restore them afterwards.
+    """
+    if os.isatty(0) and os.isatty(1):
+        yield
+        return
+    sys.stdout.flush()
+    tty = os.open("/dev/tty", os.O_RDWR)
+    saved = [os.dup(0), os.dup(1)]
+    try:
+        os.dup2(tty, 0)
+        os.dup2(tty, 1)
+        yield
+    finally:
+        os.dup2(saved[0], 0)
+        os.dup2(saved[1], 1)
+        for fd in saved + [tty]:
+            os.close(fd)
+
+
+def _print(lines: Iterable[str], print0: bool) -> int:
+    """
+    Print the lines to stdout, returns the number of printed lines.
+    """
+    end = "\0" if print0 else "\n"
+    count = 0
+    for line in lines:
+        sys.stdout.write(line + end)
+        count += 1
+    sys.stdout.flush()
+    return count
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="curses-fzf", description=__doc__)
+    parser.add_argument("file", nargs="?",
+                        help="read the items (one per line) from this file instead of stdin")
+    parser.add_argument("-m", "--multi", action="store_true", help="allow selecting multiple items")
+    parser.add_argument("-q", "--query", default="", help="start with the given query")
+    parser.add_argument("-f", "--filter", metavar="QUERY",
+                        help="print the items matching the query (best first) without the interface")
+    parser.add_argument("--print0", action="store_true", help="print the items separated by NUL instead of newline")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    The ``curses-fzf`` command.
+
+    Returns:
+        int: The exit status: ``0`` if an item was selected (or matched the
+            ``--filter`` query), ``1`` if not, ``2`` on errors and ``130`` if
+            the selection was aborted.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if args.file in (None, "-") and sys.stdin.isatty():
+        parser.error("no items, pipe them to stdin or give a file")
+    try:
+        if args.file in (None, "-"):
+            store = LineStore.from_file(sys.stdin.buffer)
+        else:
+            with open(args.file, "rb") as file:
+                store = LineStore.from_file(file)
+    except OSError as e:
+        print(f"curses-fzf: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    with store:
+        fzf = FuzzyFinder(multi=args.multi, query=args.query)
+        if args.filter is not None:
+            printed = _print((item for item, _ in fzf.filter(store, args.filter)), args.print0)
+            return 0 if printed else EXIT_NO_MATCH
+        try:
+            with _controlling_terminal():
+                selected = fzf.find(store)
+        except CursesFzfAborted:
+            return EXIT_ABORTED
+        except OSError as e:
+            print(f"curses-fzf: no terminal: {e}", file=sys.stderr)
+            return EXIT_ERROR
+    return 0 if _print(selected, args.print0) else EXIT_NO_MATCH
@@ -1,6 +1,10 @@
-import curses
 from enum import IntEnum
 
+try:
+    import curses
+except ImportError:  # pragma: no cover
+    curses = None  # type: ignore[assignment]
+
 
 class Color(IntEnum):
     """
@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+import os
+import pickle
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import accumulate, islice
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .cache import LRUCache
+from .candidates import Candidate, CandidateIndex
+from .query import CompiledQuery
+from .ranking import score_value
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+from .scoring import ScoringResult
+
+ScoreFunction = Callable[[str, str], ScoringResult]
+ENCODING = "utf-8"
+ENCODING_ERRORS = "surrogatepass"
+SCORE_BATCH_SIZE = 1024
+"""
+The number of candidates passed to a ``score_batch`` function at once.
+"""
+
+
+class ScoringEngine:
+    """
+    A scoring engine scores the candidates of :attr:`~curses_fzf.FuzzyFinder.all_items`
+    for :meth:`~curses_fzf.FuzzyFinder.calculate_filtered`.
+    Pass an engine to :class:`~curses_fzf.FuzzyFinder`'s ``engine`` parameter.
+
+    This default engine calls the :meth:`~curses_fzf.FuzzyFinder.score`
+    function for one candidate after another in the calling thread.
+    Subclasses can score in other ways, as long as they return the same matches.
+
+    If the score function has a ``score_batch(query, candidates)`` attribute,
+    it is called with a list of candidates instead and returns an iterable with
+    a :class:`~curses_fzf.ScoringResult` (or plain score) per candidate, in the
+    same order.
+    This allows the score function to prepare the query only once per batch,
+    e.g. compile a regular expression.
+    The built-in :func:`~curses_fzf.scoring_fzf` and
+    :func:`~curses_fzf.scoring_full_words` provide it.
+
+    If the score function has a truthy ``prefilter`` attribute, candidates that
+    don't contain all (non-whitespace) characters of the lowercase query are
+    skipped without calling it, see :meth:`~curses_fzf.candidates.CandidateIndex.prefilter`.
+    The built-in scoring functions provide it, custom scoring functions that only
+    match candidates containing all query characters can opt in with
+    ``my_scoring.prefilter = True``.
+
+    Engines can be used as context manager, which calls :meth:`~ScoringEngine.close`
+    on exit.
+    """
+
+    batch_size: int = 5000
+    """
+    The number of candidates passed to :meth:`~ScoringEngine.score` at once
+    when scoring in the background (see :attr:`~curses_fzf.FuzzyFinder.background_scoring`).
+    The scan can only be cancelled between batches.
+    """
+    scored: int = 0
+    """
+    The number of candidates passed to the score function by this engine.
+    """
+    rejected: int = 0
+    """
+    The number of candidates this engine rejected without calling the score
+    function (e.g. by :meth:`~curses_fzf.candidates.CandidateIndex.prefilter`).
+    """
+
+    def score(self,
+              score: ScoreFunction,
+              query: str,
+              candidates: CandidateIndex,
+              indices: Sequence[int],
+              ) -> Iterator[Tuple[int, ScoringResult]]:
+        """
+        Score the candidates at the given indices.
+
+        Args:
+            score (Callable[[str, str], ScoringResult]): The
+                :meth:`~curses_fzf.FuzzyFinder.score` function.
+            query (str): The current :attr:`~curses_fzf.FuzzyFinder.query`.
+            candidates (CandidateIndex): The candidates of all items.
+            indices (Sequence[int]): The indices of the candidates to score,
+                in ascending order.
+
+        Returns:
+            Iterator[Tuple[int, Union[ScoringResult, float]]]: The index and scoring
+                result (or plain score) of each matched candidate (score above ``0``),
+                in ascending index order.
+        """
+        remaining = candidates.prefilter(query_mask(score, query), indices)
+        if remaining is not indices:
+            remaining = list(remaining)
+        self._count(len(indices), len(remaining))
+        yield from score_indices(score, query, candidates, remaining)
+
+    def _count(self, considered: int, scored: int) -> None:
+        """
+        Update the :attr:`~ScoringEngine.scored` and :attr:`~ScoringEngine.rejected` counters.
+        """
+        self.scored += scored
+        self.rejected += considered - scored
+
+    def close(self) -> None:
+        """
+        Free all resources held by the engine.
+        """
+        pass
+
+    def __enter__(self) -> ScoringEngine:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def query_mask(score: ScoreFunction, query: str) -> int:
+    """
+    The :func:`~curses_fzf.candidates.char_mask` of the query, ``0`` (no
+    prefiltering) if the score function doesn't opt in to prefiltering.
+    """
+    if not getattr(score, "prefilter", False):
+        return 0
+    return CompiledQuery.compile(query).mask
+
+
+def score_indices(score: ScoreFunction,
+                  query: str,
+                  candidates: Any,
+                  indices: Iterable[int],
+                  ) -> Iterator[Tuple[int, ScoringResult]]:
+    """
+    Score ``candidates[index]`` for each of the indices and yield the index and
+    the scoring result of the matched candidates, using the score function's
+    ``score_batch`` attribute if it has one (see :class:`ScoringEngine`).
+    """
+    score_batch = getattr(score, "score_batch", None)
+    if score_batch is None:
+        for index in indices:
+            score_result = score(query, candidates[index])
+            if score_result > 0:
+                yield index, score_result
+        return
+    remaining = iter(indices)
+    while True:
+        batch = list(islice(remaining, SCORE_BATCH_SIZE))
+        if not batch:
+            return
+        for index, score_result in zip(batch, score_batch(query, [candidates[index] for index in batch])):
+            if score_result > 0:
+                yield index, score_result
+
+
+class _SharedCorpus:
+    """
+    Worker process view of the candidates published by :class:`ProcessPoolEngine`.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __getitem__(self, index: int) -> Candidate:
+        return Candidate(bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode(
+            ENCODING, ENCODING_ERRORS))
+
+
+_worker_corpus: Dict[str, shared_memory.SharedMemory] = {}
+"""
+The shared memory blocks a worker process is attached to (only the latest one).
+"""
+
+
+def _score_chunk(shm_name: str,
+                 count: int,
+                 score: ScoreFunction,
+                 query: str,
+                 indices: Union[range, array],
+                 mask: int = 0,
+                 ) -> Tuple[List[Tuple[int, Any]], int]:
+    """
+    Worker process function: score the candidates at the given indices of the
+    corpus published in shared memory by :class:`ProcessPoolEngine`.
+    Returns the matches with their plain score (sending the scoring results
+    back would pickle them just to drop them) and the number of candidates
+    passed to the score function.
+    """
+    shm = _worker_corpus.get(shm_name)
+    if shm is None:
+        for old in _worker_corpus.values():
+            old.close()
+        _worker_corpus.clear()
+        # the workers share the parent's resource tracker, which already tracks
+        # the block, so attaching doesn't need any special treatment
+        shm = _worker_corpus[shm_name] = shared_memory.SharedMemory(name=shm_name)
+    offsets = shm.buf[:(count + 1) * 8].cast("Q")
+    masks = shm.buf[(count + 1) * 8:(2 * count + 1) * 8].cast("Q")
+    data = shm.buf[(2 * count + 1) * 8:]
+    try:
+        remaining = [index for index in indices if masks[index] & mask == mask] if mask else indices
+        matches = [(index, score_value(score_result))
+                   for index, score_result in score_indices(score, query, _SharedCorpus(offsets, data), remaining)]
+    finally:
+        offsets.release()
+        masks.release()
+        data.release()
+    return matches, len(remaining)
+
+
+class ProcessPoolEngine(ScoringEngine):
+    """
+    A :class:`ScoringEngine` that splits the candidates into chunks and scores
+    them in parallel worker processes.
+
+    The display strings of all items are published once per
+    :meth:`~curses_fzf.FuzzyFinder.find` call into a
+    :py:obj:`multiprocessing.shared_memory` block (UTF-8 encoded with an offset
+    table and the candidates' character masks), so only the query and the
+    indices to score are sent to the workers on each keystroke.
+    The chunk results are concatenated in chunk order, so the matches keep
+    their stable order for ranking.
+    The workers return the plain score of each match, not its scoring result.
+
+    The :meth:`~curses_fzf.FuzzyFinder.score` function must be picklable
+    (a module level function like :func:`~curses_fzf.scoring_fzf`),
+    otherwise the engine falls back to scoring in the calling thread.
+    Call :meth:`~ProcessPoolEngine.close` (or use the engine as context
+    manager) to shut down the workers and free the shared memory.
+
+    Args:
+        workers (Optional[int]): The number of worker processes.
+            Default is ``None`` (the number of CPUs).
+        chunk_size (int): The number of candidates scored per worker task.
+            Default is ``20000``.
+        min_items (int): Below this number of candidates to score, they are
+            scored in the calling thread, since the workers' overhead wouldn't pay off.
+            Default is ``50000``.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 chunk_size: int = 20000,
+                 min_items: int = 50000,
+                 ) -> None:
+        self.workers: Optional[int] = workers
+        self.chunk_size: int = max(1, chunk_size)
+        self.min_items: int = min_items
+        # keep all workers busy per batch when scoring in the background
+        self.batch_size = max(min_items, self.chunk_size * (workers or os.cpu_count() or 1))
+        self._executor: Optional[Executor] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._published: Optional[Tuple[CandidateIndex, int]] = None
+        self._picklable: Dict[Any, bool] = {}
+
+    def _is_picklable(self, score: ScoreFunction) -> bool:
+        """
+        Check (once per function) if the score function can be sent to the workers.
+        """
+        if score not in self._picklable:
+            try:
+                pickle.dumps(score)
+                self._picklable[score] = True
+            except Exception:
+                self._picklable[score] = False
+        return self._picklable[score]
+
+    def _publish(self, candidates: CandidateIndex) -> str:
+        """
+        Copy the candidates to shared memory, if they changed since the last call.
+        """
+        count = len(candidates)
+        if self._shm is None or self._published is None or \
+                self._published[0] is not candidates or self._published[1] != count:
+            encoded = [c.encode(ENCODING, ENCODING_ERRORS) for c in candidates.candidates]
+            offsets = array("Q", accumulate((len(e) for e in encoded), initial=0))
+            data = b"".join(encoded)
+            candidates.sync_masks()
+            header = offsets.tobytes() + array("Q", candidates.masks[:count]).tobytes()
+            self._free_shared_memory()
+            self._shm = shared_memory.SharedMemory(create=True, size=max(1, len(header) + len(data)))
+            self._shm.buf[:len(header)] = header
+            self._shm.buf[len(header):len(header) + len(data)] = data
+            self._published = (candidates, count)
+        return self._shm.name
+
+    def _chunks(self, indices: Sequence[int]) -> Iterator[Union[range, array]]:
+        """
+        Split the indices into chunks, ranges stay ranges to keep the tasks small.
+        """
+        for start in range(0, len(indices), self.chunk_size):
+            chunk = indices[start:start + self.chunk_size]
+            yield chunk if isinstance(chunk, range) else array("Q", chunk)
+
+    def score(self,
+              score: ScoreFunction,
+              query: str,
+              candidates: CandidateIndex,
+              indices: Sequence[int],
+              ) -> Iterator[Tuple[int, Union[ScoringResult, float]]]:
+        if len(indices) < self.min_items or not self._is_picklable(score):
+            yield from super().score(score, query, candidates, indices)
+            return
+        shm_name = self._publish(candidates)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        mask = query_mask(score, query)
+        chunks = list(self._chunks(indices))
+        futures = [self._executor.submit(_score_chunk, shm_name, len(candidates), score, query, chunk, mask)
+                   for chunk in chunks]
+        try:
+            for future, chunk in zip(futures, chunks):
+                matches, scored = future.result()
+                self._count(len(chunk), scored)
+                yield from matches
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _free_shared_memory(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._published = None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._free_shared_memory()
+
+
+class NumpyEngine(ScoringEngine):
+    """
+    A :class:`ScoringEngine` that uses NumPy (an optional dependency, install
+    ``curses-fzf[numpy]``) to reject candidates in bulk.
+
+    The lowercase display strings of all items are encoded once per
+    :meth:`~curses_fzf.FuzzyFinder.find` call into one array of code points
+    with an offset table.
+    For score functions with a truthy ``subsequence`` attribute (like
+    :func:`~curses_fzf.scoring_fzf`), which only match candidates that contain
+    the lowercase query as subsequence, the subsequence test runs as vectorized
+    operations over the whole batch of candidates.
+    Only the remaining candidates are passed to the score function, so the
+    results are identical to the :class:`ScoringEngine`'s.
+    Other score functions are called for every candidate, like by :class:`ScoringEngine`.
+
+    Args:
+        min_items (int): Below this number of candidates to score, the vectorized
+            test is skipped, since its overhead wouldn't pay off.
+            Default is ``10000``.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+
+    batch_size: int = 100000
+
+    def __init__(self, min_items: int = 10000) -> None:
+        if numpy is None:
+            raise ImportError("NumpyEngine requires numpy, install curses-fzf[numpy]")
+        self.min_items: int = min_items
+        self._encoded: Optional[Tuple[CandidateIndex, int]] = None
+        self._codepoints: Any = numpy.zeros(0, dtype=numpy.uint32)
+        self._offsets: Any = numpy.zeros(1, dtype=numpy.int64)
+        self._char_positions: LRUCache[str, Any] = LRUCache(0)
+
+    def _encode(self, candidates: CandidateIndex) -> None:
+        """
+        Encode the candidates added since the last call, a new candidate index
+        is encoded from scratch.
+        """
+        count = len(candidates)
+        if self._encoded is not None and self._encoded[0] is candidates and self._encoded[1] == count:
+            return
+        if self._encoded is None or self._encoded[0] is not candidates:
+            self._encoded = (candidates, 0)
+            self._codepoints = numpy.zeros(0, dtype=numpy.uint32)
+            self._offsets = numpy.zeros(1, dtype=numpy.int64)
+        new = [c.lower() for c in candidates.candidates[self._encoded[1]:count]]
+        codepoints = numpy.frombuffer("".join(new).encode("utf-32-le", ENCODING_ERRORS), dtype=numpy.uint32)
+        lengths = numpy.fromiter((len(c) for c in new), dtype=numpy.int64, count=len(new))
+        self._codepoints = numpy.concatenate((self._codepoints, codepoints))
+        self._offsets = numpy.concatenate((self._offsets, self._offsets[-1] + numpy.cumsum(lengths)))
+        self._encoded = (candidates, count)
+        # the cached positions (int64) take at most as much memory as the
+        # code points (uint32), frequent characters are looked up per query
+        self._char_positions = LRUCache(len(self._codepoints) // 2, weigh=len)
+
+    def _positions(self, char: str) -> Any:
+        """
+        The sorted positions of a character in the encoded corpus (cached).
+        """
+        positions = self._char_positions.get(char)
+        if positions is None:
+            positions = numpy.flatnonzero(self._codepoints == ord(char))
+            self._char_positions.put(char, positions)
+        return positions
+
+    def _subsequence_matches(self, query_lower: str, indices: Sequence[int]) -> Any:
+        """
+        The indices of the candidates that contain the query as subsequence,
+        found with a vectorized greedy forward scan: per query character, each
+        remaining candidate advances to the character's next position.
+        """
+        if isinstance(indices, range):
+            remaining = numpy.arange(indices.start, indices.stop, indices.step, dtype=numpy.int64)
+        else:
+            remaining = numpy.asarray(indices, dtype=numpy.int64)
+        start = self._offsets[remaining]
+        end = self._offsets[remaining + 1]
+        for char in query_lower:
+            positions = self._positions(char)
+            if not len(positions) or not len(remaining):
+                return remaining[:0]
+            found = numpy.searchsorted(positions, start)
+            valid = found < len(positions)
+            position = positions[numpy.minimum(found, len(positions) - 1)]
+            valid &= position < end
+            remaining = remaining[valid]
+            start = position[valid] + 1
+            end = end[valid]
+        return remaining
+
+    def score(self,
+              score: ScoreFunction,
+              query: str,
+              candidates: CandidateIndex,
+              indices: Sequence[int],
+              ) -> Iterator[Tuple[int, ScoringResult]]:
+        if not query or len(indices) < self.min_items or not getattr(score, "subsequence", False):
+            yield from super().score(score, query, candidates, indices)
+            return
+        self._encode(candidates)
+        remaining = self._subsequence_matches(CompiledQuery.compile(query).lowered, indices).tolist()
+        self._count(len(indices), len(remaining))
+        yield from score_indices(score, query, candidates, remaining)
+
+    def close(self) -> None:
+        self._encoded = None
+        self._codepoints = numpy.zeros(0, dtype=numpy.uint32)
+        self._offsets = numpy.zeros(1, dtype=numpy.int64)
+        self._char_positions = LRUCache(0)
@@ -1,11 +1,31 @@
+from __future__ import annotations
+
 import sys
-import curses
-from typing import Any, Callable, List, Tuple, Optional, Union
+import time
+from array import array
+from collections import deque
+from typing import (Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Tuple, Optional,
+                    Sequence, Union)
 
 from .colors import ColorTheme, _init_curses
 from .help import _help, _base_window
 from .errors import CursesFzfAborted, CursesFzfAssertion, CursesFzfIndexOutOfBounds
 from .scoring import ScoringResult, scoring_fzf
+from .candidates import Candidate, CandidateIndex
+from .query import CompiledQuery
+from .background import BackgroundWorker, ItemReader
+from .cache import LRUCache
+from .render import Frame, highlight_runs
+from .selection import Selection, default_key
+from .preview import PreviewLoader
+from .stats import FrameStats, Stats
+from .engines import ScoringEngine
+from .ranking import BoundedMatches, Matches, RankedMatches, Resolve, score_value
+
+try:
+    import curses
+except ImportError:  # pragma: no cover
+    curses = None  # type: ignore[assignment]
 
 
 ITEM_COL_START = 2
@@ -13,6 +33,80 @@ SELECTED_MARKER = "✅ "
 DESELECTED_MARKER = "   "
 CHAR_CONTINUED = "…"
 UnicodeKey = Union[int, str]
+POLL_INTERVAL_MS = 50
+PUBLISH_INTERVAL = 0.05
+PARTIAL_TOP_K = 100
+PREVIEW_LOADING = "loading…"
+MAX_TYPEAHEAD = 1000
+_FILTER_STATE = ("query_cache", "_query_cache_owner", "_candidates", "_last_filter_inputs", "_last_matches",
+                 "_survivors")
+"""
+The attributes :meth:`FuzzyFinder.filter` keeps separately from the interface's.
+"""
+
+
+class _FilterJob(NamedTuple):
+    """
+    Everything needed to calculate the filtered list, see :meth:`FuzzyFinder._prepare_filter`.
+    """
+    inputs: Tuple[Any, ...]
+    indices: Sequence[int]
+    carried: Matches
+    engine: ScoringEngine
+    top_k: int
+    max_matches: int
+
+
+class _FilterResult(NamedTuple):
+    """
+    The matches of a :class:`_FilterJob`, see :meth:`FuzzyFinder._run_filter`.
+    """
+    job: _FilterJob
+    matches: Matches
+    truncated: bool
+    resolve: Resolve
+    scored: int = 0
+    rejected: int = 0
+    display_seconds: float = 0.0
+
+
+class _CachedFilter(NamedTuple):
+    """
+    A :class:`_FilterResult` with everything derived from it, as stored in
+    :attr:`FuzzyFinder.query_cache`, see :meth:`FuzzyFinder._apply_cached`.
+    """
+    result: _FilterResult
+    filtered: Sequence[Tuple[Any, ScoringResult]]
+    survivors: Optional[Sequence[int]]
+
+
+def _resolver(query: str, items: Sequence[Any], score: Callable[[str, str], ScoringResult],
+              candidates: CandidateIndex) -> Resolve:
+    """
+    The function to get an item and its scoring result by index, for
+    :class:`~curses_fzf.ranking.RankedMatches`: the scoring result is computed
+    again, so the matches don't need to keep it.
+    """
+    def resolve(index: int) -> Tuple[Any, ScoringResult]:
+        return items[index], score(query, candidates[index])
+    return resolve
+
+
+def _same_filter_inputs(old: Optional[Tuple[Any, ...]],
+                        new: Tuple[Any, ...],
+                        compare_query: bool = True,
+                        allow_growth: bool = False,
+                        ) -> bool:
+    """
+    Compare two results of :meth:`FuzzyFinder._filter_inputs`, items and
+    functions by identity.
+    If ``allow_growth`` is ``True``, items appended to the list are accepted.
+    """
+    if old is None:
+        return False
+    same_length = old[2] <= new[2] if allow_growth else old[2] == new[2]
+    return (not compare_query or old[0] == new[0]) and old[1] is new[1] and same_length and \
+        old[3] is new[3] and old[4] is new[4]
 
 
 class FuzzyFinder:
@@ -84,6 +178,47 @@ class FuzzyFinder:
         preview_window_percentage (int): :attr:`~curses_fzf.FuzzyFinder.preview_window_percentage`
             defines the width of the preview window as a percentage of the total width.
             Default is ``40``.
+        top_k (int): If :attr:`~curses_fzf.FuzzyFinder.top_k` is a positive integer,
+            only the best ``top_k`` matches are ranked on each query change,
+            the rest is ranked lazily when the cursor moves past them.
+            Default is ``0`` (always rank all matches).
+        max_matches (int): :attr:`~curses_fzf.FuzzyFinder.max_matches` is the
+            maximum number of matches kept in :attr:`~curses_fzf.FuzzyFinder.filtered`
+            list, worse matches are dropped.
+            Default is ``sys.maxsize``.
+        engine (Optional[ScoringEngine]): The :attr:`~curses_fzf.FuzzyFinder.engine`
+            used to score the items, e.g. a :class:`~curses_fzf.ProcessPoolEngine`.
+            Default is ``None`` (score the items one by one in the calling thread).
+        background_scoring (bool): If :attr:`~curses_fzf.FuzzyFinder.background_scoring`
+            is ``True``, the items are scored in a background thread, so the
+            interface stays responsive while typing on large lists of items.
+            Default is ``False``.
+        query_cache_size (int): The maximum total number of matches kept in the
+            :attr:`~curses_fzf.FuzzyFinder.query_cache`, ``0`` disables it.
+            Default is ``1000000``.
+        key (Optional[Callable[[Any], Hashable]]): The :attr:`~curses_fzf.FuzzyFinder.key`
+            function identifies items in the :attr:`~curses_fzf.FuzzyFinder.selected` items.
+            Default is ``None`` (hashable items identify themselves, unhashable
+            items like dicts by their identity).
+        preview_async (bool): If :attr:`~curses_fzf.FuzzyFinder.preview_async`
+            is ``True``, the text returning :meth:`~curses_fzf.FuzzyFinder.preview`
+            function is called in a background thread, with cached, debounced
+            and prefetched results.
+            Default is ``False``.
+        preview_cache_size (int): The maximum number of previews cached in
+            :attr:`~curses_fzf.FuzzyFinder.preview_async` mode.
+            Default is ``100``.
+        preview_prefetch (int): The number of items below and above the cursor,
+            whose previews are loaded in advance in
+            :attr:`~curses_fzf.FuzzyFinder.preview_async` mode.
+            Default is ``0``.
+        on_frame (Optional[Callable[[FrameStats], None]]): The
+            :attr:`~curses_fzf.FuzzyFinder.on_frame` callback is called with the
+            timings and counters of each rendered frame.
+            Default is ``None``.
+        show_stats (bool): If :attr:`~curses_fzf.FuzzyFinder.show_stats` is
+            ``True``, the latency of the last frame is shown in the footer.
+            Default is ``False``.
     """
 
     def __init__(self,
@@ -100,6 +235,17 @@ class FuzzyFinder:
                  max_items: int = sys.maxsize,
                  page_size: int = 10,
                  preview_window_percentage: int = 40,
+                 top_k: int = 0,
+                 max_matches: int = sys.maxsize,
+                 engine: Optional[ScoringEngine] = None,
+                 background_scoring: bool = False,
+                 query_cache_size: int = 1000000,
+                 key: Optional[Callable[[Any], Hashable]] = None,
+                 preview_async: bool = False,
+                 preview_cache_size: int = 100,
+                 preview_prefetch: int = 0,
+                 on_frame: Optional[Callable[[FrameStats], None]] = None,
+                 show_stats: bool = False,
                  ) -> None:
         # user settings
         self.min_items: int = min_items
@@ -144,12 +290,112 @@ class FuzzyFinder:
         The preview window will be placed on the right side of the screen if a
         :meth:`~curses_fzf.FuzzyFinder.preview` function is provided.
         """
+        self.preview_async: bool = preview_async
+        """
+        If :attr:`~curses_fzf.FuzzyFinder.preview_async` is ``True``, the
+        :meth:`~curses_fzf.FuzzyFinder.preview` function is called in a
+        background thread (with ``None`` instead of the preview window), so a
+        slow preview doesn't stall the navigation.
+        It must return the preview text.
+        The texts are cached per item (see :attr:`~curses_fzf.FuzzyFinder.key`),
+        loaded only once the cursor rests on an item and given up on after
+        ``PREVIEW_TIMEOUT`` seconds.
+        Default is ``False``.
+        """
+        self.preview_cache_size: int = preview_cache_size
+        """
+        The maximum number of previews cached in
+        :attr:`~curses_fzf.FuzzyFinder.preview_async` mode.
+        Default is ``100``.
+        """
+        self.preview_prefetch: int = preview_prefetch
+        """
+        The number of items below and above the cursor, whose previews are
+        loaded in advance in :attr:`~curses_fzf.FuzzyFinder.preview_async` mode.
+        Default is ``0``.
+        """
+        self.on_frame: Optional[Callable[[FrameStats], None]] = on_frame
+        """
+        If an :attr:`~curses_fzf.FuzzyFinder.on_frame` callback is provided, it
+        is called with the :class:`~curses_fzf.stats.FrameStats` (timings of the
+        main loop phases and counters like scored items) of each rendered frame,
+        e.g. to log slow frames.
+        Default is ``None``.
+        """
+        self.show_stats: bool = show_stats
+        """
+        If :attr:`~curses_fzf.FuzzyFinder.show_stats` is ``True``, the latency
+        of the last frame is shown in the footer.
+        Default is ``False``.
+        """
         self.page_size: int = page_size
         """
         Number of items to move in :attr:`~curses_fzf.FuzzyFinder.filtered` list
         when pressing :kbd:`PAGE_UP`/:kbd:`PAGE_DOWN`.
         Default is ``10``.
         """
+        self.top_k: int = top_k
+        """
+        If :attr:`~curses_fzf.FuzzyFinder.top_k` is a positive integer, only the
+        best ``top_k`` matches are ranked (using a heap) on each query change,
+        instead of sorting all matches.
+        The :attr:`~curses_fzf.FuzzyFinder.filtered` list (a
+        :class:`~curses_fzf.ranking.RankedMatches` sequence) then ranks more
+        matches when the cursor moves past the ranked ones.
+        A value around the terminal height is a good choice.
+        Default is ``0`` (always rank all matches).
+        """
+        self.max_matches: int = max_matches
+        """
+        The maximum number of matches kept in :attr:`~curses_fzf.FuzzyFinder.filtered`
+        list. If more items match the :attr:`~curses_fzf.FuzzyFinder.query`,
+        only the best ones are kept, so memory stays bounded on broad queries.
+        Default is ``sys.maxsize``.
+        """
+        if engine is None:
+            engine = ScoringEngine()
+        self.engine: ScoringEngine = engine
+        """
+        The :class:`~curses_fzf.ScoringEngine` used by
+        :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` to score the items
+        with the :meth:`~curses_fzf.FuzzyFinder.score` function.
+        If ``None`` was given in the constructor, the default
+        :class:`~curses_fzf.ScoringEngine` scores the items one by one in the
+        calling thread.
+        """
+        self.background_scoring: bool = background_scoring
+        """
+        If :attr:`~curses_fzf.FuzzyFinder.background_scoring` is ``True``, the
+        items are scored in a background thread, so the query line stays
+        responsive while typing on large lists of items.
+        Each change of the :attr:`~curses_fzf.FuzzyFinder.query` cancels the
+        scan in flight, the best matches found so far are shown while scanning.
+        Autoreturn and preselection are applied once the first scan finished,
+        if keys were pressed before, autoreturn is skipped and the preselection
+        is added to the selection.
+        Default is ``False``.
+        """
+        self.query_cache: LRUCache[str, _CachedFilter] = LRUCache(
+            query_cache_size, lambda cached: len(cached.result.matches) + 1)
+        """
+        A least recently used cache of the ranked :attr:`~curses_fzf.FuzzyFinder.filtered`
+        lists of recent queries, so going back to a previous query (e.g. on
+        :kbd:`BACKSPACE`) doesn't rescore the items.
+        It is bounded by the total number of cached matches (see the
+        ``query_cache_size`` parameter) and cleared when
+        :attr:`~curses_fzf.FuzzyFinder.all_items` or the
+        :meth:`~curses_fzf.FuzzyFinder.score` function changes.
+        Its ``hits`` and ``misses`` counters help to tune its size.
+        :meth:`~curses_fzf.FuzzyFinder.filter` uses a cache of its own.
+        """
+        self.key: Optional[Callable[[Any], Hashable]] = key
+        """
+        The :attr:`~curses_fzf.FuzzyFinder.key` function returns a hashable key
+        identifying an item in the :attr:`~curses_fzf.FuzzyFinder.selected` items,
+        e.g. ``lambda item: item["id"]`` for dicts.
+        If ``None`` was given in the constructor, hashable items identify
+        themselves and unhashable items are identified by their identity.
+        """
         self.multi: bool = multi
         """
         :attr:`~curses_fzf.FuzzyFinder.multi` selection mode determines
@@ -233,6 +479,8 @@ class FuzzyFinder:
         The :attr:`~curses_fzf.ScoringResult.score` is used to sort the items in
         the :attr:`~curses_fzf.FuzzyFinder.filtered` list and to determine which
         items match the query.
+        If the function has a ``score_batch(query, candidates)`` attribute, it is
+        called with many candidates at once instead, see :class:`~curses_fzf.ScoringEngine`.
 
         Default is :func:`~curses_fzf.scoring_fzf`.
 
@@ -298,23 +546,149 @@ class FuzzyFinder:
         This will be set to ``True`` by
         :meth:`~curses_fzf.FuzzyFinder.kb_accept_selection` on :kbd:`ENTER`.
         """
-        self.filtered: List[Tuple[Any, ScoringResult]] = []
+        self.filtered: Sequence[Tuple[Any, ScoringResult]] = []
         """
         The list of items filtered by the current :attr:`~curses_fzf.FuzzyFinder.query`,
         each paired with its :class:`~curses_fzf.ScoringResult`.
         This list is updated by :meth:`~curses_fzf.FuzzyFinder.calculate_filtered`,
-        which is called in each iteration of the main loop before rendering the items.
+        which is called in the main loop before rendering the items, whenever the
+        :attr:`~curses_fzf.FuzzyFinder.query`, the :attr:`~curses_fzf.FuzzyFinder.all_items`
+        list or the :meth:`~curses_fzf.FuzzyFinder.score` function changed.
         """
-        self.selected: List[Any] = []
+        self._selected: Selection = Selection(key=key)
         """
-        The list of currently selected items in :attr:`~curses_fzf.FuzzyFinder.multi`
-        selection mode.
-        In single selection mode this list will be bypassed and the currently
-        highlighted item in :attr:`~curses_fzf.FuzzyFinder.filtered` list will
-        be returned on :kbd:`ENTER`.
+        Private: Use the :attr:`~curses_fzf.FuzzyFinder.selected` property to
+        get or replace the selected items.
+        """
+        self._candidates: Optional[CandidateIndex] = None
+        """
+        Private: The :class:`~curses_fzf.candidates.CandidateIndex` of
+        :attr:`~curses_fzf.FuzzyFinder.all_items`, built once per
+        :meth:`~curses_fzf.FuzzyFinder.find` call.
+        """
+        self._background: Optional[BackgroundWorker] = None
+        """
+        Private: The worker thread used for
+        :attr:`~curses_fzf.FuzzyFinder.background_scoring`.
+        """
+        self._submitted_filter_inputs: Optional[Tuple[Any, ...]] = None
+        """
+        Private: The inputs of the last scan submitted to the background worker.
         """
-        # keymap
-        self.keymap = {
+        self._last_filter_inputs: Optional[Tuple[Any, ...]] = None
+        """
+        Private: The inputs (query, items, score and display function) of the last
+        :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` run, see
+        :meth:`~curses_fzf.FuzzyFinder._filter_inputs`.
+        """
+        self._last_matches: Matches = Matches()
+        """
+        Private: The matches of the last :meth:`~curses_fzf.FuzzyFinder.calculate_filtered`
+        run in ascending index order, reused if only new items were appended.
+        """
+        self._reader: Optional[ItemReader] = None
+        """
+        Private: Consumes the items given to :meth:`~curses_fzf.FuzzyFinder.find`,
+        if they are not a :py:obj:`~typing.Sequence`.
+        """
+        self._survivors: Optional[Sequence[int]] = None
+        """
+        Private: The indices (into :attr:`~curses_fzf.FuzzyFinder.all_items`, in
+        ascending order) of all items matched by the last
+        :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` run.
+        ``None`` if matches were dropped because of :attr:`~curses_fzf.FuzzyFinder.max_matches`.
+        """
+        self._query_cache_owner: Optional[Tuple[Any, ...]] = None
+        """
+        Private: The items, functions and settings the entries of
+        :attr:`~curses_fzf.FuzzyFinder.query_cache` were calculated with.
+        """
+        self._filter_state: Tuple[Any, ...] = (
+            LRUCache(self.query_cache.max_weight, self.query_cache.weigh), None, None, None, Matches(), None)
+        """
+        Private: The values of the :data:`_FILTER_STATE` attributes used by
+        :meth:`~curses_fzf.FuzzyFinder.filter`, so filtering other items doesn't
+        clear the query cache and candidates of :attr:`~curses_fzf.FuzzyFinder.all_items`.
+        """
+        self._frame: Optional[Frame] = None
+        """
+        Private: The frame buffer the render functions draw to while a frame
+        is rendered in the main loop.
+        """
+        self._color_pairs: Dict[int, int] = {}
+        """
+        Private: The cached :py:func:`curses.color_pair` attributes by color pair number.
+        """
+        self._preview_window: Optional[curses.window] = None
+        """
+        Private: The preview window, reused until its size or position changes.
+        """
+        self._preview_geometry: Optional[Tuple[int, int, int, int]] = None
+        """
+        Private: The ``(height, width, y, x)`` of the preview window.
+        """
+        self._last_preview: Optional[Tuple[int, int, int, int]] = None
+        """
+        Private: The geometry of the preview window shown in the last frame,
+        ``None`` if it was hidden.
+        """
+        self._preview_loader: Optional[PreviewLoader] = None
+        """
+        Private: Loads the previews in :attr:`~curses_fzf.FuzzyFinder.preview_async` mode.
+        """
+        self.stats: Stats = Stats()
+        """
+        The :class:`~curses_fzf.stats.Stats` of the main loop of the last
+        :meth:`~curses_fzf.FuzzyFinder.find` call: the number of frames, the
+        timings and counters of the last frame and of all frames summed up.
+        """
+        self._frame_stats: FrameStats = FrameStats()
+        """
+        Private: The timings and counters of the frame in progress.
+        """
+        self._cache_counts: Tuple[int, int] = (0, 0)
+        """
+        Private: The :attr:`~curses_fzf.FuzzyFinder.query_cache` hits and misses
+        at the end of the last frame.
+        """
+        self._typeahead: Deque[UnicodeKey] = deque()
+        """
+        Private: Keys read but not handled yet, see
+        :meth:`~curses_fzf.FuzzyFinder._handle_typeahead`.
+        """
+        self._typeahead_held: bool = False
+        """
+        Private: ``True`` while the first key of the typeahead waits for the
+        changed query to be rescored, see :meth:`~curses_fzf.FuzzyFinder._handle_typeahead`.
+        """
+        self._input_handled: bool = False
+        """
+        Private: ``True`` once a key was handled in the current
+        :meth:`~curses_fzf.FuzzyFinder.find` call, see
+        :meth:`~curses_fzf.FuzzyFinder._on_first_filtered`.
+        """
+        self._last_frame: Optional[Frame] = None
+        """
+        Private: The last frame flushed to the screen, only rows differing
+        from it are rewritten. ``None`` redraws the whole screen.
+        """
+        self.keymap: Dict[int, Dict[str, Any]] = self._default_keymap() if curses is not None else {}
+        """
+        Dictionary mapping keys (e.g. ``curses.KEY_UP``) to their corresponding
+        keybinding functions (e.g. ``lambda: self.kb_move_items_cursor_relative(-1)``).
+        If the target function takes no arguments, it can be directly assigned
+        like ``curses.KEY_F1: self.kb_show_help``.
+
+        All the functions starting with ``kb_`` are keybinding functions that
+        are used in the keymap and can also be reassigned or called directly.
+        It is empty if curses is not available, see :meth:`~curses_fzf.FuzzyFinder.filter`.
+        """
+
+    def _default_keymap(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Private: The default :attr:`~curses_fzf.FuzzyFinder.keymap`.
+        """
+        return {
             27: {
                 "function": self.kb_abort_selection,
                 "key": "ESC",
@@ -436,15 +810,6 @@ class FuzzyFinder:
                 "category": "List Movement",
             },
         }
-        """
-        Dictionary mapping keys (e.g. ``curses.KEY_UP``) to their corresponding
-        keybinding functions (e.g. ``lambda: self.kb_move_items_cursor_relative(-1)``).
-        If the target function takes no arguments, it can be directly assigned
-        like ``curses.KEY_F1: self.kb_show_help``.
-
-        All the functions starting with ``kb_`` are keybinding functions that
-        are used in the keymap and can also be reassigned or called directly.
-        """
 
 # properties
 
@@ -488,10 +853,53 @@ class FuzzyFinder:
             self._cursor_query = len(value)
             self._query = value
 
+    @property
+    def scanning(self) -> bool:
+        """
+        ``True`` while the items are scored in the background, see
+        :attr:`~curses_fzf.FuzzyFinder.background_scoring`.
+        """
+        return self._background is not None and self._background.running
+
+    @property
+    def loading(self) -> bool:
+        """
+        ``True`` while the items given to :meth:`~curses_fzf.FuzzyFinder.find`
+        are still being consumed (if they are not a :py:obj:`~typing.Sequence`).
+        """
+        return self._reader is not None and not self._reader.done
+
+    @property
+    def _screen(self) -> Any:
+        """
+        Private: The window the render functions draw to, the frame buffer
+        while a frame is rendered in the main loop, else
+        :attr:`~curses_fzf.FuzzyFinder.stdscr`.
+        """
+        return self._frame if self._frame is not None else self.stdscr
+
+    @property
+    def selected(self) -> Selection:
+        """
+        The currently selected items in :attr:`~curses_fzf.FuzzyFinder.multi`
+        selection mode, in selection order.
+        In single selection mode this list will be bypassed and the currently
+        highlighted item in :attr:`~curses_fzf.FuzzyFinder.filtered` list will
+        be returned on :kbd:`ENTER`.
+        It is a :class:`~curses_fzf.selection.Selection`, an ordered set with
+        all list methods, identifying items by :attr:`~curses_fzf.FuzzyFinder.key`.
+        Setting it to any iterable of items replaces the selection.
+        """
+        return self._selected
+
+    @selected.setter
+    def selected(self, value: Iterable[Any]) -> None:
+        self._selected = Selection(value, key=self.key)
+
 # main entry point
 
     def find(self,
-             items: List[Any],
+             items: Iterable[Any],
              title: Optional[str] = None,
              query: Optional[str] = None,
              ) -> List[Any]:
@@ -500,10 +908,18 @@ class FuzzyFinder:
         and return the :attr:`~curses_fzf.FuzzyFinder.selected` item(s).
 
         Args:
-            items (List[Any]): The list of items to filter and select from.
-                This list will be stored in :attr:`~curses_fzf.FuzzyFinder.all_items`
-                and filtered based on the :attr:`~curses_fzf.FuzzyFinder.query`
-                into :attr:`~curses_fzf.FuzzyFinder.filtered` list.
+            items (Iterable[Any]): The items to filter and select from.
+                A list (or other :py:obj:`~typing.Sequence`) will be stored in
+                :attr:`~curses_fzf.FuzzyFinder.all_items` and filtered based on the
+                :attr:`~curses_fzf.FuzzyFinder.query` into
+                :attr:`~curses_fzf.FuzzyFinder.filtered` list.
+                Any other iterable (e.g. a generator or an open file, whose lines
+                are used without line endings) is consumed in a background thread,
+                while the interface already shows and filters the items that
+                arrived so far.
+                Autoreturn and preselection are applied once all items arrived,
+                if keys were pressed before, autoreturn is skipped and the
+                preselection is added to the selection.
             title (Optional[str]): The :attr:`~curses_fzf.FuzzyFinder.title` to
                 display in the upper left corner of the main
                 :class:`~curses_fzf.FuzzyFinder` window.
@@ -517,8 +933,17 @@ class FuzzyFinder:
 
         Returns:
             List[Any]: The list of selected items.
+
+        Raises:
+            ImportError: If curses is not available (e.g. on Windows without
+                ``windows-curses``), use :meth:`~curses_fzf.FuzzyFinder.filter` instead.
         """
-        self.all_items = items
+        if curses is None:
+            raise ImportError("FuzzyFinder.find requires curses, use FuzzyFinder.filter without a terminal")
+        if isinstance(items, Sequence):
+            self.all_items = items
+        else:
+            self.all_items = []
         if title is not None:
             self.title = title
         if query is None:
@@ -533,10 +958,92 @@ class FuzzyFinder:
         self.return_selection_now = False
         self.filtered = []
         self.selected = []
+        self._last_filter_inputs = None
+        self._submitted_filter_inputs = None
+        self._last_matches = Matches()
+        self._survivors = None
+        self._typeahead.clear()
+        self._typeahead_held = False
+        self._input_handled = False
+        self.stats.reset()
+        self._frame_stats = FrameStats()
+        self._cache_counts = (self.query_cache.hits, self.query_cache.misses)
+        self._candidates = None
+        self.query_cache.clear()
+        self._query_cache_owner = None
+        if not isinstance(items, Sequence):
+            self._reader = ItemReader(items, self.all_items)
         try:
             return curses.wrapper(lambda stdscr: self._main_loop(stdscr))
         except KeyboardInterrupt:
             raise CursesFzfAborted("fuzzyfinder aborted by user") from None
+        finally:
+            if self._reader is not None:
+                self._reader.stop()
+                self._reader = None
+
+    def filter(self,
+               items: Iterable[Any],
+               query: Optional[str] = None,
+               ) -> Iterator[Tuple[Any, ScoringResult]]:
+        """
+        Rank the given items by the :attr:`~curses_fzf.FuzzyFinder.query`
+        without an interface, like ``fzf --filter``, e.g. for batch jobs or
+        completion backends without a terminal.
+        Curses is never initialized and doesn't even need to be available.
+        The state of the interface (:attr:`~curses_fzf.FuzzyFinder.all_items`,
+        :attr:`~curses_fzf.FuzzyFinder.query`, the
+        :attr:`~curses_fzf.FuzzyFinder.filtered` list and the cursors) is not changed.
+
+        The items are scored by the same :attr:`~curses_fzf.FuzzyFinder.engine`
+        as in :meth:`~curses_fzf.FuzzyFinder.calculate_filtered`, but the query
+        cache is a separate one (of the same size as
+        :attr:`~curses_fzf.FuzzyFinder.query_cache`, which is left untouched):
+        filtering the same list again (e.g. with a refined query) reuses the
+        previous results.
+        Only the best matches are ranked up front (see
+        :attr:`~curses_fzf.FuzzyFinder.top_k`), the rest is ranked on demand
+        while the returned generator is consumed.
+
+        Args:
+            items (Iterable[Any]): The items to filter.
+                A list (or other :py:obj:`~typing.Sequence`) is used as is, any
+                other iterable is consumed into a list first.
+            query (Optional[str]): The :attr:`~curses_fzf.FuzzyFinder.query` to
+                filter by.
+                Default is ``None``, in which case the current query will be reused.
+
+        Returns:
+            Iterator[Tuple[Any, ScoringResult]]: The matching items with their
+                scoring results, from best to worst.
+        """
+        saved = (self.all_items, self._query, self.filtered)
+        interactive = self._swap_filter_state(self._filter_state)
+        self.all_items = items if isinstance(items, Sequence) else list(items)
+        if query is not None:
+            # bypass the setter, which resets the cursors
+            self._query = query
+        try:
+            cached = self._cached_filter()
+            if cached is not None and self._is_complete(cached):
+                self._apply_cached(cached)
+            else:
+                job = self._prepare_filter(cached, top_k=self.top_k or PARTIAL_TOP_K)
+                self._apply_filter(self._run_filter(job))  # type: ignore[arg-type]
+            filtered = self.filtered
+        finally:
+            self._filter_state = self._swap_filter_state(interactive)
+            self.all_items, self._query, self.filtered = saved
+        return (filtered[index] for index in range(len(filtered)))
+
+    def _swap_filter_state(self, state: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        """
+        Replace the values of the :data:`_FILTER_STATE` attributes, returns the previous ones.
+        """
+        previous = tuple(getattr(self, name) for name in _FILTER_STATE)
+        for name, value in zip(_FILTER_STATE, state):
+            setattr(self, name, value)
+        return previous
 
 # keybinding functions
 
@@ -635,11 +1142,7 @@ class FuzzyFinder:
         :attr:`~curses_fzf.FuzzyFinder.selected` list.
         """
         if self.multi and self.filtered:
-            item = self.filtered[self.cursor_items][0]
-            if item in self.selected:
-                self.selected.remove(item)
-            else:
-                self.selected.append(item)
+            self.selected.toggle(self.filtered[self.cursor_items][0])
 
     def kb_select_all(self) -> None:
         """
@@ -648,10 +1151,7 @@ class FuzzyFinder:
         list (only in :attr:`~curses_fzf.FuzzyFinder.multi` mode).
         """
         if self.multi:
-            for entry in self.filtered:
-                item = entry[0]
-                if item not in self.selected:
-                    self.selected.append(item)
+            self.selected.extend(self._filtered_items())
 
     def kb_deselect_all(self) -> None:
         """
@@ -660,10 +1160,8 @@ class FuzzyFinder:
         list (only in :attr:`~curses_fzf.FuzzyFinder.multi` mode).
         """
         if self.multi:
-            for entry in self.filtered:
-                item = entry[0]
-                if item in self.selected:
-                    self.selected.remove(item)
+            for item in self._filtered_items():
+                self.selected.discard(item)
 
     def kb_reset_query(self) -> None:
         """
@@ -805,6 +1303,8 @@ class FuzzyFinder:
         """
         if self.stdscr:
             _help(self.stdscr, self.keymap, self.color_theme)
+            # the help screen replaced everything, redraw all rows
+            self._last_frame = None
 
 # loop functions
 
@@ -815,31 +1315,308 @@ class FuzzyFinder:
         based on the current :attr:`~curses_fzf.FuzzyFinder.query`
         and :attr:`~curses_fzf.FuzzyFinder.score` function.
 
-        This function will be called in each iteration of the main loop of
-        :class:`~curses_fzf.FuzzyFinder` before rendering the items.
+        This function will be called in the main loop of
+        :class:`~curses_fzf.FuzzyFinder` before rendering the items, if the
+        :attr:`~curses_fzf.FuzzyFinder.query`, the :attr:`~curses_fzf.FuzzyFinder.all_items`
+        list or the :meth:`~curses_fzf.FuzzyFinder.score` function changed since
+        the last call.
+        Since :attr:`~curses_fzf.FuzzyFinder.all_items` is compared by identity
+        and length, assign a new list instead of modifying it in place.
+
+        If the :meth:`~curses_fzf.FuzzyFinder.score` function provides a
+        ``refines(old_query, new_query)`` attribute (like the built-in scoring
+        functions do) and it returns ``True`` for the previous and the current
+        query, only the items matched by the previous query are rescored.
+        Otherwise all items are scored again, unless the query is found in the
+        :attr:`~curses_fzf.FuzzyFinder.query_cache` (e.g. on :kbd:`BACKSPACE`).
+        If it provides an ``empty_score`` attribute (like the built-in scoring
+        functions do), all items match the empty query with this score and
+        aren't scored at all.
+
+        Only the indices and scores of the matches are kept, the
+        :class:`~curses_fzf.ScoringResult` of a match is computed again when it
+        is accessed in the :attr:`~curses_fzf.FuzzyFinder.filtered` list
+        (see :class:`~curses_fzf.ranking.RankedMatches`).
+        """
+        cached = self._cached_filter()
+        if cached is not None and self._is_complete(cached):
+            self._apply_cached(cached)
+            return
+        self._apply_filter(self._run_filter(self._prepare_filter(cached)))  # type: ignore[arg-type]
+
+    def _prepare_filter(self, cached: Optional[_CachedFilter] = None, top_k: Optional[int] = None) -> _FilterJob:
+        """
+        Capture everything needed to calculate the :attr:`~curses_fzf.FuzzyFinder.filtered`
+        list, so :meth:`~curses_fzf.FuzzyFinder._run_filter` can run in another thread.
+        A cached result of the query is extended by the items appended since.
+        ``top_k`` overrides :attr:`~curses_fzf.FuzzyFinder.top_k` for this job.
+        """
+        inputs = self._filter_inputs()
+        indices: Sequence[int] = range(len(self.all_items))
+        carried = Matches()
+        if cached is not None:
+            indices = range(cached.result.job.inputs[2], len(self.all_items))
+            carried = cached.result.matches
+        elif self._same_items_and_score():
+            # only score the items appended since the last run (if any)
+            # and keep the previous matches for the same query
+            appended = range(self._last_filter_inputs[2], len(self.all_items))  # type: ignore[index]
+            if self._last_filter_inputs[0] == self.query:  # type: ignore[index]
+                indices = appended
+                carried = self._last_matches
+            elif self._can_narrow(self.query):
+                survivors: Sequence[int] = self._survivors  # type: ignore[assignment]
+                if len(survivors) == self._last_filter_inputs[2]:  # type: ignore[index]
+                    # all items matched (e.g. the empty query), a range skips whole chunks
+                    indices = range(len(self.all_items))
+                else:
+                    indices = survivors + array("q", appended)  # type: ignore[operator]
+        if top_k is None:
+            top_k = self.top_k
+        return _FilterJob(inputs, indices, carried, self.engine, top_k, self.max_matches)
+
+    def _run_filter(self,
+                    job: _FilterJob,
+                    cancelled: Optional[Callable[[], bool]] = None,
+                    publish: Optional[Callable[[Sequence[Tuple[Any, ScoringResult]]], None]] = None,
+                    ) -> Optional[_FilterResult]:
+        """
+        Score the items of the given job.
+        If a ``cancelled`` callback is given, the items are scored in batches
+        and ``None`` is returned as soon as it returns ``True``.
+        If a ``publish`` callback is given, the ranked matches found so far are
+        published regularly.
+        """
+        query, items, _, score, display = job.inputs
+        # the query's lowercase form, words, ... are derived once for all items
+        query = CompiledQuery(query)
+        display_start = time.perf_counter()
+        candidates = self._candidate_index(items, display)
+        display_seconds = time.perf_counter() - display_start
+        resolve = _resolver(query, items, score, candidates)
+        engine = job.engine
+        scored, rejected = engine.scored, engine.rejected
+        indices = job.indices
+        collected: Union[Matches, BoundedMatches] = job.carried.copy()
+        if job.max_matches < len(indices) + len(job.carried):
+            collected = BoundedMatches(job.max_matches)
+            for index, value in job.carried:
+                collected.append(index, value)
+        empty_score = getattr(score, "empty_score", None) if not query else None
+        if empty_score is not None:
+            # every candidate matches the empty query with the same score
+            collected.extend(indices, empty_score)
+            indices = range(0)
+        batch_size = engine.batch_size if cancelled is not None else max(1, len(indices))
+        last_publish = time.monotonic()
+        for start in range(0, len(indices), batch_size):
+            if cancelled is not None and cancelled():
+                return None
+            batch = indices[start:start + batch_size]
+            for index, score_result in engine.score(score, query, candidates, batch):
+                collected.append(index, score_value(score_result))
+            if publish is not None and time.monotonic() - last_publish > PUBLISH_INTERVAL:
+                partial = collected.matches() if isinstance(collected, BoundedMatches) else collected.copy()
+                publish(RankedMatches(partial, job.top_k or PARTIAL_TOP_K, resolve, items))
+                last_publish = time.monotonic()
+        counters = (engine.scored - scored, engine.rejected - rejected, display_seconds)
+        if isinstance(collected, BoundedMatches):
+            return _FilterResult(job, collected.matches(), collected.truncated, resolve, *counters)
+        return _FilterResult(job, collected, False, resolve, *counters)
+
+    def _apply_filter(self, result: _FilterResult) -> None:
+        """
+        Make the result of :meth:`~curses_fzf.FuzzyFinder._run_filter` the
+        current :attr:`~curses_fzf.FuzzyFinder.filtered` list.
+        """
+        rank_start = time.perf_counter()
+        filtered = RankedMatches(result.matches, result.job.top_k, result.resolve, result.job.inputs[1])
+        frame = self._frame_stats
+        frame.rank += time.perf_counter() - rank_start
+        frame.display += result.display_seconds
+        frame.items_scored += result.scored
+        frame.prefilter_rejected += result.rejected
+        # dropped matches may match a refined query, so we can't narrow next time
+        survivors = None if result.truncated else result.matches.indices
+        cached = _CachedFilter(result, filtered, survivors)
+        self._apply_cached(cached)
+        if self._is_cache_owner(result.job):
+            self.query_cache.put(result.job.inputs[0], cached)
+
+    def _apply_cached(self, cached: _CachedFilter) -> None:
+        """
+        Make a (cached) result the current :attr:`~curses_fzf.FuzzyFinder.filtered` list.
+        """
+        self._last_filter_inputs = cached.result.job.inputs
+        self._last_matches = cached.result.matches
+        self._survivors = cached.survivors
+        self.filtered = cached.filtered
+
+    def _cache_owner(self, job: _FilterJob) -> Tuple[Any, ...]:
+        """
+        Everything except the query and appended items, that the entries of
+        :attr:`~curses_fzf.FuzzyFinder.query_cache` depend on.
+        """
+        return (job.inputs[1], job.inputs[3], job.inputs[4], job.max_matches)
+
+    def _is_cache_owner(self, job: _FilterJob) -> bool:
+        """
+        Check if the result of the job belongs into the current
+        :attr:`~curses_fzf.FuzzyFinder.query_cache`.
+        """
+        owner = self._query_cache_owner
+        new = self._cache_owner(job)
+        return owner is not None and all(a is b for a, b in zip(owner[:3], new[:3])) and owner[3:] == new[3:]
+
+    def _cached_filter(self) -> Optional[_CachedFilter]:
+        """
+        Look up the current query in the :attr:`~curses_fzf.FuzzyFinder.query_cache`,
+        which is cleared first, if the items, the functions or the settings changed.
+        The result may lack the items appended since, see
+        :meth:`~curses_fzf.FuzzyFinder._is_complete`.
+        """
+        job = _FilterJob(self._filter_inputs(), range(0), [], self.engine, self.top_k, self.max_matches)
+        if not self._is_cache_owner(job):
+            self.query_cache.clear()
+            self._query_cache_owner = self._cache_owner(job)
+        cached = self.query_cache.get(self.query)
+        if cached is not None and cached.result.job.inputs[2] > len(self.all_items):
+            # items were removed in place
+            self.query_cache.clear()
+            return None
+        return cached
+
+    def _is_complete(self, cached: _CachedFilter) -> bool:
         """
-        self.filtered = sorted(
-            [
-                (item, score_result) for item in self.all_items
-                if (score_result := self.score(
-                    self.query, self.display(item))) > 0
-            ],
-            key=lambda x: x[1], reverse=True
-        )
+        Check if a cached result covers all current items.
+        """
+        return cached.result.job.inputs[2] == len(self.all_items)
+
+    def _candidate_index(self, items: Sequence[Any], display: Callable[[Any], str]) -> CandidateIndex:
+        """
+        Get the :class:`~curses_fzf.candidates.CandidateIndex` for the given
+        items, extending it by newly appended items or rebuilding it if the items
+        or the display function changed.
+        The candidates of items with a truthy ``compact`` attribute (like a
+        :class:`~curses_fzf.StringStore`) are not retained.
+        """
+        candidates = self._candidates
+        if candidates is None or not candidates.is_valid_for(items, display):
+            candidates = self._candidates = CandidateIndex(items, display, retain=not getattr(items, "compact", False))
+        elif len(candidates) != len(items):
+            candidates.sync()
+        return candidates
+
+    def _filter_inputs(self) -> Tuple[Any, ...]:
+        """
+        Everything the :attr:`~curses_fzf.FuzzyFinder.filtered` list depends on.
+        Items are compared by identity and length, so assign a new list to
+        :attr:`~curses_fzf.FuzzyFinder.all_items` instead of modifying it in place.
+        """
+        return (self.query, self.all_items, len(self.all_items), self.score, self.display)
 
-    def _calculate_preselection(self) -> None:
+    def _same_items_and_score(self) -> bool:
+        """
+        Check if items (except for newly appended ones), score and display
+        function are unchanged since the last
+        :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` run.
+        """
+        return _same_filter_inputs(self._last_filter_inputs, self._filter_inputs(),
+                                   compare_query=False, allow_growth=True)
+
+    def _can_narrow(self, query: str) -> bool:
+        """
+        Check if the current query refines the query of the last
+        :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` run on the same items,
+        so only the previously matched items need to be rescored.
+        """
+        if not self._same_items_and_score():
+            return False
+        if self._survivors is None:
+            return False
+        refines = getattr(self.score, "refines", None)
+        return refines is not None and refines(self._last_filter_inputs[0], query)  # type: ignore[index]
+
+    def _update_filtered(self) -> bool:
+        """
+        Call :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` only if the
+        query, the items or the score function changed since the last run, so
+        keys that don't change the query (navigation, selection, resizing, ...)
+        only cause a re-render.
+
+        Returns:
+            bool: ``True`` if the :attr:`~curses_fzf.FuzzyFinder.filtered` list
+                was recalculated.
+        """
+        if _same_filter_inputs(self._last_filter_inputs, self._filter_inputs()):
+            return False
+        self.calculate_filtered()
+        return True
+
+    def _update_filtered_in_background(self) -> bool:
+        """
+        Like :meth:`~curses_fzf.FuzzyFinder._update_filtered`, but score in the
+        background (see :attr:`~curses_fzf.FuzzyFinder.background_scoring`).
+        A changed query cancels the scan in flight and starts a new one.
+        Partial results are shown while scanning.
+
+        Returns:
+            bool: ``True`` if a scan finished and its result was applied.
+        """
+        if self._background is None:
+            self._background = BackgroundWorker()
+        inputs = self._filter_inputs()
+        if not _same_filter_inputs(self._submitted_filter_inputs, inputs):
+            self._submitted_filter_inputs = inputs
+            cached = self._cached_filter()
+            if cached is not None and self._is_complete(cached):
+                self._background.cancel()
+                self._apply_cached(cached)
+                self.kb_move_items_cursor_relative(0)
+                return True
+            job = self._prepare_filter(cached)
+            self._background.submit(lambda cancelled, publish: self._run_filter(job, cancelled, publish))
+        polled = self._background.poll()
+        if polled is None:
+            return False
+        final, value = polled
+        if final:
+            self._apply_filter(value)
+        else:
+            self.filtered = value
+        # keep the cursor inside the changed list
+        self.kb_move_items_cursor_relative(0)
+        return final
+
+    def _filtered_items(self) -> Iterator[Any]:
+        """
+        The items of the :attr:`~curses_fzf.FuzzyFinder.filtered` list, without
+        computing their scoring results (see :meth:`~curses_fzf.ranking.RankedMatches.items`).
+        """
+        if isinstance(self.filtered, RankedMatches):
+            return self.filtered.items()
+        return (entry[0] for entry in self.filtered)
+
+    def _calculate_preselection(self, merge: bool = False) -> None:
         """
         Calculate the preselected items based on the current filter and
         preselection function.
+        If ``merge`` is ``True``, the preselected items are added to the
+        current selection instead of replacing it.
         """
         if self.multi:
-            self.selected = [item_tuple[0] for item_tuple in self.filtered if self.preselect(*item_tuple)]
+            preselected = [item_tuple[0] for item_tuple in self.filtered if self.preselect(*item_tuple)]
+            if merge:
+                self.selected.extend(preselected)
+            else:
+                self.selected = preselected
 
     def _handle_input(self, key: UnicodeKey) -> None:
         """
         Handle the given key input by calling the corresponding keybinding function
         or adding the character to the query if it is a printable character.
         """
+        self._input_handled = True
         int_key = key if isinstance(key, int) else ord(key)
         kb_function = self.keymap.get(int_key, {}).get("function")
         if kb_function:
@@ -856,7 +1633,7 @@ class FuzzyFinder:
         # in single mode return the selected items list if not empty (e.g. if
         # the user manipulated it manually)
         if self.multi or self.selected:
-            return self.selected
+            return list(self.selected)
         # in single mode return the currently highlighted item if there is one,
         # otherwise an empty list
         return [self.filtered[self.cursor_items][0]] if self.filtered else []
@@ -874,11 +1651,20 @@ class FuzzyFinder:
             f_len = len(self.filtered)
             if self.multi:
                 if f_len == self.autoreturn:
-                    return [x[0] for x in self.filtered]
+                    return list(self._filtered_items())
             elif f_len == 1:
                 return [self.filtered[0][0]]
         return None
 
+    def _color_pair(self, color: int) -> int:
+        """
+        The :py:func:`curses.color_pair` attribute of the given color pair number, cached.
+        """
+        attr = self._color_pairs.get(color)
+        if attr is None:
+            attr = self._color_pairs[color] = curses.color_pair(color)
+        return attr
+
     def _render_query(self, width: int) -> None:
         """
         Render the query line based on the current query and query cursor.
@@ -886,18 +1672,18 @@ class FuzzyFinder:
         if self.stdscr is None or width < 10:
             return
         # render query prompt
-        self.stdscr.addstr(0, 2, "> ", curses.color_pair(self.color_theme.query))
+        self._screen.addstr(0, 2, "> ", self._color_pair(self.color_theme.query))
         max_index = -1
         # render query characters with highlight on cursor position
         for i, c in enumerate(self.query[:width-6]):
             color = self.color_theme.query
             if self.cursor_query == i:
                 color = self.color_theme.cursor
-            self.stdscr.addstr(0, 4 + i, c, curses.color_pair(color))
+            self._screen.addstr(0, 4 + i, c, self._color_pair(color))
             max_index = i
         # if the cursor is at the end of the query render a cursor symbol there
         if self.cursor_query == len(self.query) and self.cursor_query < width - 6:
-            self.stdscr.addstr(0, 5 + max_index, " ", curses.color_pair(self.color_theme.cursor))
+            self._screen.addstr(0, 5 + max_index, " ", self._color_pair(self.color_theme.cursor))
 
     def _render_no_match(self, width: int) -> None:
         """
@@ -906,8 +1692,8 @@ class FuzzyFinder:
         if self.stdscr is None or width < 10:
             return
         if not self.filtered:
-            self.stdscr.addstr(3, ITEM_COL_START + 2, "No matching items!"[:width-6],
-                               curses.color_pair(self.color_theme.no_match))
+            self._screen.addstr(3, ITEM_COL_START + 2, "No matching items!"[:width-6],
+                                self._color_pair(self.color_theme.no_match))
 
     def _render_viewport(self, height: int, width: int) -> None:  # noqa: C901
         """
@@ -924,7 +1710,9 @@ class FuzzyFinder:
             # header, frame & empty line = 3
             row = i - viewport_start + 3
             item, score_result = self.filtered[i]
-            display_item = self.display(item)
+            # reuse the display string from the candidate index if possible
+            display_item = score_result.candidate if isinstance(score_result.candidate, Candidate) \
+                else self.display(item)
             if len(display_item.splitlines()) > 1:
                 raise CursesFzfAssertion("display function must return single-line strings")
             # chose marker and color based on selection and cursor position
@@ -939,18 +1727,16 @@ class FuzzyFinder:
                 marker = SELECTED_MARKER
                 base_color = self.color_theme.selected
             # render the marker before selected items
-            self.stdscr.addstr(row, ITEM_COL_START, marker, curses.color_pair(base_color))
-            # render the item character by character to highlight matched characters
-            for char_index, char in enumerate(display_item[:width-10]):
-                color = base_color
-                for match in score_result.matches:
-                    if match[0] <= char_index < match[0] + len(match[1]):
-                        color = self.color_theme.highlight
-                self.stdscr.addstr(row, ITEM_COL_START + 3 + char_index,
-                                   char, curses.color_pair(color))
+            self._screen.addstr(row, ITEM_COL_START, marker, self._color_pair(base_color))
+            # render the item in runs of plain and highlighted (matched) characters
+            visible = display_item[:width-10]
+            for start, end, highlighted in highlight_runs(len(visible), score_result.spans):
+                color = self.color_theme.highlight if highlighted else base_color
+                self._screen.addstr(row, ITEM_COL_START + 3 + start,
+                                    visible[start:end], self._color_pair(color))
             # if the line is too long end it with "…"
             if len(display_item) > width - 10:
-                self.stdscr.addstr(row, width - 6, CHAR_CONTINUED, curses.color_pair(base_color))
+                self._screen.addstr(row, width - 6, CHAR_CONTINUED, self._color_pair(base_color))
 
     def _render_preview(self, height: int, width: int) -> Optional[curses.window]:
         """
@@ -963,18 +1749,14 @@ class FuzzyFinder:
             self.show_preview = False
         sub_win = None
         if self.show_preview and self.preview is not None:
-            sub_win = curses.newwin(
-                height - 4,
-                int(width * self.preview_window_percentage / 100),
-                2,
-                int(width * (100 - self.preview_window_percentage) / 100) - 2
-            )
+            sub_win = self._preview_window_for(height, width)
             sub_win.box()
             sub_win.addstr(0, 2, " PREVIEW ",
-                           curses.color_pair(self.color_theme.window_title))
+                           self._color_pair(self.color_theme.window_title))
             if self.filtered:
-                text = self.preview(sub_win, self.color_theme, self.filtered[self.cursor_items][0],
-                                    self.filtered[self.cursor_items][1])
+                preview_start = time.perf_counter()
+                text = self._preview_text(sub_win)
+                self._frame_stats.preview += time.perf_counter() - preview_start
                 # if the preview function returns any text assume the user didn't
                 # use the preview_window parameter and render the text line by line
                 # inside the preview window, honoring the available space
@@ -985,41 +1767,255 @@ class FuzzyFinder:
                         if i > sub_h - 3:
                             break
                         sub_win.addstr(i, 4, line[:sub_w - 6],
-                                       curses.color_pair(self.color_theme.text))
+                                       self._color_pair(self.color_theme.text))
                         i += 1
         return sub_win
 
-    def _main_loop(self, stdscr: curses.window) -> List[Any]:
-        self.stdscr = stdscr
-        self.calculate_filtered()
+    def _preview_window_for(self, height: int, width: int) -> curses.window:
+        """
+        Get the erased preview window, it is only recreated if the size of the
+        main window changed.
+        """
+        geometry = (
+            height - 4,
+            int(width * self.preview_window_percentage / 100),
+            2,
+            int(width * (100 - self.preview_window_percentage) / 100) - 2,
+        )
+        if self._preview_window is None or self._preview_geometry != geometry:
+            self._preview_window = curses.newwin(*geometry)
+            self._preview_geometry = geometry
+        else:
+            self._preview_window.erase()
+        return self._preview_window
+
+    def _preview_text(self, sub_win: curses.window) -> Optional[str]:
+        """
+        Call the :meth:`~curses_fzf.FuzzyFinder.preview` function for the item
+        under the cursor, or get its text from the
+        :attr:`~curses_fzf.FuzzyFinder.preview_async` loader.
+        """
+        if self.preview is None:
+            return None
+        item, score_result = self.filtered[self.cursor_items]
+        if not self.preview_async:
+            return self.preview(sub_win, self.color_theme, item, score_result)
+        if self._preview_loader is None:
+            self._preview_loader = PreviewLoader(
+                self.preview, self.color_theme, self.preview_cache_size, self.preview_prefetch,
+                self.key or default_key)
+        text = self._preview_loader.get(self.filtered, self.cursor_items)
+        return PREVIEW_LOADING if text is None else text
+
+    def _footer(self) -> str:
+        """
+        The text of the footer line.
+        """
+        last = self.stats.last
+        return (
+            f"{f'{last.total * 1000:.1f}ms | ' if self.show_stats and last is not None else ''}"
+            f"{f'{len(self.all_items)} loaded… | ' if self.loading else ''}"
+            f"{'scanning… | ' if self.scanning else ''}"
+            f"{len(self.selected)} selected | "
+            f"{len(self.filtered)} matches | ↑↓ = navigate | "
+            f"{'TAB = toggle | ' if self.multi else ''}"
+            "ENTER = accept | ESC = abort | F1 = help"
+        )
+
+    def _on_first_filtered(self) -> Optional[List[Any]]:
+        """
+        Apply autoreturn and preselection once the first
+        :attr:`~curses_fzf.FuzzyFinder.filtered` list is calculated.
+        Returns the items to return immediately, if autoreturn applies.
+
+        If keys were handled while the items were loading or scanned, the user
+        may have changed the query or the selection already: autoreturn is
+        skipped and the preselection is added to the selection.
+        """
+        if self._input_handled:
+            self._calculate_preselection(merge=True)
+            return None
         autoreturn_value = self._autoreturn()
         if autoreturn_value is not None:
             return autoreturn_value
         self._calculate_preselection()
-        _init_curses()
-        while True:
-            self.calculate_filtered()
-            # prepare window content
-            height, width = _base_window(
-                self.stdscr,
-                self.title,
-                (
-                    f"{len(self.selected)} selected | "
-                    f"{len(self.filtered)} matches | ↑↓ = navigate | "
-                    f"{'TAB = toggle | ' if self.multi else ''}"
-                    "ENTER = accept | ESC = abort | F1 = help"
-                ),
-                self.color_theme,
-            )
+        return None
+
+    def _busy(self) -> bool:
+        """
+        Check if the :attr:`~curses_fzf.FuzzyFinder.filtered` list is not
+        final yet, because items are loading, scanned in the background or
+        arrived since the last update.
+        """
+        if self.loading or self.scanning:
+            return True
+        last_inputs = self._submitted_filter_inputs if self.background_scoring else self._last_filter_inputs
+        return not _same_filter_inputs(last_inputs, self._filter_inputs())
+
+    def _read_key(self) -> Optional[UnicodeKey]:
+        """
+        Wait for the next key.
+        While busy (see :meth:`~curses_fzf.FuzzyFinder._busy`), wait only up to
+        ``POLL_INTERVAL_MS``, so new (partial) results get rendered.
+        """
+        if self.stdscr is None:
+            return None
+        preview_pending = self._preview_loader is not None and self._preview_loader.pending
+        self.stdscr.timeout(POLL_INTERVAL_MS if self._busy() or preview_pending else -1)
+        try:
+            return self.stdscr.get_wch()
+        except curses.error:
+            # no input within the timeout
+            return None
+        finally:
+            self.stdscr.timeout(-1)
+
+    def _read_keys(self) -> List[UnicodeKey]:
+        """
+        Wait for the next key (see :meth:`~curses_fzf.FuzzyFinder._read_key`)
+        and read all keys that are already pending (e.g. pasted text or key
+        repeat), up to ``MAX_TYPEAHEAD`` keys.
+        """
+        key = self._read_key()
+        if key is None or self.stdscr is None:
+            return []
+        keys = [key]
+        self.stdscr.nodelay(True)
+        try:
+            while len(keys) < MAX_TYPEAHEAD:
+                keys.append(self.stdscr.get_wch())
+        except curses.error:
+            # no more pending input
+            pass
+        finally:
+            self.stdscr.nodelay(False)
+        return keys
+
+    def _handle_typeahead(self) -> None:
+        """
+        Handle the pending keys in order, so a whole batch of keys causes only
+        one rescore and one render.
+        Keys editing the query are applied together, but a following key that
+        acts on the :attr:`~curses_fzf.FuzzyFinder.filtered` list (e.g.
+        navigation) is held until the changed query was rescored.
+        With :attr:`~curses_fzf.FuzzyFinder.background_scoring`, it waits for
+        the final result of the scan, not for the partial results shown meanwhile.
+        """
+        if self._typeahead_on_hold():
+            return
+        self._typeahead_held = False
+        query = self.query
+        while self._typeahead and not self.return_selection_now:
+            key = self._typeahead[0]
+            if self.query != query and not self._edits_query(key):
+                self._typeahead_held = True
+                return
+            self._typeahead.popleft()
+            self._handle_input(key)
+
+    def _typeahead_on_hold(self) -> bool:
+        """
+        Check if the held typeahead still waits for a background scan to finish.
+        """
+        return self._typeahead_held and self.scanning
+
+    def _edits_query(self, key: UnicodeKey) -> bool:
+        """
+        Check if the key is a printable character added to the query.
+        """
+        return isinstance(key, str) and key.isprintable() and ord(key) not in self.keymap
+
+    def _render_frame(self) -> None:
+        """
+        Render the main window and the preview window.
+        """
+        if self.stdscr is None:
+            return
+        # prepare window content in a frame buffer
+        render_start = time.perf_counter()
+        self._frame = Frame(self.stdscr)
+        try:
+            height, width = _base_window(self._frame, self.title, self._footer(), self.color_theme)
             self._render_query(width)
-            self._render_no_match(width)
+            if not self.scanning:
+                self._render_no_match(width)
             self._render_viewport(height, width)
             sub_win = self._render_preview(height, width)
-            # render windows to screen
-            self.stdscr.refresh()
-            if sub_win is not None:
-                sub_win.refresh()
-            # read input
-            self._handle_input(self.stdscr.get_wch())
-            if self.return_selection_now:
-                return self._get_return_value()
+            preview = self._preview_geometry if sub_win is not None else None
+            if preview != self._last_preview:
+                # the preview window was hidden, shown or moved, repaint the
+                # whole main window, since its rows don't differ underneath
+                self._last_frame = None
+                self._last_preview = preview
+            # rewrite only the rows that changed since the last frame
+            self._frame_stats.rows_rewritten += self._frame.flush(self._last_frame)
+            self._last_frame = self._frame
+        finally:
+            self._frame = None
+        # render both windows to the screen with a single update,
+        # refresh() is noutrefresh() followed by curses.doupdate()
+        (sub_win if sub_win is not None else self.stdscr).refresh()
+        frame = self._frame_stats
+        frame.render += time.perf_counter() - render_start - frame.preview
+
+    def _finish_frame(self) -> None:
+        """
+        Record the timings and counters of the rendered frame in
+        :attr:`~curses_fzf.FuzzyFinder.stats` and pass them to the
+        :attr:`~curses_fzf.FuzzyFinder.on_frame` callback.
+        """
+        frame = self._frame_stats
+        hits, misses = self._cache_counts
+        self._cache_counts = (self.query_cache.hits, self.query_cache.misses)
+        frame.cache_hits = self._cache_counts[0] - hits
+        frame.cache_misses = self._cache_counts[1] - misses
+        self.stats.record(frame)
+        self._frame_stats = FrameStats()
+        if self.on_frame is not None:
+            self.on_frame(frame)
+
+    def _main_loop(self, stdscr: curses.window) -> List[Any]:
+        self.stdscr = stdscr
+        first_filtered_pending = True
+        curses_initialized = False
+        try:
+            while True:
+                if self._reader is not None and self._reader.error is not None:
+                    raise self._reader.error
+                filter_start = time.perf_counter()
+                if self.background_scoring:
+                    self._update_filtered_in_background()
+                else:
+                    self._update_filtered()
+                self._frame_stats.filter += time.perf_counter() - filter_start
+                # autoreturn and preselection need all items to be loaded and scored
+                if first_filtered_pending and not self._busy():
+                    first_filtered_pending = False
+                    autoreturn_value = self._on_first_filtered()
+                    if autoreturn_value is not None:
+                        return autoreturn_value
+                if not curses_initialized:
+                    _init_curses()
+                    curses_initialized = True
+                self._render_frame()
+                self._finish_frame()
+                # read input, unless keys are left from the last batch, keys
+                # read while the typeahead is held are queued behind it
+                if not self._typeahead or self._typeahead_on_hold():
+                    self._typeahead.extend(self._read_keys())
+                input_start = time.perf_counter()
+                self._handle_typeahead()
+                self._frame_stats.input += time.perf_counter() - input_start
+                if self.return_selection_now:
+                    return self._get_return_value()
+        finally:
+            if self._background is not None:
+                self._background.close()
+                self._background = None
+            if self._preview_loader is not None:
+                self._preview_loader.close()
+                self._preview_loader = None
+            self._preview_window = None
+            # the next find() draws on a new screen
+            self._last_frame = None
+            self._last_preview = None
@@ -1,8 +1,14 @@
-import curses
-import curses.textpad
+from __future__ import annotations
+
 from typing import Any, Dict, Tuple
 from .colors import ColorTheme
 
+try:
+    import curses
+    import curses.textpad
+except ImportError:  # pragma: no cover
+    curses = None  # type: ignore[assignment]
+
 
 def _base_window(stdscr: curses.window, title: str, footer: str, color_theme: ColorTheme) -> Tuple[int, int]:
     """
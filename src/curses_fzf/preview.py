@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+from .background import BackgroundWorker, Cancelled, Publish
+from .cache import LRUCache
+from .colors import ColorTheme
+from .scoring import ScoringResult
+from .selection import default_key
+
+PREVIEW_DEBOUNCE = 0.05
+"""
+Seconds the cursor has to rest on an item before its preview is loaded.
+"""
+PREVIEW_TIMEOUT = 2.0
+"""
+Seconds to wait for a preview before giving up on it.
+"""
+PREVIEW_TIMED_OUT = "preview timed out"
+
+Preview = Callable[[Optional[Any], ColorTheme, Any, ScoringResult], Optional[str]]
+
+_NOTHING = object()
+
+
+class PreviewLoader:
+    """
+    Calls a text returning preview function on a background thread, so a slow
+    preview doesn't stall the navigation in :class:`~curses_fzf.FuzzyFinder`.
+
+    The texts are cached per item in an :class:`~curses_fzf.cache.LRUCache`.
+    A preview is only loaded once the cursor rested on the item for ``debounce``
+    seconds, then the ``prefetch`` neighbouring items (below and above) are
+    loaded as well.
+    The preview function is called with ``None`` instead of a window, because
+    curses can't be used from another thread.
+    A preview taking longer than ``timeout`` seconds is cached as
+    ``"preview timed out"`` and left running on an abandoned thread.
+
+    Args:
+        preview (Preview): The preview function, see :meth:`~curses_fzf.FuzzyFinder.preview`.
+        color_theme (ColorTheme): The color theme passed to the preview function.
+        cache_size (int): The maximum number of cached previews.
+            Default is ``100``.
+        prefetch (int): The number of neighbouring items to load in each direction.
+            Default is ``0``.
+        key (Callable[[Any], Hashable]): The function to get the cache key of an item.
+            Default is :func:`~curses_fzf.selection.default_key`.
+        debounce (float): See ``PREVIEW_DEBOUNCE``.
+        timeout (float): See ``PREVIEW_TIMEOUT``.
+    """
+
+    def __init__(self,
+                 preview: Preview,
+                 color_theme: ColorTheme,
+                 cache_size: int = 100,
+                 prefetch: int = 0,
+                 key: Callable[[Any], Hashable] = default_key,
+                 debounce: float = PREVIEW_DEBOUNCE,
+                 timeout: float = PREVIEW_TIMEOUT,
+                 ) -> None:
+        self.preview: Preview = preview
+        self.color_theme: ColorTheme = color_theme
+        self.prefetch: int = prefetch
+        self.key: Callable[[Any], Hashable] = key
+        self.debounce: float = debounce
+        self.timeout: float = timeout
+        self.cache: LRUCache[Hashable, str] = LRUCache(cache_size)
+        """
+        The cached preview texts by item key.
+        """
+        self._worker: Optional[BackgroundWorker] = None
+        self._wanted: Any = _NOTHING
+        """
+        Private: The key of the item waiting for its preview, if any.
+        """
+        self._wanted_since: float = 0.0
+        self._submitted_at: Optional[float] = None
+
+    @property
+    def pending(self) -> bool:
+        """
+        ``True`` while a preview is waited for, so the caller keeps polling
+        :meth:`~PreviewLoader.get`.
+        """
+        return self._wanted is not _NOTHING
+
+    def get(self, entries: Sequence[Tuple[Any, ScoringResult]], index: int) -> Optional[str]:
+        """
+        Get the preview text of ``entries[index]``, loading it (and its
+        neighbours) in the background if it isn't cached.
+
+        Returns:
+            Optional[str]: The preview text, ``None`` while it is loading.
+        """
+        self._collect()
+        key = self.key(entries[index][0])
+        text = self.cache.get(key)
+        if text is not None:
+            if self._wanted == key:
+                self._wanted = _NOTHING
+            if self.prefetch and (self._worker is None or not self._worker.running):
+                self._submit(entries, index)
+            return text
+        now = time.monotonic()
+        if self._wanted is _NOTHING or self._wanted != key:
+            # the cursor moved, wait until it rests on the item
+            self._wanted = key
+            self._wanted_since = now
+            self._submitted_at = None
+        elif self._submitted_at is None:
+            if now - self._wanted_since >= self.debounce:
+                self._submit(entries, index)
+                self._submitted_at = now
+        elif now - self._submitted_at >= self.timeout:
+            self.cache.put(key, PREVIEW_TIMED_OUT)
+            self._wanted = _NOTHING
+            self._abandon()
+            return PREVIEW_TIMED_OUT
+        return None
+
+    def clear(self) -> None:
+        """
+        Drop all cached previews and the preview waited for.
+        """
+        self.cache.clear()
+        self._wanted = _NOTHING
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def close(self) -> None:
+        """
+        Stop the background thread.
+        """
+        self._wanted = _NOTHING
+        self._abandon()
+
+    def _abandon(self) -> None:
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+    def _submit(self, entries: Sequence[Tuple[Any, ScoringResult]], index: int) -> None:
+        """
+        Load the previews of ``entries[index]`` and its ``prefetch``
+        neighbours, that aren't cached yet.
+        """
+        todo = []
+        for neighbour in _neighbours(index, self.prefetch, len(entries)):
+            key = self.key(entries[neighbour][0])
+            if key not in self.cache:
+                todo.append((key, entries[neighbour]))
+        if not todo:
+            return
+        if self._worker is None:
+            self._worker = BackgroundWorker("curses-fzf-preview")
+
+        def job(cancelled: Cancelled, publish: Publish) -> List[Tuple[Hashable, str]]:
+            loaded: List[Tuple[Hashable, str]] = []
+            for key, (item, score_result) in todo:
+                if cancelled():
+                    break
+                loaded.append((key, self.preview(None, self.color_theme, item, score_result) or ""))
+                publish(list(loaded))
+            return loaded
+        self._worker.submit(job)
+
+    def _collect(self) -> None:
+        """
+        Cache the previews loaded in the background so far.
+        """
+        if self._worker is None:
+            return
+        polled = self._worker.poll()
+        if polled is not None:
+            for key, text in polled[1]:
+                self.cache.put(key, text)
+
+
+def _neighbours(index: int, distance: int, length: int) -> List[int]:
+    """
+    The index followed by the valid indices up to ``distance`` below and above it,
+    nearest first.
+    """
+    indices = [index]
+    for offset in range(1, distance + 1):
+        indices.extend(i for i in (index + offset, index - offset) if 0 <= i < length)
+    return indices
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from functools import cached_property, lru_cache
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from .candidates import RE_WORD, char_mask
+
+
+class CompiledQuery(str):
+    """
+    A :attr:`~curses_fzf.FuzzyFinder.query` string that caches everything the
+    built-in scoring functions derive from it, built once per
+    :meth:`~curses_fzf.FuzzyFinder.calculate_filtered` call and passed to the
+    :meth:`~curses_fzf.FuzzyFinder.score` function for all candidates.
+
+    Since it is a :py:obj:`str`, custom scoring functions can treat it as the
+    plain query.
+    """
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # don't pickle the cached values, e.g. when sent to worker processes
+        return (CompiledQuery, (str(self),))
+
+    @classmethod
+    def compile(cls, query: str) -> CompiledQuery:
+        """
+        The given query if it is compiled already, otherwise the compiled query
+        (the most recent ones are cached).
+        """
+        if isinstance(query, CompiledQuery):
+            return query
+        return _compile(query)
+
+    @cached_property
+    def lowered(self) -> str:
+        """
+        The query converted to lowercase.
+        """
+        return self.lower()
+
+    @cached_property
+    def words_with_index(self) -> List[Tuple[str, int]]:
+        """
+        The :attr:`~CompiledQuery.lowered` string split on whitespaces.
+        Each element is a tuple with the word and its starting index.
+        """
+        return [(m.group(), m.start()) for m in RE_WORD.finditer(self.lowered)]
+
+    @cached_property
+    def mask(self) -> int:
+        """
+        The :func:`~curses_fzf.candidates.char_mask` of the :attr:`~CompiledQuery.lowered` string.
+        """
+        return char_mask(self.lowered)
+
+    @cached_property
+    def plan(self) -> Tuple[Tuple[_Term, ...], ...]:
+        """
+        The query parsed as extended search syntax (see :func:`~curses_fzf.scoring_extended`):
+        groups of terms, all groups need to match, any term of a group needs to match.
+        Ordered from the cheapest to the most expensive terms.
+        """
+        return _extended_plan(self.lowered)
+
+
+@lru_cache(maxsize=64)
+def _compile(query: str) -> CompiledQuery:
+    return CompiledQuery(query)
+
+
+class _Term(NamedTuple):
+    """
+    A single term of an extended search query, see :func:`~curses_fzf.scoring_extended`.
+    """
+    kind: str
+    """
+    ``"fuzzy"``, ``"exact"``, ``"prefix"``, ``"suffix"`` or ``"equal"``.
+    """
+    text: str
+    inverse: bool
+
+    @property
+    def cost(self) -> int:
+        """
+        Negations and exact terms are cheap substring tests, fuzzy terms are scored.
+        """
+        if self.inverse:
+            return 0
+        return 2 if self.kind == "fuzzy" else 1
+
+
+def _parse_term(token: str) -> Optional[_Term]:
+    """
+    Parse a single lowercase token of an extended search query,
+    ``None`` if nothing remains to match.
+    """
+    inverse = token.startswith("!")
+    if inverse:
+        token = token[1:]
+    kind = "exact" if inverse else "fuzzy"
+    if token.startswith("'"):
+        kind = "exact"
+        token = token[1:]
+    elif token.startswith("^"):
+        kind = "prefix"
+        token = token[1:]
+    if token.endswith("$"):
+        kind = "equal" if kind == "prefix" else "suffix"
+        token = token[:-1]
+    if not token:
+        return None
+    return _Term(kind, token, inverse)
+
+
+def _extended_plan(query_lower: str) -> Tuple[Tuple[_Term, ...], ...]:
+    """
+    Compile a lowercase extended search query into groups of terms, all
+    groups need to match, any term of a group needs to match.
+    The cheapest terms are tested first, within a group and between groups.
+    """
+    groups: List[List[_Term]] = []
+    join = False
+    for token in query_lower.split():
+        if token == "|":
+            join = bool(groups)
+            continue
+        term = _parse_term(token)
+        if term is None:
+            continue
+        if join:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        join = False
+    ordered = [tuple(sorted(group, key=lambda term: term.cost)) for group in groups]
+    return tuple(sorted(ordered, key=lambda group: max(term.cost for term in group)))
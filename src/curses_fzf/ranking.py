@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple, Union, overload
+
+from .cache import LRUCache
+from .scoring import ScoringResult
+
+Match = Tuple[int, float]
+"""
+A matched item as ``(index in all_items, score)``.
+"""
+
+Resolve = Callable[[int], Tuple[Any, ScoringResult]]
+"""
+A function returning the item at an index of all_items with its scoring result.
+"""
+
+RESOLVED_CACHE_SIZE: int = 256
+"""
+The number of ``(item, ScoringResult)`` tuples a :class:`RankedMatches`
+keeps, e.g. the rows on screen and their neighbours.
+"""
+
+
+def score_value(score_result: Any) -> Any:
+    """
+    The numeric score of a :class:`~curses_fzf.ScoringResult` (or of a plain
+    number returned by a scoring function).
+    """
+    return getattr(score_result, "score", score_result)
+
+
+class Matches:
+    """
+    The matches of a scan in ascending index order, stored in two arrays
+    (16 bytes per match): neither the items nor their candidates and scoring
+    results are kept, see :class:`RankedMatches`.
+    """
+
+    def __init__(self) -> None:
+        self.indices: array[int] = array("q")
+        """
+        The indices of the matched items in ascending order.
+        """
+        self.scores: array[float] = array("d")
+        """
+        The score of each matched item.
+        """
+
+    def append(self, index: int, score: float) -> None:
+        self.indices.append(index)
+        self.scores.append(score)
+
+    def extend(self, indices: Sequence[int], score: float) -> None:
+        """
+        Add all given indices with the same score.
+        """
+        self.indices.extend(indices)
+        self.scores.extend(array("d", [score]) * len(indices))
+
+    def copy(self) -> Matches:
+        copy = Matches()
+        copy.indices = self.indices[:]
+        copy.scores = self.scores[:]
+        return copy
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[Match]:
+        return zip(self.indices, self.scores)
+
+
+class BoundedMatches:
+    """
+    Collects matches in ascending index order, but keeps only the
+    ``max_matches`` best ones in a heap, so memory stays bounded on broad queries.
+
+    Args:
+        max_matches (int): The maximum number of matches to keep.
+    """
+
+    def __init__(self, max_matches: int) -> None:
+        self.max_matches: int = max_matches
+        self.truncated: bool = False
+        """
+        ``True`` if any match was dropped.
+        """
+        self._heap: List[Tuple[float, int]] = []
+
+    def append(self, index: int, score: float) -> None:
+        # the heap's root is the worst match: the lowest score and, on equal
+        # scores, the highest index
+        entry = (score, -index)
+        if len(self._heap) < self.max_matches:
+            heapq.heappush(self._heap, entry)
+        else:
+            self.truncated = True
+            if self.max_matches > 0 and entry > self._heap[0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def extend(self, indices: Iterable[int], score: float) -> None:
+        """
+        Add all given indices with the same score.
+        """
+        for index in indices:
+            self.append(index, score)
+
+    def matches(self) -> Matches:
+        """
+        The kept matches in ascending index order.
+        """
+        matches = Matches()
+        for score, index in sorted(self._heap, key=lambda entry: -entry[1]):
+            matches.append(-index, score)
+        return matches
+
+
+class RankedMatches(Sequence):  # type: ignore[type-arg]
+    """
+    A lazily ranked, read-only list of ``(item, ScoringResult)`` tuples, used for
+    :attr:`~curses_fzf.FuzzyFinder.filtered`.
+
+    Only the best ``top_k`` matches are ranked up front using a heap, instead of
+    sorting all matches (``0`` ranks all of them).
+    Accessing an index past the ranked part doubles it, iterating ranks everything.
+    The order is the same as a full sort: from high to low score, ties keep the
+    original order of the items.
+
+    The ``(item, ScoringResult)`` tuples are created by ``resolve`` when they
+    are accessed, only the last :data:`RESOLVED_CACHE_SIZE` ones are kept.
+    Use :meth:`~RankedMatches.items` if only the items are needed, e.g. to
+    select all of them, it doesn't compute any scoring results.
+
+    Args:
+        matches (Matches): The matches to rank.
+        top_k (int): The number of matches to rank up front.
+        resolve (Resolve): The function to get the item and scoring result of
+            a matched index.
+        items (Sequence[Any]): The items the matched indices refer to.
+    """
+
+    def __init__(self, matches: Matches, top_k: int, resolve: Resolve, items: Sequence[Any]) -> None:
+        self._matches: Matches = matches
+        self._resolve: Resolve = resolve
+        self._items: Sequence[Any] = items
+        self._resolved: LRUCache[int, Tuple[Any, ScoringResult]] = LRUCache(RESOLVED_CACHE_SIZE)
+        scores = matches.scores
+        self._order: Union[range, array[int]] = array("q")
+        """
+        Private: The positions in ``matches`` of the ranked part, best first.
+        """
+        if scores and min(scores) == max(scores):
+            # e.g. the empty query: the index order is the ranking
+            self._order = range(len(scores))
+        else:
+            self._rank(top_k if top_k > 0 else len(scores))
+
+    def _rank(self, count: int) -> None:
+        """
+        Rank at least the best ``count`` matches.
+        """
+        count = max(1, count)
+        scores = self._matches.scores
+        positions = range(len(scores))
+        # both are stable, so equal scores keep the index order
+        if count * 2 >= len(scores):
+            self._order = array("q", sorted(positions, key=scores.__getitem__, reverse=True))
+        else:
+            self._order = array("q", heapq.nlargest(count, positions, key=scores.__getitem__))
+
+    @property
+    def ranked_count(self) -> int:
+        """
+        The number of matches that are already ranked.
+        """
+        return len(self._order)
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    @overload
+    def __getitem__(self, index: int) -> Tuple[Any, ScoringResult]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Tuple[Any, ScoringResult]]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ranked matches index out of range")
+        entry = self._resolved.get(index)
+        if entry is None:
+            if index >= len(self._order):
+                self._rank(max(2 * len(self._order), index + 1))
+            entry = self._resolve(self._matches.indices[self._order[index]])
+            self._resolved.put(index, entry)
+        return entry
+
+    def __iter__(self) -> Iterator[Tuple[Any, ScoringResult]]:
+        self._rank_all()
+        for index in range(len(self)):
+            yield self[index]
+
+    def _rank_all(self) -> None:
+        if len(self._order) < len(self._matches):
+            self._rank(len(self._matches))
+
+    def items(self) -> Iterator[Any]:
+        """
+        Iterate over the matched items only, in ranking order.
+        Unlike iterating over the ``(item, ScoringResult)`` tuples, no scoring
+        results are computed.
+        """
+        self._rank_all()
+        items, indices = self._items, self._matches.indices
+        return (items[indices[position]] for position in self._order)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, RankedMatches)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RankedMatches({len(self._order)}/{len(self._matches)} ranked)"
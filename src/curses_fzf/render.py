@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import curses
+except ImportError:  # pragma: no cover
+    curses = None  # type: ignore[assignment]
+
+Segment = Tuple[str, int, Any, int, int]
+"""
+A drawing operation on a row as ``(kind, x, text or character, attributes, length)``.
+"""
+
+
+class Frame:
+    """
+    A frame buffer with the subset of the :py:obj:`curses.window` drawing API
+    used by :class:`~curses_fzf.FuzzyFinder`.
+    Drawing operations are recorded per row instead of being applied to the
+    window, so :meth:`~Frame.flush` can compare them to the previous frame and
+    only rewrite the rows that changed.
+
+    Args:
+        window (curses.window): The window the frame is flushed to.
+    """
+
+    def __init__(self, window: curses.window) -> None:
+        self.window: curses.window = window
+        self.size: Any = window.getmaxyx()
+        self.rows: Dict[int, List[Segment]] = {}
+
+    def getmaxyx(self) -> Any:
+        return self.size
+
+    def clear(self) -> None:
+        self.rows.clear()
+
+    def erase(self) -> None:
+        self.rows.clear()
+
+    def addstr(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        self.rows.setdefault(y, []).append(("str", x, text, attr, 0))
+
+    def addch(self, y: int, x: int, ch: Any, attr: int = 0) -> None:
+        self.rows.setdefault(y, []).append(("ch", x, ch, attr, 0))
+
+    def hline(self, y: int, x: int, ch: Any, n: int) -> None:
+        self.rows.setdefault(y, []).append(("hline", x, ch, 0, n))
+
+    def vline(self, y: int, x: int, ch: Any, n: int) -> None:
+        for row in range(y, y + n):
+            self.addch(row, x, ch)
+
+    def flush(self, previous: Optional[Frame]) -> int:
+        """
+        Rewrite the rows of the window that differ from the previous frame
+        (all rows if there is none or the size changed) and mark the window
+        for the next :py:func:`curses.doupdate`.
+
+        Returns:
+            int: The number of rewritten rows.
+        """
+        window = self.window
+        if previous is None or previous.size != self.size:
+            window.erase()
+            previous_rows: Dict[int, List[Segment]] = {}
+        else:
+            previous_rows = previous.rows
+        rewritten = 0
+        for y in sorted(set(self.rows) | set(previous_rows)):
+            row = self.rows.get(y, [])
+            if row == previous_rows.get(y):
+                continue
+            rewritten += 1
+            window.move(y, 0)
+            window.clrtoeol()
+            for kind, x, payload, attr, length in row:
+                try:
+                    if kind == "str":
+                        window.addstr(y, x, payload, attr)
+                    elif kind == "ch":
+                        window.addch(y, x, payload, attr)
+                    else:
+                        window.hline(y, x, payload, length)
+                except curses.error:
+                    # writing to the bottom right corner moves the cursor
+                    # out of the window, the text is drawn anyway
+                    pass
+        window.noutrefresh()
+        return rewritten
+
+
+def highlight_runs(length: int, spans: Iterable[Tuple[int, int]]) -> List[Tuple[int, int, bool]]:
+    """
+    Split the first ``length`` characters of a line into runs of plain and
+    highlighted characters, so each run can be drawn with a single call.
+
+    Args:
+        length (int): The number of visible characters.
+        spans (Iterable[Tuple[int, int]]): The highlighted ``(start, length)``
+            spans, e.g. :attr:`~curses_fzf.ScoringResult.spans`, in any order
+            and possibly overlapping.
+
+    Returns:
+        List[Tuple[int, int, bool]]: ``(start, end, highlighted)`` runs covering
+        ``0`` to ``length`` without gaps.
+    """
+    runs: List[Tuple[int, int, bool]] = []
+    position = 0
+    for start, span_length in sorted(spans):
+        end = min(start + span_length, length)
+        start = max(start, position)
+        if start >= end:
+            continue
+        if start > position:
+            runs.append((position, start, False))
+        if runs and runs[-1][2] and runs[-1][1] == start:
+            # merge adjacent and overlapping spans
+            runs[-1] = (runs[-1][0], end, True)
+        else:
+            runs.append((start, end, True))
+        position = end
+    if position < length:
+        runs.append((position, length, False))
+    return runs
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import re
-from typing import Optional, List, Tuple, Set
+import threading
+from typing import Iterable, Iterator, Optional, List, Tuple, Set, Union
 
-RE_WORD = re.compile(r"\S+")
+from .candidates import RE_WORD, SEPARATORS, _is_boundary
+from .query import CompiledQuery, _Term
 
 
 class ScoringResult():
@@ -33,13 +34,16 @@ class ScoringResult():
             from the :attr:`FuzzyFinder.all_items` list.
     """
 
-    SEPARATORS: Set[str] = set(" \t/\\_-.:;|,()[]{}<>\"'`")
+    SEPARATORS: Set[str] = SEPARATORS
     """
     A set of characters that commonly indicate "word boundaries" in generic text
     and paths.
     Those are chosen similarly to fzf's original heuristics.
     """
 
+    __slots__ = ("query", "candidate", "score", "_query_lower", "_query_words_with_index",
+                 "_candidate_lower", "_candidate_words_with_index", "_matches", "_spans", "_already_matched")
+
     def __init__(self, query: str, candidate: str) -> None:
         self.query: str = query
         """
@@ -47,51 +51,99 @@ class ScoringResult():
         This is the :attr:`FuzzyFinder.query` string entered by the user.
         """
 
-        self.query_lower: str = query.lower()
+        self.candidate: str = candidate
         """
-        The :attr:`~ScoringResult.query` string converted to lowercase.
+        The original candidate string parameter as given to the constructor.
+        This is a single item's :meth:`~FuzzyFinder.display` representation from
+        the :attr:`FuzzyFinder.all_items` list.
         """
 
-        self.query_words_with_index: List[Tuple[str, int]] = [
-            (m.group(), m.start()) for m in RE_WORD.finditer(self.query_lower)]
+        self.score: int = 0
         """
-        The :attr:`~ScoringResult.query_lower` string split on whitespaces.
-        Each element is a tuple with the word and its starting index in the
-        original :attr:`~ScoringResult.query` string.
+        The resulting fuzzy score.
+        This is the field that :class:`~curses_fzf.FuzzyFinder` will take into
+        account when it decides which items to show.
+        A score of ``0`` will filter the item out of the resulting :attr:`FuzzyFinder.filtered` list.
+        Remaining items are sorted from high to low score.
+        The :meth:`~ScoringResult.add_match` method is meant to add to score,
+        but feel free to directly manipulate this field as your scoring logic requires.
         """
 
-        self.candidate: str = candidate
+        # everything else is computed on first access, most candidates are
+        # rejected before needing any of it
+        self._query_lower: Optional[str] = None
+        self._query_words_with_index: Optional[List[Tuple[str, int]]] = None
+        self._candidate_lower: Optional[str] = None
+        self._candidate_words_with_index: Optional[List[Tuple[str, int]]] = None
+        # spans added by add_span are kept as (start, length) tuples, they are
+        # only converted to (start, substring) tuples when matches is read
+        self._matches: Optional[List[Tuple[int, str]]] = None
+        self._spans: Optional[List[Tuple[int, int]]] = None
+        self._already_matched: Optional[Set[int]] = None
+
+    @property
+    def query_lower(self) -> str:
         """
-        The original candidate string parameter as given to the constructor.
-        This is a single item's :meth:`~FuzzyFinder.display` representation from
-        the :attr:`FuzzyFinder.all_items` list.
+        The :attr:`~ScoringResult.query` string converted to lowercase.
         """
+        if self._query_lower is None:
+            self._query_lower = _lowered(self.query)
+        return self._query_lower
+
+    @query_lower.setter
+    def query_lower(self, value: str) -> None:
+        self._query_lower = value
 
-        self.candidate_lower: str = candidate.lower()
+    @property
+    def query_words_with_index(self) -> List[Tuple[str, int]]:
+        """
+        The :attr:`~ScoringResult.query_lower` string split on whitespaces.
+        Each element is a tuple with the word and its starting index in the
+        original :attr:`~ScoringResult.query` string.
+        """
+        if self._query_words_with_index is None:
+            query = self.query
+            if isinstance(query, CompiledQuery):
+                self._query_words_with_index = query.words_with_index
+            else:
+                self._query_words_with_index = [(m.group(), m.start()) for m in RE_WORD.finditer(self.query_lower)]
+        return self._query_words_with_index
+
+    @query_words_with_index.setter
+    def query_words_with_index(self, value: List[Tuple[str, int]]) -> None:
+        self._query_words_with_index = value
+
+    @property
+    def candidate_lower(self) -> str:
         """
         The :attr:`~ScoringResult.candidate` string converted to lowercase.
         """
+        if self._candidate_lower is None:
+            self._candidate_lower = self.candidate.lower()
+        return self._candidate_lower
 
-        self.candidate_words_with_index: List[Tuple[str, int]] = [
-            (m.group(), m.start()) for m in RE_WORD.finditer(self.candidate_lower)]
+    @candidate_lower.setter
+    def candidate_lower(self, value: str) -> None:
+        self._candidate_lower = value
+
+    @property
+    def candidate_words_with_index(self) -> List[Tuple[str, int]]:
         """
         The :attr:`~ScoringResult.candidate_lower` string split on whitespaces.
         Each element is a tuple with the word and its starting index in the
         original :attr:`~ScoringResult.candidate` string.
         """
+        if self._candidate_words_with_index is None:
+            self._candidate_words_with_index = [
+                (m.group(), m.start()) for m in RE_WORD.finditer(self.candidate_lower)]
+        return self._candidate_words_with_index
 
-        self.score: int = 0
-        """
-        The resulting fuzzy score.
-        This is the field that :class:`~curses_fzf.FuzzyFinder` will take into
-        account when it decides which items to show.
-        A score of ``0`` will filter the item out of the resulting :attr:`FuzzyFinder.filtered` list.
-        Remaining items are sorted from high to low score.
-        The :meth:`~ScoringResult.add_match` method is meant to add to score,
-        but feel free to directly manipulate this field as your scoring logic requires.
-        """
+    @candidate_words_with_index.setter
+    def candidate_words_with_index(self, value: List[Tuple[str, int]]) -> None:
+        self._candidate_words_with_index = value
 
-        self.matches: List[Tuple[int, str]] = []
+    @property
+    def matches(self) -> List[Tuple[int, str]]:
         """
         A list of tuples representing each substring match of the :attr:`~ScoringResult.query`
         in the :attr:`~ScoringResult.candidate` string.
@@ -101,11 +153,57 @@ class ScoringResult():
         The :meth:`~ScoringResult.add_match` method is meant to add to matches,
         but feel free to directly manipulate this field as your scoring logic requires.
         """
-
-        self._already_matched_words: Set[int] = set()
+        if self._spans:
+            self._materialize_spans()
+        if self._matches is None:
+            self._matches = []
+        return self._matches
+
+    @matches.setter
+    def matches(self, value: List[Tuple[int, str]]) -> None:
+        self._matches = value
+        self._spans = None
+
+    @property
+    def spans(self) -> List[Tuple[int, int]]:
+        """
+        The :attr:`~ScoringResult.matches` as ``(start, length)`` tuples,
+        without slicing the matched substrings out of the :attr:`~ScoringResult.candidate`.
+        Setting it replaces all matches.
+        """
+        if self._matches:
+            return [(start, len(match)) for start, match in self.matches]
+        if self._spans is None:
+            self._spans = []
+        return self._spans
+
+    @spans.setter
+    def spans(self, value: List[Tuple[int, int]]) -> None:
+        self._spans = value
+        self._matches = None
+
+    def _materialize_spans(self) -> None:
+        """
+        Convert the pending spans to (start, substring) tuples in :attr:`~ScoringResult.matches`.
+        """
+        candidate = self.candidate
+        if self._matches is None:
+            self._matches = []
+        self._matches.extend((start, candidate[start:start + length]) for start, length in self._spans or ())
+        self._spans = None
+
+    @property
+    def _already_matched_words(self) -> Set[int]:
         """
         A set of indices of candidate words that have already been matched to a query word.
         """
+        if self._already_matched is None:
+            self._already_matched = set()
+        return self._already_matched
+
+    @_already_matched_words.setter
+    def _already_matched_words(self, value: Set[int]) -> None:
+        self._already_matched = value
 
     def __int__(self) -> int:
         return int(self.score)
@@ -154,6 +252,26 @@ class ScoringResult():
         self.score += score
         self.matches.append((position, match))
 
+    def add_span(self, position: int, length: int, score: int) -> None:
+        """
+        Like :meth:`~ScoringResult.add_match`, but the match is given as its
+        length, the substring is only sliced out of the :attr:`~ScoringResult.candidate`
+        when :attr:`~ScoringResult.matches` is read.
+
+        Args:
+            position (int): The starting index of the match in the original
+                :attr:`~ScoringResult.candidate` string.
+            length (int): The length of the match.
+            score (int): This value is added to :attr:`ScoringResult.score`.
+        """
+        self.score += score
+        if self._matches:
+            self._matches.append((position, self.candidate[position:position + length]))
+        else:
+            if self._spans is None:
+                self._spans = []
+            self._spans.append((position, length))
+
     def find_best_word_match(self, word: str) -> Optional[Tuple[str, int, int, int]]:
         """
         Find the best match for the given query word among the :attr:`~ScoringResult.candidate_words_with_index`.
@@ -228,19 +346,7 @@ class ScoringResult():
         Returns:
             bool: ``True`` if the position is a boundary, ``False`` otherwise.
         """
-        if position <= 0:
-            return True
-        prev = self.candidate[position - 1]
-        cur = self.candidate[position]
-        if prev in self.SEPARATORS:
-            return True
-        if prev.islower() and cur.isupper():
-            return True
-        if prev.isalpha() and cur.isdigit():
-            return True
-        if prev.isdigit() and cur.isalpha():
-            return True
-        return False
+        return _is_boundary(self.candidate, position, self.SEPARATORS)
 
     def check_query_empty(self) -> bool:
         """
@@ -276,6 +382,25 @@ class ScoringResult():
         result.append((start, self.candidate[start:prev + 1]))
         return result
 
+    def merge_positions_to_spans(self, positions: List[int]) -> List[Tuple[int, int]]:
+        """
+        Like :meth:`~ScoringResult.merge_positions_to_substrings`, but returns
+        (start, length) tuples for :attr:`~ScoringResult.spans`.
+        Example: positions [3,4,5, 10,11] -> [(3, 3), (10, 2)]
+        """
+        if not positions:
+            return []
+        result = []
+        start = prev = positions[0]
+        for position in positions[1:]:
+            if position == prev + 1:
+                prev = position
+                continue
+            result.append((start, prev + 1 - start))
+            start = prev = position
+        result.append((start, prev + 1 - start))
+        return result
+
     def greedy_match_positions(self) -> List[int]:
         """
         Find the positions of each single query characters in the candidate
@@ -317,7 +442,13 @@ def scoring_full_words(query: str, candidate: str) -> ScoringResult:
     sr = ScoringResult(query, candidate)
     if sr.check_query_empty():
         return sr
+    return _score_full_words(sr)
 
+
+def _score_full_words(sr: ScoringResult) -> ScoringResult:
+    """
+    The scoring of :func:`scoring_full_words` for a non-empty query.
+    """
     for q_word, q_word_index in sr.query_words_with_index:
         best_match = sr.find_best_word_match(q_word)
         # all query words need to find a match to keep the candidate
@@ -338,11 +469,38 @@ def scoring_full_words(query: str, candidate: str) -> ScoringResult:
             range(len(sr.matches) - 1)):
         sr.score = int(sr.score * 1.2)
 
-    # normalize the score by the number of matches (= number of query words)
-    sr.score = int(sr.score / len(sr.matches))
+    # normalize the score by the number of matches (= number of query words),
+    # a match in a very long word must not round down to a rejection, since
+    # FuzzyFinder relies on refined queries only matching previous matches
+    sr.score = max(1, int(sr.score / len(sr.matches)))
     return sr
 
 
+def _fzf_span_bonus(sr: ScoringResult, start_pos: int, match_len: int) -> int:
+    """
+    The bonus points of :func:`scoring_fzf` for a single match.
+    """
+    BOUNDARY_MATCH_WEIGHT = 8.0  # bonus factor for matches on boundaries
+    EARLY_MATCH_WEIGHT = 5.0  # bonus factor for early matches
+    WORD_COVERAGE_WEIGHT = 10.0  # bonus factor for word coverage
+    bonus = 0
+    total_len = len(sr.candidate)
+    # bonus on word boundary
+    if sr.is_boundary(start_pos):
+        bonus += int(BOUNDARY_MATCH_WEIGHT * match_len)
+    # bonus for early matches
+    early_factor = (total_len - start_pos) / total_len  # 0.x .. 1
+    bonus += int(EARLY_MATCH_WEIGHT * match_len * early_factor)
+    # bonus for word coverage
+    for word, word_start in sr.candidate_words_with_index:
+        word_end = word_start + len(word)
+        if word_start <= start_pos < word_end:
+            coverage = match_len / len(word)  # 0.x .. 1
+            bonus += int(WORD_COVERAGE_WEIGHT * match_len * coverage)
+            break
+    return bonus
+
+
 def scoring_fzf(query: str, candidate: str) -> ScoringResult:  # noqa: C901
     """
     A fzf-like fuzzy scoring.
@@ -355,21 +513,25 @@ def scoring_fzf(query: str, candidate: str) -> ScoringResult:  # noqa: C901
     There are bonuses for consecutive matches, matches on boundaries and matches
     early in the candidate.
     """
+    if query and not _is_subsequence(_lowered(query), candidate.lower()):
+        # most candidates end here, before computing anything else
+        return ScoringResult(query, candidate)
     sr = ScoringResult(query, candidate)
     if sr.check_query_empty():
         return sr
+    return _score_fzf(sr)
+
+
+def _score_fzf(sr: ScoringResult) -> ScoringResult:
+    """
+    The scoring of :func:`scoring_fzf` for a non-empty query, that matches
+    the candidate as subsequence.
+    """
     # this algorithm may miss some matches if a longer subsequence is found
     # before a shorter one that would allow to match the rest of the query later
     # on, so we calculate a greedy match as a fallback
-    greedy_matches = sr.merge_positions_to_substrings(
-        sr.greedy_match_positions())
-    if not greedy_matches:
-        sr.score = 0
-        return sr
+    greedy_spans = sr.merge_positions_to_spans(sr.greedy_match_positions())
     MATCH_BASE_SCORE = 100  # starting score if query matches (once)
-    BOUNDARY_MATCH_WEIGHT = 8.0  # bonus factor for matches on boundaries
-    EARLY_MATCH_WEIGHT = 5.0  # bonus factor for early matches
-    WORD_COVERAGE_WEIGHT = 10.0  # bonus factor for word coverage
     # find the longest matching subsequences of the query in the candidate in
     # original order, every match gets a fixed base score to beginn with
     query = sr.query_lower
@@ -380,32 +542,416 @@ def scoring_fzf(query: str, candidate: str) -> ScoringResult:  # noqa: C901
             query_sequence = query[:i]
             pos = sr.candidate_lower.find(query_sequence, start)
             if pos != -1:
-                sr.add_match(pos, sr.candidate[pos:pos+i], 0)
+                sr.add_span(pos, i, 0)
                 query = query[i:]
                 start = pos + i
                 break
             if i == 1:
                 # no match found, but since we didn't return before, there
                 # actually is a match, so we use the greedy match as a fallback
-                sr.matches = greedy_matches
+                sr.spans = greedy_spans
                 query = ""
     # add some bonus points
-    total_len = len(candidate)
-    for start_pos, match_str in sr.matches:
-        match_len = len(match_str)
-        # bonus on word boundary
-        if sr.is_boundary(start_pos):
-            sr.score += int(BOUNDARY_MATCH_WEIGHT * match_len)
-        # bonus for early matches
-        early_factor = (total_len - start_pos) / total_len  # 0.x .. 1
-        sr.score += int(EARLY_MATCH_WEIGHT * match_len * early_factor)
-        # bonus for word coverage
-        for word, word_start in sr.candidate_words_with_index:
-            word_end = word_start + len(word)
-            if word_start <= start_pos < word_end:
-                coverage = match_len / len(word)  # 0.x .. 1
-                sr.score += int(WORD_COVERAGE_WEIGHT * match_len * coverage)
-                break
+    spans = sr.spans
+    for start_pos, match_len in spans:
+        sr.score += _fzf_span_bonus(sr, start_pos, match_len)
     # fewer match groups should be ranked higher
-    sr.score //= len(sr.matches)
+    sr.score //= len(spans)
+    return sr
+
+
+SCORE_MATCH = 16
+"""
+:func:`scoring_fzf_v2`: The score of each matched character.
+"""
+SCORE_GAP_START = -3
+"""
+:func:`scoring_fzf_v2`: The penalty for the first skipped character between two matches.
+"""
+SCORE_GAP_EXTENSION = -1
+"""
+:func:`scoring_fzf_v2`: The penalty for each further skipped character.
+"""
+BONUS_BOUNDARY = SCORE_MATCH // 2
+"""
+:func:`scoring_fzf_v2`: The bonus for a match on a boundary (see :meth:`ScoringResult.is_boundary`).
+"""
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+"""
+:func:`scoring_fzf_v2`: The minimum bonus for a match following the previous match.
+"""
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+"""
+:func:`scoring_fzf_v2`: The boundary bonus of the first query character is multiplied by this.
+"""
+V2_MAX_CELLS = 100 * 1024
+"""
+:func:`scoring_fzf_v2`: The maximum size of the score matrix (query length times
+the length of the candidate part that can contain a match).
+Larger candidates are scored along the greedy match instead of the best alignment.
+"""
+_UNMATCHED = -(1 << 30)
+
+
+class _Buffers(threading.local):
+    """
+    The score matrices of :func:`scoring_fzf_v2`, allocated once per thread
+    and reused for all candidates.
+    """
+
+    def __init__(self) -> None:
+        self.scores: List[int] = []
+        self.runs: List[int] = []
+        self.matched: bytearray = bytearray()
+        self.bonus: List[int] = []
+
+    def reserve(self, cells: int, width: int) -> None:
+        if len(self.scores) < cells:
+            grow = cells - len(self.scores)
+            self.scores.extend([0] * grow)
+            self.runs.extend([0] * grow)
+            self.matched.extend(bytes(grow))
+        if len(self.bonus) < width:
+            self.bonus.extend([0] * (width - len(self.bonus)))
+
+
+_buffers = _Buffers()
+
+
+def _boundary_bonus(sr: ScoringResult, position: int) -> int:
+    if position < len(sr.candidate) and sr.is_boundary(position):
+        return BONUS_BOUNDARY
+    return 0
+
+
+def _path_score(sr: ScoringResult, positions: List[int]) -> int:
+    """
+    The :func:`scoring_fzf_v2` score of the given alignment.
+    """
+    score = 0
+    consecutive = 0
+    for k, position in enumerate(positions):
+        bonus = _boundary_bonus(sr, position)
+        if k == 0:
+            score += SCORE_MATCH + bonus * BONUS_FIRST_CHAR_MULTIPLIER
+            consecutive = 1
+            continue
+        gap = position - positions[k - 1] - 1
+        if gap:
+            score += SCORE_GAP_START + (gap - 1) * SCORE_GAP_EXTENSION
+            consecutive = 1
+        else:
+            consecutive += 1
+            first_bonus = _boundary_bonus(sr, position - consecutive + 1)
+            if bonus >= BONUS_BOUNDARY and bonus > first_bonus:
+                consecutive = 1
+            else:
+                bonus = max(bonus, BONUS_CONSECUTIVE, first_bonus)
+        score += SCORE_MATCH + bonus
+    return score
+
+
+def _best_alignment(sr: ScoringResult, start: int, width: int) -> Tuple[int, List[int]]:  # noqa: C901
+    """
+    Find the best scoring alignment of the query in ``candidate_lower[start:start + width]``
+    with a Smith-Waterman like dynamic program.
+    ``scores[i * width + j]`` is the best score of the first ``i + 1`` query
+    characters, with the last one matched at or before ``start + j``.
+    """
+    query = sr.query_lower
+    text = sr.candidate_lower
+    rows = len(query)
+    buffers = _buffers
+    buffers.reserve(rows * width, width)
+    scores, runs, matched, bonus = buffers.scores, buffers.runs, buffers.matched, buffers.bonus
+    for j in range(width):
+        bonus[j] = _boundary_bonus(sr, start + j)
+    for i, query_char in enumerate(query):
+        row = i * width
+        previous = row - width
+        left = _UNMATCHED
+        in_gap = False
+        for j in range(i, width):
+            gap_score = _UNMATCHED
+            if left != _UNMATCHED:
+                gap_score = left + (SCORE_GAP_EXTENSION if in_gap else SCORE_GAP_START)
+            match_score = _UNMATCHED
+            consecutive = 0
+            if text[start + j] == query_char:
+                b = bonus[j]
+                if i == 0:
+                    match_score = SCORE_MATCH + b * BONUS_FIRST_CHAR_MULTIPLIER
+                    consecutive = 1
+                elif scores[previous + j - 1] != _UNMATCHED:
+                    consecutive = runs[previous + j - 1] + 1
+                    if consecutive > 1:
+                        first_bonus = bonus[j - consecutive + 1]
+                        if b >= BONUS_BOUNDARY and b > first_bonus:
+                            consecutive = 1
+                        else:
+                            b = max(b, BONUS_CONSECUTIVE, first_bonus)
+                    match_score = scores[previous + j - 1] + SCORE_MATCH + b
+            if match_score != _UNMATCHED and match_score >= gap_score:
+                left = scores[row + j] = match_score
+                runs[row + j] = consecutive
+                matched[row + j] = 1
+                in_gap = False
+            else:
+                left = scores[row + j] = gap_score
+                runs[row + j] = 0
+                matched[row + j] = 0
+                in_gap = True
+    # the best score of the last row, the earliest one on ties
+    last = (rows - 1) * width
+    best_j = rows - 1
+    for j in range(rows - 1, width):
+        if scores[last + j] > scores[last + best_j]:
+            best_j = j
+    best = scores[last + best_j]
+    # follow the matches back to the first query character
+    positions: List[int] = []
+    i, j = rows - 1, best_j
+    while i >= 0:
+        if matched[i * width + j]:
+            positions.append(start + j)
+            i -= 1
+        j -= 1
+    positions.reverse()
+    return best, positions
+
+
+def scoring_fzf_v2(query: str, candidate: str) -> ScoringResult:
+    """
+    A fuzzy scoring like fzf's v2 algorithm.
+
+    Like :func:`~curses_fzf.scoring_fzf`, the :attr:`~ScoringResult.query`
+    characters are matched as a subsequence against the
+    :attr:`~ScoringResult.candidate`, but instead of a greedy search, the best
+    scoring alignment is found with a dynamic program.
+    Each matched character scores, skipped characters between matches are
+    penalized, matches on boundaries (see :meth:`~ScoringResult.is_boundary`)
+    and consecutive matches get a bonus.
+
+    The score matrices are allocated once per thread and reused.
+    Above :data:`V2_MAX_CELLS` matrix cells, the greedy match is scored
+    instead, so the scoring time per candidate stays bounded.
+    """
+    if query and not _is_subsequence(_lowered(query), candidate.lower()):
+        return ScoringResult(query, candidate)
+    sr = ScoringResult(query, candidate)
+    if sr.check_query_empty():
+        return sr
+    query_lower = sr.query_lower
+    text = sr.candidate_lower
+    # a match can only start at the first occurrence of the first query
+    # character and end at the last occurrence of the last one
+    start = text.find(query_lower[0])
+    width = text.rfind(query_lower[-1]) + 1 - start
+    if len(query_lower) * width > V2_MAX_CELLS:
+        positions = sr.greedy_match_positions()
+        score = _path_score(sr, positions)
+    else:
+        score, positions = _best_alignment(sr, start, width)
+    sr.score = max(1, score)
+    sr.spans = sr.merge_positions_to_spans(positions)
     return sr
+
+
+def _term_position(term: _Term, text: str) -> int:
+    """
+    The position of a non fuzzy term in the lowercase text, ``-1`` if not found.
+    """
+    if term.kind == "prefix":
+        return 0 if text.startswith(term.text) else -1
+    if term.kind == "suffix":
+        return len(text) - len(term.text) if text.endswith(term.text) else -1
+    if term.kind == "equal":
+        return 0 if text == term.text else -1
+    return text.find(term.text)
+
+
+def _match_term(sr: ScoringResult, term: _Term) -> Optional[Tuple[int, List[Tuple[int, int]]]]:
+    """
+    The score and the spans of a positive term, ``None`` if it doesn't match.
+    """
+    if term.kind == "fuzzy":
+        result = scoring_fzf(term.text, sr.candidate)
+        return (result.score, result.spans) if result.score > 0 else None
+    position = _term_position(term, sr.candidate_lower)
+    if position == -1:
+        return None
+    # scored like a single scoring_fzf match
+    return 100 + _fzf_span_bonus(sr, position, len(term.text)), [(position, len(term.text))]
+
+
+def scoring_extended(query: str, candidate: str) -> ScoringResult:
+    """
+    A fuzzy scoring supporting fzf's extended search syntax.
+
+    The :attr:`~ScoringResult.query` is split on whitespaces into terms, that
+    all need to match (case insensitive):
+
+    - ``word``: fuzzy match, scored like :func:`~curses_fzf.scoring_fzf`
+    - ``'word``: exact match
+    - ``^word``: exact match at the beginning
+    - ``word$``: exact match at the end
+    - ``^word$``: the whole candidate
+    - ``!word``, ``!^word``, ``!word$``: the candidate must not match
+    - ``a | b``: either ``a`` or ``b`` needs to match
+
+    Each query is compiled only once into a plan, that tests the cheap
+    negations and exact terms before scoring the fuzzy ones, so most
+    candidates are rejected early.
+    The score is the average score of the matched terms.
+    """
+    sr = ScoringResult(query, candidate)
+    plan = CompiledQuery.compile(query).plan
+    if not plan:
+        sr.score = 100
+        return sr
+    total = 0
+    positive = 0
+    for group in plan:
+        for term in group:
+            if term.inverse:
+                if _term_position(term, sr.candidate_lower) == -1:
+                    break
+                continue
+            match = _match_term(sr, term)
+            if match is not None:
+                total += match[0]
+                positive += 1
+                for start, length in match[1]:
+                    sr.add_span(start, length, 0)
+                break
+        else:
+            # no term of the group matched
+            sr.score = 0
+            sr.spans = []
+            return sr
+    sr.score = total // positive if positive else 100
+    return sr
+
+
+def _lowered(query: str) -> str:
+    """
+    The lowercase query, computed once per query instead of once per candidate.
+    """
+    return CompiledQuery.compile(query).lowered
+
+
+def _is_subsequence(query_lower: str, candidate_lower: str) -> bool:
+    """
+    ``True`` if all characters of the query appear in the candidate in order.
+    """
+    find = candidate_lower.find
+    start = 0
+    for char in query_lower:
+        start = find(char, start) + 1
+        if start == 0:
+            return False
+    return True
+
+
+def _refines_by_append(old_query: str, new_query: str) -> bool:
+    """
+    ``True`` if ``new_query`` only appended text to ``old_query``.
+    """
+    return new_query.startswith(old_query)
+
+
+def _refines_by_subsequence(old_query: str, new_query: str) -> bool:
+    """
+    ``True`` if the lowercase ``old_query`` is a subsequence of the lowercase
+    ``new_query``, which means characters were only added (anywhere in the query).
+    """
+    remaining = iter(new_query.lower())
+    return all(char in remaining for char in old_query.lower())
+
+
+def _scoring_full_words_batch(query: str, candidates: Iterable[str]) -> Iterator[Union[ScoringResult, int]]:
+    """
+    :func:`scoring_full_words` for many candidates: the query is split once,
+    candidates that don't contain all query words are rejected as ``0``
+    without creating a :class:`ScoringResult`.
+    """
+    if not query:
+        for candidate in candidates:
+            yield scoring_full_words(query, candidate)
+        return
+    compiled = CompiledQuery.compile(query)
+    query_lower = compiled.lowered
+    query_words = compiled.words_with_index
+    for candidate in candidates:
+        candidate_lower = candidate.lower()
+        if not all(word in candidate_lower for word, _ in query_words):
+            yield 0
+            continue
+        sr = ScoringResult(query, candidate)
+        sr.query_lower = query_lower
+        sr.query_words_with_index = query_words
+        yield _score_full_words(sr)
+
+
+def _scoring_fzf_batch(query: str, candidates: Iterable[str]) -> Iterator[Union[ScoringResult, int]]:
+    """
+    :func:`scoring_fzf` for many candidates: the query is lowercased once,
+    candidates that don't contain it as subsequence are rejected as ``0``
+    without creating a :class:`ScoringResult`.
+    """
+    if not query:
+        for candidate in candidates:
+            yield scoring_fzf(query, candidate)
+        return
+    query_lower = _lowered(query)
+    for candidate in candidates:
+        if not _is_subsequence(query_lower, candidate.lower()):
+            yield 0
+            continue
+        sr = ScoringResult(query, candidate)
+        sr.query_lower = query_lower
+        yield _score_fzf(sr)
+
+
+def _refines_extended(old_query: str, new_query: str) -> bool:
+    """
+    ``True`` if ``new_query`` only appended text to ``old_query`` and contains
+    no negations, alternatives or suffix anchors, where appending text could
+    match more candidates.
+    """
+    return new_query.startswith(old_query) and not any(char in new_query for char in "!|$")
+
+
+# Every candidate matched by a query that "refines" a previous query was also
+# matched by the previous query, so FuzzyFinder only needs to rescore the
+# previous survivors. See FuzzyFinder.calculate_filtered.
+# The greedy word assignment of scoring_full_words is order dependent, so only
+# appending to the query is a safe refinement there.
+scoring_full_words.refines = _refines_by_append  # type: ignore[attr-defined]
+scoring_fzf.refines = _refines_by_subsequence  # type: ignore[attr-defined]
+scoring_fzf_v2.refines = _refines_by_subsequence  # type: ignore[attr-defined]
+scoring_extended.refines = _refines_extended  # type: ignore[attr-defined]
+
+# Both only match candidates that contain all non-whitespace query characters,
+# so scoring engines may skip candidates by their character masks.
+# See ScoringEngine.
+scoring_full_words.prefilter = True  # type: ignore[attr-defined]
+scoring_fzf.prefilter = True  # type: ignore[attr-defined]
+scoring_fzf_v2.prefilter = True  # type: ignore[attr-defined]
+# Only candidates that contain the lowercase query as subsequence can match.
+# See NumpyEngine.
+scoring_fzf.subsequence = True  # type: ignore[attr-defined]
+scoring_fzf_v2.subsequence = True  # type: ignore[attr-defined]
+
+# All candidates match the empty query with this score, so FuzzyFinder lists
+# them in their original order without scoring them.
+# See FuzzyFinder.calculate_filtered.
+scoring_full_words.empty_score = 100  # type: ignore[attr-defined]
+scoring_fzf.empty_score = 100  # type: ignore[attr-defined]
+scoring_fzf_v2.empty_score = 100  # type: ignore[attr-defined]
+scoring_extended.empty_score = 100  # type: ignore[attr-defined]
+
+# The per-query preparation is done once per batch of candidates.
+# See ScoringEngine.
+scoring_full_words.score_batch = _scoring_full_words_batch  # type: ignore[attr-defined]
+scoring_fzf.score_batch = _scoring_fzf_batch  # type: ignore[attr-defined]
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import MutableSequence
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Union
+
+_IDENTITY = object()
+"""
+Marks the keys of unhashable items, that are identified by their :py:func:`id`.
+"""
+
+
+def default_key(item: Any) -> Hashable:
+    """
+    The key identifying an item in a :class:`Selection`, if no ``key`` function
+    was given: the item itself if it is hashable, otherwise (e.g. for a
+    :py:obj:`dict`) the identity of the item object.
+    """
+    try:
+        hash(item)
+    except TypeError:
+        return (_IDENTITY, id(item))
+    return item
+
+
+class Selection(MutableSequence):  # type: ignore[type-arg]
+    """
+    An insertion ordered set of selected items, used for
+    :attr:`~curses_fzf.FuzzyFinder.selected`.
+    It provides all methods of a :py:obj:`list` and compares equal to lists,
+    but membership tests, :meth:`~Selection.append`, :meth:`~Selection.remove`
+    and :meth:`~Selection.toggle` take constant time.
+
+    Items are identified by their ``key``, equal items with the same key are
+    selected only once: adding an item that is already selected (e.g. with
+    :meth:`~Selection.insert` or by assigning to an index) keeps only its first
+    occurrence.
+
+    Indexing takes constant time as long as the selection doesn't change in
+    between, the position based methods (:meth:`~Selection.insert`,
+    :meth:`~Selection.index`, assigning or deleting by index, ...) take linear
+    time.
+
+    Args:
+        items (Iterable[Any]): The initially selected items.
+            Default is no items.
+        key (Optional[Callable[[Any], Hashable]]): The function to get the key
+            identifying an item.
+            Default is ``None`` (see :func:`default_key`).
+    """
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __init__(self, items: Iterable[Any] = (), key: Optional[Callable[[Any], Hashable]] = None) -> None:
+        self.key: Callable[[Any], Hashable] = key if key is not None else default_key
+        """
+        The function to get the key identifying an item.
+        """
+        self._items: Dict[Hashable, Any] = {}
+        """
+        Private: The selected items by key, in selection order.
+        """
+        self._list: Optional[List[Any]] = None
+        """
+        Private: The selected items as list for indexing, ``None`` after a change.
+        """
+        self.extend(items)
+
+    def _as_list(self) -> List[Any]:
+        if self._list is None:
+            self._list = list(self._items.values())
+        return self._list
+
+    def _replace(self, items: Iterable[Any]) -> None:
+        """
+        Replace the selected items, keeping the first occurrence of equal items.
+        """
+        selected: Dict[Hashable, Any] = {}
+        for item in items:
+            selected.setdefault(self.key(item), item)
+        self._items = selected
+        self._list = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items.values())
+
+    def __reversed__(self) -> Iterator[Any]:
+        return reversed(self._as_list())
+
+    def __contains__(self, item: object) -> bool:
+        return self.key(item) in self._items
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        return self._as_list()[index]
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        items = list(self._as_list())
+        items[index] = value
+        self._replace(items)
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        items = list(self._as_list())
+        del items[index]
+        self._replace(items)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Selection, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __add__(self, other: Iterable[Any]) -> List[Any]:
+        return list(self) + list(other)
+
+    def __iadd__(self, other: Iterable[Any]) -> Selection:
+        self.extend(other)
+        return self
+
+    def __repr__(self) -> str:
+        return f"Selection({list(self)!r})"
+
+    def append(self, item: Any) -> None:
+        """
+        Select the item, if it is not selected yet.
+        """
+        key = self.key(item)
+        if key not in self._items:
+            self._items[key] = item
+            self._list = None
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """
+        Select all given items, that are not selected yet.
+        """
+        for item in items:
+            self.append(item)
+
+    def insert(self, index: int, item: Any) -> None:
+        """
+        Select the item at the given position, if it is not selected yet.
+        """
+        if item in self:
+            return
+        items = list(self._as_list())
+        items.insert(index, item)
+        self._replace(items)
+
+    def remove(self, item: Any) -> None:
+        """
+        Deselect the item.
+
+        Raises:
+            ValueError: If the item is not selected.
+        """
+        try:
+            del self._items[self.key(item)]
+        except KeyError:
+            raise ValueError(f"{item!r} is not selected") from None
+        self._list = None
+
+    def discard(self, item: Any) -> None:
+        """
+        Deselect the item, if it is selected.
+        """
+        if self._items.pop(self.key(item), _IDENTITY) is not _IDENTITY:
+            self._list = None
+
+    def pop(self, index: int = -1) -> Any:
+        """
+        Deselect and return the item at the given position (default last).
+
+        Raises:
+            IndexError: If the selection is empty or the index is out of range.
+        """
+        if index == -1 and self._items:
+            _, item = self._items.popitem()
+            self._list = None
+            return item
+        item = self._as_list()[index]
+        self.remove(item)
+        return item
+
+    def toggle(self, item: Any) -> bool:
+        """
+        Select the item if it is not selected, otherwise deselect it.
+
+        Returns:
+            bool: Whether the item is selected now.
+        """
+        key = self.key(item)
+        self._list = None
+        if key in self._items:
+            del self._items[key]
+            return False
+        self._items[key] = item
+        return True
+
+    def index(self, item: Any, start: int = 0, stop: int = sys.maxsize) -> int:
+        """
+        The position of the item in the selection.
+
+        Raises:
+            ValueError: If the item is not selected (between ``start`` and ``stop``).
+        """
+        if item in self:
+            key = self.key(item)
+            position = next(i for i, selected in enumerate(self._items) if selected == key)
+            if position in range(len(self))[start:stop]:
+                return position
+        raise ValueError(f"{item!r} is not selected")
+
+    def count(self, item: Any) -> int:
+        """
+        ``1`` if the item is selected, ``0`` otherwise.
+        """
+        return int(item in self)
+
+    def sort(self, *, key: Optional[Callable[[Any], Any]] = None, reverse: bool = False) -> None:
+        """
+        Sort the selected items in place, like :py:meth:`list.sort`.
+        """
+        self._replace(sorted(self._items.values(), key=key, reverse=reverse))  # type: ignore[type-var]
+
+    def reverse(self) -> None:
+        """
+        Reverse the order of the selected items in place.
+        """
+        self._replace(reversed(self._as_list()))
+
+    def copy(self) -> Selection:
+        """
+        A shallow copy of the selection.
+        """
+        return Selection(self, key=self.key)
+
+    def clear(self) -> None:
+        """
+        Deselect all items.
+        """
+        self._items.clear()
+        self._list = None
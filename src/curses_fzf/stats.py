@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
+class FrameStats:
+    """
+    The timings (in seconds) and counters of one frame of
+    :class:`~curses_fzf.FuzzyFinder`'s main loop: handling the keys read since
+    the last frame, updating the :attr:`~curses_fzf.FuzzyFinder.filtered` list
+    and rendering it.
+    Waiting for input is not part of a frame.
+    """
+
+    __slots__ = ("input", "filter", "display", "rank", "render", "preview", "items_scored",
+                 "prefilter_rejected", "cache_hits", "cache_misses", "rows_rewritten")
+
+    def __init__(self) -> None:
+        self.input: float = 0.0
+        """
+        Time spent handling keys (the :attr:`~curses_fzf.FuzzyFinder.keymap`
+        functions and query changes).
+        """
+        self.filter: float = 0.0
+        """
+        Time spent updating the :attr:`~curses_fzf.FuzzyFinder.filtered` list:
+        scoring, ranking and :meth:`~curses_fzf.FuzzyFinder.display` calls, or
+        polling the background scan (see :attr:`~curses_fzf.FuzzyFinder.background_scoring`).
+        """
+        self.display: float = 0.0
+        """
+        Time spent calling the :meth:`~curses_fzf.FuzzyFinder.display` function
+        for new items, part of :attr:`~FrameStats.filter` (unless scored in the background).
+        """
+        self.rank: float = 0.0
+        """
+        Time spent sorting the matches, part of :attr:`~FrameStats.filter`.
+        """
+        self.render: float = 0.0
+        """
+        Time spent rendering the frame, without :attr:`~FrameStats.preview`.
+        """
+        self.preview: float = 0.0
+        """
+        Time spent in the :meth:`~curses_fzf.FuzzyFinder.preview` function (or
+        getting its text in :attr:`~curses_fzf.FuzzyFinder.preview_async` mode).
+        """
+        self.items_scored: int = 0
+        """
+        The number of candidates passed to the :meth:`~curses_fzf.FuzzyFinder.score` function.
+        """
+        self.prefilter_rejected: int = 0
+        """
+        The number of candidates rejected without calling the
+        :meth:`~curses_fzf.FuzzyFinder.score` function, see
+        :meth:`~curses_fzf.candidates.CandidateIndex.prefilter`.
+        """
+        self.cache_hits: int = 0
+        """
+        The number of :attr:`~curses_fzf.FuzzyFinder.query_cache` hits.
+        """
+        self.cache_misses: int = 0
+        """
+        The number of :attr:`~curses_fzf.FuzzyFinder.query_cache` misses.
+        """
+        self.rows_rewritten: int = 0
+        """
+        The number of screen rows that changed since the last frame.
+        """
+
+    @property
+    def total(self) -> float:
+        """
+        The latency of the frame, the sum of the timings of all phases.
+        """
+        return self.input + self.filter + self.render + self.preview
+
+    def add(self, other: FrameStats) -> None:
+        """
+        Add the timings and counters of another frame to this one.
+        """
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"FrameStats({fields})"
+
+
+class Stats:
+    """
+    The instrumentation of :class:`~curses_fzf.FuzzyFinder`'s main loop,
+    see :attr:`~curses_fzf.FuzzyFinder.stats`.
+    """
+
+    def __init__(self) -> None:
+        self.frames: int = 0
+        """
+        The number of rendered frames.
+        """
+        self.last: Optional[FrameStats] = None
+        """
+        The :class:`FrameStats` of the last rendered frame.
+        """
+        self.totals: FrameStats = FrameStats()
+        """
+        The timings and counters of all frames summed up.
+        """
+        self.max_frame: float = 0.0
+        """
+        The latency of the slowest frame.
+        """
+
+    def record(self, frame: FrameStats) -> None:
+        """
+        Add a finished frame.
+        """
+        self.frames += 1
+        self.last = frame
+        self.totals.add(frame)
+        self.max_frame = max(self.max_frame, frame.total)
+
+    def reset(self) -> None:
+        """
+        Forget all frames.
+        """
+        self.frames = 0
+        self.last = None
+        self.totals = FrameStats()
+        self.max_frame = 0.0
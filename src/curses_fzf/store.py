@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import mmap
+import os
+import stat
+from array import array
+from typing import Any, BinaryIO, Iterable, Iterator, List, Sequence, Union, overload
+
+Buffer = Union[bytes, bytearray, mmap.mmap]
+
+
+class LineStore(Sequence):  # type: ignore[type-arg]
+    """
+    A read-only list of the lines of a byte buffer, without line endings.
+
+    Instead of a :py:obj:`str` object per line, only the buffer and an array
+    of line offsets (8 bytes per line) are kept, a line is decoded each time it
+    is accessed.
+    Use :meth:`~LineStore.from_file` to memory-map a regular file, so its
+    content is paged in by the operating system instead of being read into
+    memory.
+
+    Args:
+        data (Buffer): The lines, separated by ``"\\n"`` (a trailing ``"\\r"`` is
+            stripped as well).
+        encoding (str): The encoding of the lines, undecodable bytes are replaced.
+            Default is ``"utf-8"``.
+    """
+
+    compact = True
+    """
+    Tells :class:`~curses_fzf.FuzzyFinder` not to retain a candidate per line,
+    see :class:`~curses_fzf.candidates.CandidateIndex`.
+    """
+
+    def __init__(self, data: Buffer, encoding: str = "utf-8") -> None:
+        self.encoding: str = encoding
+        self._data: Buffer = data
+        self._bounds: array[int] = _line_bounds(data)
+        """
+        Private: The start offset of each line, followed by the end of the last
+        line plus one, so line ``i`` ends right before ``_bounds[i + 1]``.
+        """
+
+    @classmethod
+    def from_file(cls, file: BinaryIO, encoding: str = "utf-8") -> LineStore:
+        """
+        Create a :class:`LineStore` from a file opened in binary mode.
+        A non-empty regular file read from the start is memory-mapped, anything
+        else (e.g. a pipe) is read into memory.
+        The file can be closed afterwards.
+        """
+        try:
+            info = os.fstat(file.fileno())
+        except (AttributeError, OSError, ValueError):
+            info = None
+        if info is not None and stat.S_ISREG(info.st_mode) and info.st_size > 0 and file.tell() == 0:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), encoding)
+        return cls(file.read(), encoding)
+
+    def close(self) -> None:
+        """
+        Unmap the memory-mapped file, the lines can't be accessed afterwards.
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self) -> LineStore:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._bounds) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line store index out of range")
+        line = self._data[self._bounds[index]:self._bounds[index + 1] - 1]
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        return line.decode(self.encoding, "replace")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"LineStore({len(self)} lines)"
+
+
+class StringStore(Sequence):  # type: ignore[type-arg]
+    """
+    A list of strings, stored encoded in one contiguous buffer plus an array of
+    offsets (8 bytes per item), instead of a :py:obj:`str` object per item.
+    A string is decoded each time it is accessed, equal to the original one.
+
+    :class:`~curses_fzf.FuzzyFinder` accepts it like any other list of items.
+    Since it is ``compact``, the display strings aren't retained while
+    filtering either, they are derived from the items again when scored or
+    displayed.
+    This holds millions of items in a fraction of the memory, at the cost of
+    decoding them on every full scan.
+
+    Strings can be appended (e.g. while :meth:`~curses_fzf.FuzzyFinder.find`
+    runs), but not changed or removed.
+
+    Args:
+        items (Iterable[str]): The initial strings.
+            Default is no strings.
+        encoding (str): The encoding of the buffer, e.g. ``"utf-8"`` (compact
+            for mostly ASCII text) or ``"utf-32-le"`` (fixed width).
+            Default is ``"utf-8"``.
+    """
+
+    compact = True
+    """
+    Tells :class:`~curses_fzf.FuzzyFinder` not to retain a candidate per item,
+    see :class:`~curses_fzf.candidates.CandidateIndex`.
+    """
+
+    def __init__(self, items: Iterable[str] = (), encoding: str = "utf-8") -> None:
+        self.encoding: str = encoding
+        self._data: bytearray = bytearray()
+        self._offsets: array[int] = array("Q", [0])
+        """
+        Private: The start offset of each string, followed by the end of the
+        last string, so string ``i`` ends right before ``_offsets[i + 1]``.
+        """
+        self.extend(items)
+
+    def append(self, item: str) -> None:
+        """
+        Append a string.
+        """
+        # surrogatepass: any str is stored and decoded again unchanged
+        self._data += item.encode(self.encoding, "surrogatepass")
+        self._offsets.append(len(self._data))
+
+    def extend(self, items: Iterable[str]) -> None:
+        """
+        Append all given strings.
+        """
+        for item in items:
+            self.append(item)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        offsets = self._offsets
+        size = len(offsets) - 1
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("string store index out of range")
+        return self._data[offsets[index]:offsets[index + 1]].decode(self.encoding, "surrogatepass")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"StringStore({len(self)} items)"
+
+
+def _line_bounds(data: Buffer) -> array[int]:
+    """
+    The start offsets of the lines in the buffer, see :attr:`LineStore._bounds`.
+    """
+    bounds = array("q")
+    find = data.find
+    size = len(data)
+    position = 0
+    while position < size:
+        bounds.append(position)
+        end = find(b"\n", position)
+        position = (size if end < 0 else end) + 1
+    bounds.append(position)
+    return bounds
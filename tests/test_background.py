@@ -0,0 +1,114 @@
+import io
+import threading
+import time
+import pytest
+from curses_fzf.background import BackgroundWorker, ItemReader
+
+
+def wait_for_final(worker, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        polled = worker.poll()
+        if polled is not None and polled[0]:
+            return polled[1]
+        time.sleep(0.001)
+    raise TimeoutError
+
+
+def test_background_worker():
+    worker = BackgroundWorker()
+    assert worker.running is False
+    assert worker.poll() is None
+    worker.submit(lambda cancelled, publish: 42)
+    assert worker.running is True
+    assert wait_for_final(worker) == 42
+    assert worker.running is False
+    assert worker.poll() is None
+    worker.close()
+
+
+def test_background_worker_publish_and_cancel():
+    worker = BackgroundWorker()
+    started = threading.Event()
+    release = threading.Event()
+    was_cancelled = []
+
+    def slow(cancelled, publish):
+        publish("partial")
+        started.set()
+        release.wait(5)
+        was_cancelled.append(cancelled())
+        return "stale"
+    worker.submit(slow)
+    started.wait(5)
+    assert worker.poll() == (False, "partial")
+    # a new job cancels the old one, its result is discarded
+    worker.submit(lambda cancelled, publish: "fresh")
+    release.set()
+    assert wait_for_final(worker) == "fresh"
+    assert was_cancelled == [True]
+    worker.close()
+
+
+def test_background_worker_cancel():
+    worker = BackgroundWorker()
+    release = threading.Event()
+    worker.submit(lambda cancelled, publish: release.wait(5))
+    worker.cancel()
+    assert worker.running is False
+    release.set()
+    time.sleep(0.05)
+    assert worker.poll() is None
+    worker.close()
+
+
+def test_background_worker_exception():
+    worker = BackgroundWorker()
+
+    def failing(cancelled, publish):
+        raise ValueError("boom")
+    worker.submit(failing)
+    with pytest.raises(ValueError):
+        wait_for_final(worker)
+    worker.close()
+
+
+def test_item_reader():
+    items = []
+    reader = ItemReader((f"item{i}" for i in range(5)), items)
+    assert reader.wait(5)
+    assert reader.done
+    assert reader.error is None
+    assert items == ["item0", "item1", "item2", "item3", "item4"]
+    # file objects are read line by line, without line endings
+    items = []
+    reader = ItemReader(io.StringIO("foo\nbar\r\nbaz"), items)
+    assert reader.wait(5)
+    assert items == ["foo", "bar", "baz"]
+    items = []
+    reader = ItemReader(io.BytesIO(b"foo\n\xc3\xa4\n"), items)
+    assert reader.wait(5)
+    assert items == ["foo", "ä"]
+
+
+def test_item_reader_error_and_stop():
+    def failing():
+        yield "item0"
+        raise ValueError("boom")
+    items = []
+    reader = ItemReader(failing(), items)
+    assert reader.wait(5)
+    assert isinstance(reader.error, ValueError)
+    assert items == ["item0"]
+    release = threading.Event()
+
+    def blocking():
+        yield "item0"
+        release.wait(5)
+        yield "item1"
+    items = []
+    reader = ItemReader(blocking(), items)
+    reader.stop()
+    release.set()
+    assert reader.wait(5)
+    assert items in ([], ["item0"])
@@ -0,0 +1,35 @@
+from curses_fzf.cache import LRUCache
+
+
+def test_lru_cache():
+    cache = LRUCache(5, len)
+    assert cache.get("a") is None
+    cache.put("a", [1, 2])
+    cache.put("b", [1, 2])
+    assert cache.get("a") == [1, 2]
+    assert (cache.hits, cache.misses) == (1, 1)
+    # "b" is the least recently used one
+    cache.put("c", [1, 2])
+    assert "b" not in cache
+    assert len(cache) == 2
+    assert cache.weight == 4
+    # replacing a value updates the weight
+    cache.put("a", [1])
+    assert cache.weight == 3
+    # too heavy values are not cached
+    cache.put("d", [1] * 6)
+    assert "d" not in cache
+    assert cache.weight == 3
+    cache.discard("a")
+    assert cache.weight == 2
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.weight == 0
+    assert cache.hits == 1
+
+
+def test_lru_cache_disabled():
+    cache = LRUCache(0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.misses == 1
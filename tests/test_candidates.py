@@ -0,0 +1,118 @@
+from curses_fzf import FuzzyFinder, ScoringResult, StringStore
+from curses_fzf.candidates import MASK_CHUNK_SIZE, Candidate, CandidateIndex, char_mask
+
+
+def test_candidate():
+    c = Candidate("Hello World/fooBar2")
+    assert c == "Hello World/fooBar2"
+    assert isinstance(c, str)
+    assert not hasattr(c, "__dict__")
+    sr = ScoringResult("wo", c)
+    assert sr.candidate_lower == "hello world/foobar2"
+    assert sr.candidate_words_with_index == [("hello", 0), ("world/foobar2", 6)]
+    assert sr.is_boundary(6) is True
+    assert sr.is_boundary(7) is False
+    assert sr.is_boundary(15) is True
+
+
+def test_candidate_index():
+    calls = []
+
+    def display(item):
+        calls.append(item)
+        return item["name"]
+    items = [{"name": "apple"}, {"name": "banana"}]
+    index = CandidateIndex(items, display)
+    assert len(index) == 2
+    index.sync_masks()
+    assert list(index.masks) == [char_mask("apple"), char_mask("banana")]
+    assert index[1] == "banana"
+    assert isinstance(index[1], Candidate)
+    assert index.is_valid_for(items, display)
+    assert not index.is_valid_for(list(items), display)
+    assert not index.is_valid_for(items, lambda x: x)
+    # appended items are added on sync
+    items.append({"name": "cherry"})
+    assert index.is_valid_for(items, display)
+    index.sync()
+    assert index[2] == "cherry"
+    assert len(calls) == 3
+    items.pop()
+    items.pop()
+    assert not index.is_valid_for(items, display)
+
+
+def test_candidate_index_without_retaining():
+    calls = []
+
+    def display(item):
+        calls.append(item)
+        return item.upper()
+    items = ["apple", "banana"]
+    index = CandidateIndex(items, display, retain=False)
+    assert len(index) == 2
+    assert calls == []
+    assert index[1] == "BANANA"
+    assert isinstance(index[1], Candidate)
+    assert index.candidates[:] == ["APPLE", "BANANA"]
+    assert list(index.prefilter(char_mask("pl"), range(2))) == [0]
+    items.append("cherry")
+    assert index.is_valid_for(items, display)
+    index.sync()
+    assert len(index) == 3
+    assert list(index.prefilter(char_mask("ch"), range(3))) == [2]
+
+
+def test_char_mask():
+    assert char_mask("") == 0
+    assert char_mask(" \t") == 0
+    assert char_mask("ab c") == char_mask("cab") == char_mask("abcabc")
+    assert char_mask("a") & char_mask("b") == 0
+    assert char_mask("a1") & char_mask("1") == char_mask("1")
+    mask = char_mask("ü/.")
+    assert char_mask("tüt/x.y") & mask == mask
+
+
+def test_candidate_index_prefilter():
+    items = ["x" * 3] * (2 * MASK_CHUNK_SIZE) + ["apple", "banana"]
+    index = CandidateIndex(items, str)
+    query = char_mask("an")
+    assert list(index.prefilter(query, range(len(items)))) == [len(items) - 1]
+    assert list(index.prefilter(query, [0, len(items) - 2, len(items) - 1])) == [len(items) - 1]
+    assert list(index.prefilter(0, range(3))) == [0, 1, 2]
+    assert len(index.chunk_masks) == 3
+    assert index.chunk_masks[0] == char_mask("x")
+    # masks of appended candidates are added to the last chunk
+    items.append("cherry")
+    index.sync()
+    assert list(index.prefilter(char_mask("ch"), range(len(items)))) == [len(items) - 1]
+    assert len(index.masks) == len(items)
+    assert len(index.chunk_masks) == 3
+
+
+def test_display_called_once_per_find():
+    calls = []
+
+    def display(item):
+        calls.append(item)
+        return str(item)
+    fzf = FuzzyFinder(display=display)
+    fzf.all_items = ["apple", "banana", "cherry"]
+    for char in "an":
+        fzf.kb_add_to_query_cursor(char)
+        fzf.calculate_filtered()
+    fzf.kb_reset_query()
+    fzf.calculate_filtered()
+    assert calls == ["apple", "banana", "cherry"]
+
+
+def test_compact_items_are_not_retained():
+    items = StringStore(["apple", "banana", "cherry"])
+    fzf = FuzzyFinder(query="an")
+    fzf.all_items = items
+    fzf.calculate_filtered()
+    assert fzf._candidates.retain is False
+    expected = list(fzf.filter(list(items)))
+    assert fzf._filter_state[2].retain is True
+    assert list(fzf.filter(items)) == expected
+    assert fzf._filter_state[2].retain is False
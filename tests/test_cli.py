@@ -0,0 +1,52 @@
+import io
+import pytest
+from unittest.mock import patch
+from curses_fzf import CursesFzfAborted
+from curses_fzf.cli import main
+
+
+@pytest.fixture
+def items(tmp_path):
+    path = tmp_path / "items.txt"
+    path.write_text("apple\nbanana\ngrape\npineapple\n")
+    return str(path)
+
+
+def test_filter(items, capsys):
+    assert main([items, "--filter", "apl"]) == 0
+    assert capsys.readouterr().out == "apple\npineapple\n"
+    assert main([items, "-f", "apl", "--print0"]) == 0
+    assert capsys.readouterr().out == "apple\0pineapple\0"
+    assert main([items, "-f", "xyz"]) == 1
+    assert capsys.readouterr().out == ""
+
+
+def test_stdin(capsys):
+    stdin = io.TextIOWrapper(io.BytesIO(b"one\ntwo\n"))
+    with patch("sys.stdin", stdin):
+        assert main(["-f", "tw"]) == 0
+    assert capsys.readouterr().out == "two\n"
+
+
+def test_errors(tmp_path, capsys):
+    assert main([str(tmp_path / "missing.txt")]) == 2
+    assert "No such file" in capsys.readouterr().err
+    with patch("sys.stdin.isatty", return_value=True), pytest.raises(SystemExit):
+        main([])
+
+
+def test_interactive(items, capsys):
+    def find(fzf, store):
+        assert fzf.multi is True
+        assert fzf.query == "ap"
+        assert list(store) == ["apple", "banana", "grape", "pineapple"]
+        return ["apple", "grape"]
+    with patch("curses_fzf.cli._controlling_terminal"), patch("curses_fzf.FuzzyFinder.find", find):
+        assert main([items, "--multi", "--query", "ap"]) == 0
+    assert capsys.readouterr().out == "apple\ngrape\n"
+    with patch("curses_fzf.cli._controlling_terminal"), \
+            patch("curses_fzf.FuzzyFinder.find", side_effect=CursesFzfAborted):
+        assert main([items]) == 130
+    with patch("curses_fzf.cli._controlling_terminal"), \
+            patch("curses_fzf.FuzzyFinder.find", return_value=[]):
+        assert main([items, "-m"]) == 1
@@ -0,0 +1,147 @@
+import random
+
+import pytest
+from curses_fzf import (FuzzyFinder, NumpyEngine, ProcessPoolEngine, ScoringEngine, ScoringResult, scoring_fzf,
+                        scoring_full_words)
+from curses_fzf import engines
+from curses_fzf.candidates import CandidateIndex
+
+ITEMS = ["src/main.py", "src/util/strings.py", "README.md", "docs/index.rst", "tests/test_main.py",
+         "setup.cfg", "src/util/__init__.py", "Ünïcödé/fïlé.txt", "tmp/\udcff.bin"]
+
+
+def test_scoring_engine():
+    candidates = CandidateIndex(ITEMS, str)
+    with ScoringEngine() as engine:
+        result = list(engine.score(scoring_fzf, "mai", candidates, range(len(candidates))))
+    assert [index for index, _ in result] == [0, 4]
+    assert all(score_result.score > 0 for _, score_result in result)
+    result = list(engine.score(scoring_fzf, "py", candidates, [1, 2, 3]))
+    assert [index for index, _ in result] == [1]
+
+
+def test_scoring_engine_prefilter():
+    candidates = CandidateIndex(ITEMS, str)
+    calls = []
+
+    def score(query, candidate):
+        calls.append(candidate)
+        return scoring_fzf(query, candidate)
+    assert [i for i, _ in ScoringEngine().score(score, "py", candidates, range(len(candidates)))] == [0, 1, 4, 6]
+    assert len(calls) == len(ITEMS)
+    # custom scoring functions opt in
+    calls.clear()
+    score.prefilter = True
+    assert [i for i, _ in ScoringEngine().score(score, "py", candidates, range(len(candidates)))] == [0, 1, 4, 6]
+    assert calls == [ITEMS[i] for i in [0, 1, 4, 6]]
+
+
+def test_scoring_engine_score_batch(monkeypatch):
+    monkeypatch.setattr(engines, "SCORE_BATCH_SIZE", 2)
+    candidates = CandidateIndex(ITEMS, str)
+    batches = []
+
+    def score(query, candidate):
+        raise AssertionError("score_batch is preferred")
+
+    def score_batch(query, batch):
+        batches.append(batch)
+        return [len(candidate) if query in candidate else 0 for candidate in batch]
+    score.score_batch = score_batch
+    result = list(ScoringEngine().score(score, "src", candidates, [0, 1, 2, 6]))
+    assert result == [(0, 11), (1, 19), (6, 20)]
+    assert batches == [["src/main.py", "src/util/strings.py"], ["README.md", "src/util/__init__.py"]]
+
+
+@pytest.mark.parametrize("score", [scoring_fzf, scoring_full_words])
+def test_process_pool_engine(score):
+    candidates = CandidateIndex(ITEMS, str)
+    with ProcessPoolEngine(workers=2, chunk_size=2, min_items=0) as engine:
+        for query in ["", "py", "src util", "ïlé", "zzz"]:
+            for indices in [range(len(candidates)), [0, 1, 4, 7, 8]]:
+                expected = list(ScoringEngine().score(score, query, candidates, indices))
+                result = list(engine.score(score, query, candidates, indices))
+                assert [i for i, _ in result] == [i for i, _ in expected]
+                # the workers only send back the plain scores
+                assert [value for _, value in result] == [sr.score for _, sr in expected]
+                assert not any(isinstance(value, ScoringResult) for _, value in result)
+        # the corpus is published once per candidate index
+        name = engine._shm.name
+        list(engine.score(score, "py", candidates, range(len(candidates))))
+        assert engine._shm.name == name
+    assert engine._shm is None
+    assert engine._executor is None
+
+
+def test_process_pool_engine_fallback():
+    candidates = CandidateIndex(ITEMS, str)
+    with ProcessPoolEngine(workers=2, min_items=0) as engine:
+        # lambdas can't be sent to the workers
+        result = list(engine.score(lambda q, c: scoring_fzf(q, c), "py", candidates, range(len(candidates))))
+        assert [index for index, _ in result] == [0, 1, 4, 6]
+        assert engine._executor is None
+    with ProcessPoolEngine(workers=2, min_items=100) as engine:
+        list(engine.score(scoring_fzf, "py", candidates, range(len(candidates))))
+        assert engine._executor is None
+
+
+def test_fuzzyfinder_engine():
+    with ProcessPoolEngine(workers=2, chunk_size=3, min_items=0) as engine:
+        fzf = FuzzyFinder(query="src", engine=engine)
+        fzf.all_items = ITEMS
+        fzf.calculate_filtered()
+        assert [x[0] for x in fzf.filtered] == ["src/main.py", "src/util/strings.py", "src/util/__init__.py"]
+    assert isinstance(FuzzyFinder().engine, ScoringEngine)
+
+
+@pytest.mark.parametrize("score", [scoring_fzf, scoring_full_words])
+def test_numpy_engine(score):
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    items = ITEMS + ["".join(rng.choice("abcAB/_ .ü") for _ in range(rng.randint(0, 12))) for _ in range(500)]
+    candidates = CandidateIndex(items, str)
+    with NumpyEngine(min_items=0) as engine:
+        for query in ["", "py", "src util", "ïlé", "zzz", "a b", "Ab_", "üa"]:
+            for indices in [range(len(candidates)), range(3, 400), [0, 1, 4, 7, 8, 100, 499]]:
+                expected = list(ScoringEngine().score(score, query, candidates, indices))
+                result = list(engine.score(score, query, candidates, indices))
+                assert [i for i, _ in result] == [i for i, _ in expected]
+                assert [sr.score for _, sr in result] == [sr.score for _, sr in expected]
+                assert [sr.matches for _, sr in result] == [sr.matches for _, sr in expected]
+        # appended candidates are encoded on the next scan
+        items.append("zzz")
+        candidates.sync()
+        assert [i for i, _ in engine.score(score, "zzz", candidates, range(len(candidates)))] == [len(items) - 1]
+
+
+def test_numpy_engine_rejects_in_bulk():
+    pytest.importorskip("numpy")
+    candidates = CandidateIndex(ITEMS, str)
+    calls = []
+
+    def score(query, candidate):
+        calls.append(candidate)
+        return scoring_fzf(query, candidate)
+    score.subsequence = True
+    result = list(NumpyEngine(min_items=0).score(score, "sp", candidates, range(len(candidates))))
+    assert [i for i, _ in result] == [0, 1, 4, 5, 6]
+    assert calls == [ITEMS[i] for i in [0, 1, 4, 5, 6]]
+
+
+def test_numpy_engine_bounds_position_cache():
+    pytest.importorskip("numpy")
+    candidates = CandidateIndex(["a" * 10 + "bcdefghij"] * 100, str)
+    engine = NumpyEngine(min_items=0)
+    for query in ["a", "abcdefghij", "jihgfedcba"]:
+        assert len(list(engine.score(scoring_fzf, query, candidates, range(len(candidates))))) == \
+            (100 if query != "jihgfedcba" else 0)
+        assert engine._char_positions.weight <= len(engine._codepoints) // 2
+    # the frequent "a" exceeds the budget and is not cached
+    assert "a" not in engine._char_positions
+    assert "j" in engine._char_positions
+
+
+def test_numpy_engine_requires_numpy(monkeypatch):
+    monkeypatch.setattr(engines, "numpy", None)
+    with pytest.raises(ImportError):
+        NumpyEngine()
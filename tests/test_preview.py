@@ -0,0 +1,92 @@
+import curses
+import threading
+import time
+from unittest.mock import MagicMock, patch
+from curses_fzf import FuzzyFinder, ScoringResult, ColorTheme
+from curses_fzf.fuzzyfinder import PREVIEW_LOADING
+from curses_fzf.preview import PREVIEW_TIMED_OUT, PreviewLoader
+
+
+def wait_for(loader, entries, index, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        text = loader.get(entries, index)
+        if text is not None:
+            return text
+        time.sleep(0.005)
+    raise AssertionError("preview not loaded")
+
+
+def test_preview_loader():
+    calls = []
+
+    def preview(window, color_theme, item, score_result):
+        assert window is None
+        calls.append(item)
+        return f"preview of {item}"
+    sr = ScoringResult("", "")
+    entries = [(f"item{i}", sr) for i in range(5)]
+    loader = PreviewLoader(preview, ColorTheme(), prefetch=1, debounce=0.01)
+    try:
+        # debounced until the cursor rests on the item
+        assert loader.get(entries, 2) is None
+        assert loader.pending
+        assert calls == []
+        assert wait_for(loader, entries, 2) == "preview of item2"
+        assert not loader.pending
+        assert calls[0] == "item2"
+        # neighbours are prefetched, cached previews are not loaded again
+        assert wait_for(loader, entries, 3) == "preview of item3"
+        assert wait_for(loader, entries, 1) == "preview of item1"
+        assert wait_for(loader, entries, 2) == "preview of item2"
+        assert calls.count("item2") == 1
+        loader.clear()
+        assert len(loader.cache) == 0
+    finally:
+        loader.close()
+
+
+def test_preview_loader_timeout():
+    release = threading.Event()
+
+    def preview(window, color_theme, item, score_result):
+        release.wait(2)
+        return item
+    sr = ScoringResult("", "")
+    entries = [("slow", sr)]
+    loader = PreviewLoader(preview, ColorTheme(), debounce=0, timeout=0.05)
+    try:
+        assert wait_for(loader, entries, 0) == PREVIEW_TIMED_OUT
+        assert not loader.pending
+        assert loader.get(entries, 0) == PREVIEW_TIMED_OUT
+    finally:
+        release.set()
+        loader.close()
+
+
+def test_render_preview_async():
+    sr = ScoringResult("", "")
+    fzf = FuzzyFinder(preview=lambda w, c, i, s: f"{i} preview", preview_async=True)
+    fzf.filtered = [("item1", sr), ("item2", sr)]
+    fzf.stdscr = MagicMock(spec=curses.window)
+    mock_sub_win = MagicMock(spec=curses.window)
+    mock_sub_win.getmaxyx.return_value = (6, 20)
+    try:
+        with patch("curses.color_pair", side_effect=lambda x: x), \
+                patch("curses.newwin", return_value=mock_sub_win) as mock_newwin:
+            fzf._render_preview(10, 50)
+            mock_sub_win.addstr.assert_called_with(2, 4, PREVIEW_LOADING, 37)
+            assert fzf._preview_loader.pending
+            fzf._preview_loader.debounce = 0
+            deadline = time.monotonic() + 2
+            while fzf._preview_loader.pending and time.monotonic() < deadline:
+                fzf._render_preview(10, 50)
+                time.sleep(0.005)
+            mock_sub_win.addstr.assert_called_with(2, 4, "item1 preview", 37)
+            # the window is reused until the size changes
+            mock_newwin.assert_called_once()
+            mock_sub_win.erase.assert_called()
+            fzf._render_preview(12, 50)
+            assert mock_newwin.call_count == 2
+    finally:
+        fzf._preview_loader.close()
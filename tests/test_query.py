@@ -0,0 +1,42 @@
+import pickle
+
+from curses_fzf import FuzzyFinder, ScoringResult
+from curses_fzf.candidates import char_mask
+from curses_fzf.query import CompiledQuery
+
+
+def test_compiled_query():
+    q = CompiledQuery("Src Util")
+    assert q == "Src Util"
+    assert isinstance(q, str)
+    assert q.lowered == "src util"
+    assert q.words_with_index == [("src", 0), ("util", 4)]
+    assert q.mask == char_mask("srcutil")
+    assert len(q.plan) == 2
+    # cached values are reused by ScoringResult
+    sr = ScoringResult(q, "src/util.py")
+    assert sr.query_lower is q.lowered
+    assert sr.query_words_with_index is q.words_with_index
+    # the cached values are not pickled
+    copy = pickle.loads(pickle.dumps(q))
+    assert copy == q and isinstance(copy, CompiledQuery)
+    assert "lowered" not in vars(copy)
+
+
+def test_compiled_query_compile():
+    q = CompiledQuery("abc")
+    assert CompiledQuery.compile(q) is q
+    assert CompiledQuery.compile("xyz") is CompiledQuery.compile("xyz")
+
+
+def test_score_receives_compiled_query():
+    queries = set()
+
+    def score(query, candidate):
+        queries.add(query)
+        return ScoringResult(query, candidate)
+    fzf = FuzzyFinder(query="a", score=score)
+    fzf.all_items = ["apple", "banana"]
+    fzf.calculate_filtered()
+    assert len(queries) == 1
+    assert isinstance(queries.pop(), CompiledQuery)
@@ -0,0 +1,124 @@
+import pytest
+from curses_fzf import ScoringResult
+from curses_fzf.ranking import RESOLVED_CACHE_SIZE, BoundedMatches, Matches, RankedMatches, score_value
+
+
+def make_matches(scores):
+    matches = Matches()
+    for index, score in enumerate(scores):
+        matches.append(index, score)
+    return matches
+
+
+def resolve(index):
+    sr = ScoringResult("", f"item{index}")
+    sr.score = SCORES[index]
+    return f"item{index}", sr
+
+
+SCORES = [5, 9, 1, 9, 3, 5, 7, 2, 9, 4]
+ITEMS = [f"item{index}" for index in range(len(SCORES))]
+EXPECTED = ["item1", "item3", "item8", "item6", "item0", "item5", "item9", "item4", "item7", "item2"]
+
+
+def test_score_value():
+    sr = ScoringResult("", "")
+    sr.score = 42
+    assert score_value(sr) == 42
+    assert score_value(7) == 7
+
+
+def test_matches():
+    matches = make_matches([5, 9])
+    matches.extend(range(2, 5), 3)
+    assert list(matches) == [(0, 5), (1, 9), (2, 3), (3, 3), (4, 3)]
+    copy = matches.copy()
+    copy.append(5, 1)
+    assert len(matches) == 5
+    assert len(copy) == 6
+
+
+def test_rank_all():
+    ranked = RankedMatches(make_matches(SCORES), 0, resolve, ITEMS)
+    assert ranked.ranked_count == len(SCORES)
+    assert [x[0] for x in ranked] == EXPECTED
+    assert [x[1].score for x in ranked] == sorted(SCORES, reverse=True)
+    assert list(ranked.items()) == EXPECTED
+    assert list(RankedMatches(Matches(), 0, resolve, ITEMS)) == []
+
+
+def test_ranked_matches():
+    ranked = RankedMatches(make_matches(SCORES), 2, resolve, ITEMS)
+    assert ranked.ranked_count == 2
+    assert len(ranked) == 10
+    assert ranked
+    assert ranked[0][0] == "item1"
+    assert ranked[1][0] == "item3"
+    assert ranked.ranked_count == 2
+    # accessing past the ranked part extends the ranking
+    assert ranked[2][0] == "item8"
+    assert ranked.ranked_count == 4
+    assert ranked[-1][0] == "item2"
+    assert ranked.ranked_count == 10
+    assert [x[0] for x in ranked[1:3]] == ["item3", "item8"]
+    with pytest.raises(IndexError):
+        ranked[10]
+    # iterating ranks everything
+    ranked = RankedMatches(make_matches(SCORES), 1, resolve, ITEMS)
+    assert [x[0] for x in ranked] == EXPECTED
+    ranked = RankedMatches(make_matches(SCORES), 1, resolve, ITEMS)
+    assert list(ranked.items()) == EXPECTED
+    assert ranked.ranked_count == 10
+    assert ranked == RankedMatches(make_matches(SCORES), 0, resolve, ITEMS)
+    assert not RankedMatches(Matches(), 5, resolve, ITEMS)
+
+
+def test_ranked_matches_resolve():
+    resolved = []
+
+    def counting_resolve(index):
+        resolved.append(index)
+        return f"item{index}", index
+    count = RESOLVED_CACHE_SIZE + 10
+    ranked = RankedMatches(make_matches(range(count)), 0, counting_resolve, [f"item{i}" for i in range(count)])
+    assert resolved == []
+    assert ranked[0] == ranked[0] == (f"item{count - 1}", count - 1)
+    assert resolved == [count - 1]
+    # only the last accessed tuples are kept
+    assert len(list(ranked)) == count
+    resolved.clear()
+    ranked[0]
+    ranked[count - 1]
+    assert resolved == [count - 1]
+    # the items alone are taken from the item list, without resolving
+    resolved.clear()
+    assert list(ranked.items()) == [f"item{index}" for index in reversed(range(count))]
+    assert resolved == []
+
+
+def test_ranked_matches_equal_scores():
+    matches = Matches()
+    matches.extend(range(5), 100)
+    ranked = RankedMatches(matches, 2, resolve, ITEMS)
+    # already in ranking order, nothing to sort
+    assert ranked.ranked_count == 5
+    assert [x[0] for x in ranked] == ["item0", "item1", "item2", "item3", "item4"]
+    assert list(ranked.items()) == ["item0", "item1", "item2", "item3", "item4"]
+
+
+def test_bounded_matches():
+    bounded = BoundedMatches(4)
+    for index, score in enumerate(SCORES):
+        bounded.append(index, score)
+    assert bounded.truncated
+    matches = bounded.matches()
+    assert list(matches.indices) == [1, 3, 6, 8]
+    assert [x[0] for x in RankedMatches(matches, 0, resolve, ITEMS)] == EXPECTED[:4]
+    bounded = BoundedMatches(20)
+    for index, score in enumerate(SCORES):
+        bounded.append(index, score)
+    assert not bounded.truncated
+    assert list(bounded.matches().indices) == list(range(10))
+    bounded = BoundedMatches(2)
+    bounded.extend(range(5), 1)
+    assert list(bounded.matches()) == [(0, 1), (1, 1)]
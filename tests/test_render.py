@@ -0,0 +1,109 @@
+import curses
+from unittest.mock import MagicMock, patch, call
+from curses_fzf.fuzzyfinder import FuzzyFinder
+from curses_fzf.render import Frame, highlight_runs
+
+
+def test_frame_flush():
+    mock_stdscr = MagicMock(spec=curses.window)
+    mock_stdscr.getmaxyx.return_value = (10, 20)
+    first = Frame(mock_stdscr)
+    first.addstr(0, 2, "> ", 1)
+    first.vline(1, 0, "|", 2)
+    first.hline(3, 0, "-", 20)
+    assert first.getmaxyx() == (10, 20)
+    assert first.flush(None) == 4
+    mock_stdscr.erase.assert_called_once()
+    assert mock_stdscr.addstr.call_args_list == [call(0, 2, "> ", 1)]
+    assert mock_stdscr.addch.call_args_list == [call(1, 0, "|", 0), call(2, 0, "|", 0)]
+    mock_stdscr.hline.assert_called_once_with(3, 0, "-", 20)
+    mock_stdscr.noutrefresh.assert_called_once()
+    # only changed rows are rewritten, removed rows are cleared
+    mock_stdscr.reset_mock()
+    second = Frame(mock_stdscr)
+    second.addstr(0, 2, "> ", 2)
+    second.vline(1, 0, "|", 2)
+    assert second.flush(first) == 2
+    mock_stdscr.erase.assert_not_called()
+    assert mock_stdscr.move.call_args_list == [call(0, 0), call(3, 0)]
+    assert mock_stdscr.clrtoeol.call_count == 2
+    assert mock_stdscr.addstr.call_args_list == [call(0, 2, "> ", 2)]
+    mock_stdscr.addch.assert_not_called()
+    # a resize redraws everything
+    mock_stdscr.getmaxyx.return_value = (12, 20)
+    third = Frame(mock_stdscr)
+    third.addstr(0, 2, "> ", 2)
+    assert third.flush(second) == 1
+    mock_stdscr.erase.assert_called_once()
+
+
+def test_render_frame_rewrites_changed_rows():
+    fzf = FuzzyFinder()
+    fzf.all_items = ["item %d" % i for i in range(10)]
+    fzf.calculate_filtered()
+    fzf.stdscr = MagicMock(spec=curses.window)
+    fzf.stdscr.getmaxyx.return_value = (24, 80)
+    with patch("curses.color_pair", side_effect=lambda x: x), \
+            patch("curses.textpad"):
+        fzf._render_frame()
+        first = fzf._last_frame
+        fzf.stdscr.refresh.assert_called_once()
+        # moving the cursor touches the old and the new cursor row only
+        fzf.kb_move_items_cursor_relative(1)
+        fzf._render_frame()
+        assert fzf._last_frame is not first
+        assert fzf.stdscr.move.call_args_list[-2:] == [call(3, 0), call(4, 0)]
+        assert fzf.stdscr.erase.call_count == 1
+        # nothing changed, nothing is rewritten
+        fzf.stdscr.reset_mock()
+        fzf._render_frame()
+        fzf.stdscr.move.assert_not_called()
+        fzf.stdscr.addstr.assert_not_called()
+
+
+def test_render_frame_repaints_when_preview_toggles():
+    fzf = FuzzyFinder(preview=lambda window, theme, item, sr: f"preview of {item}")
+    fzf.all_items = ["item %d" % i for i in range(10)]
+    fzf.calculate_filtered()
+    fzf.stdscr = MagicMock(spec=curses.window)
+    fzf.stdscr.getmaxyx.return_value = (24, 80)
+    with patch("curses.color_pair", side_effect=lambda x: x), \
+            patch("curses.textpad"), \
+            patch("curses.newwin") as newwin:
+        newwin.return_value.getmaxyx.return_value = (20, 32)
+        fzf._render_frame()
+        assert fzf.stdscr.erase.call_count == 1
+        # hiding the preview repaints the cells it covered
+        fzf.kb_toggle_preview()
+        fzf._render_frame()
+        assert fzf.stdscr.erase.call_count == 2
+        fzf._render_frame()
+        assert fzf.stdscr.erase.call_count == 2
+        # and so does showing it again or resizing
+        fzf.kb_toggle_preview()
+        fzf._render_frame()
+        assert fzf.stdscr.erase.call_count == 3
+        fzf.stdscr.getmaxyx.return_value = (30, 100)
+        fzf._render_frame()
+        assert fzf.stdscr.erase.call_count == 4
+        fzf._render_frame()
+        assert fzf.stdscr.erase.call_count == 4
+
+
+def test_highlight_runs():
+    assert highlight_runs(0, []) == []
+    assert highlight_runs(5, []) == [(0, 5, False)]
+    assert highlight_runs(5, [(0, 5)]) == [(0, 5, True)]
+    assert highlight_runs(8, [(6, 1), (1, 2)]) == [
+        (0, 1, False), (1, 3, True), (3, 6, False), (6, 7, True), (7, 8, False)]
+    # adjacent and overlapping spans are merged, spans are clipped to the length
+    assert highlight_runs(6, [(1, 2), (3, 1), (2, 3)]) == [(0, 1, False), (1, 5, True), (5, 6, False)]
+    assert highlight_runs(4, [(2, 10), (8, 1)]) == [(0, 2, False), (2, 4, True)]
+
+
+def test_color_pairs_cached():
+    fzf = FuzzyFinder()
+    with patch("curses.color_pair", side_effect=lambda x: x * 256) as mock_color_pair:
+        assert fzf._color_pair(3) == 768
+        assert fzf._color_pair(3) == 768
+    mock_color_pair.assert_called_once_with(3)
@@ -1,5 +1,10 @@
+import random
+from itertools import combinations
+
 import pytest
-from curses_fzf import ScoringResult, scoring_fzf, scoring_full_words
+from curses_fzf import ScoringResult, scoring_extended, scoring_fzf, scoring_fzf_v2, scoring_full_words
+from curses_fzf import scoring
+from curses_fzf.query import CompiledQuery, _Term
 
 
 @pytest.fixture
@@ -116,6 +121,32 @@ def test_scoringresult_add_match(fox, banana):
     assert banana.matches == [(0, 6), (55, 2)]
 
 
+def test_scoringresult_lazy(fox):
+    assert not hasattr(fox, "__dict__")
+    assert fox._candidate_lower is None and fox._candidate_words_with_index is None
+    assert fox.candidate_words_with_index[1] == ("quick", 4)
+    fox.query_lower = "custom"
+    assert fox.query_lower == "custom"
+
+
+def test_scoringresult_add_span(henry):
+    henry.add_span(6, 2, 10)
+    henry.add_span(12, 4, 5)
+    assert henry.score == 15
+    assert henry.spans == [(6, 2), (12, 4)]
+    assert henry._matches is None
+    henry.add_match(20, "watch", 1)
+    assert henry.matches == [(6, "is"), (12, "home"), (20, "watch")]
+    assert henry.spans == [(6, 2), (12, 4), (20, 5)]
+    henry.spans = [(0, 5)]
+    assert henry.matches == [(0, "Henry")]
+
+
+def test_scoringresult_merge_positions_to_spans(fox):
+    assert fox.merge_positions_to_spans([]) == []
+    assert fox.merge_positions_to_spans([3, 4, 5, 10, 11, 20]) == [(3, 3), (10, 2), (20, 1)]
+
+
 def test_scoringresult_find_best_word_match(fox, henry):
     assert fox.find_best_word_match("bro") == ('brown', 10, 0, 60)
     # since "brown" already matched for "bro"
@@ -203,3 +234,134 @@ def test_scoring_fzf(henry, fox, banana, empty, greed):
     result = scoring_fzf(greed.query, greed.candidate)
     assert result.score == 35
     assert result.matches == [(2, 'n'), (13, 'o'), (21, 'w'), (23, 'tch')]
+
+
+def test_scoring_fzf_v2(henry, empty):
+    result = scoring_fzf_v2(henry.query, henry.candidate)
+    # the match on the word boundary wins over the first occurrence
+    assert result.matches == [(39, "me")]
+    assert scoring_fzf_v2("fb", "foo/bar").matches == [(0, "f"), (4, "b")]
+    assert scoring_fzf_v2("abc", "xaxbxc abc").matches == [(7, "abc")]
+    assert scoring_fzf_v2("abc", "xaxbxc abc") > scoring_fzf_v2("abc", "xaxbxc")
+    assert scoring_fzf_v2("cba", "abc").score == 0
+    assert scoring_fzf_v2(empty.query, empty.candidate).score == 100
+
+
+def test_scoring_fzf_v2_best_alignment():
+    rng = random.Random(3)
+    for _ in range(300):
+        candidate = "".join(rng.choice("abAB_ ") for _ in range(rng.randint(1, 9)))
+        query = "".join(rng.choice("ab") for _ in range(rng.randint(1, 3)))
+        result = scoring_fzf_v2(query, candidate)
+        sr = ScoringResult(query, candidate)
+        alignments = [positions for positions in combinations(range(len(candidate)), len(query))
+                      if all(sr.candidate_lower[p] == c for p, c in zip(positions, query))]
+        if not alignments:
+            assert result.score == 0
+            continue
+        best = max(scoring._path_score(sr, list(positions)) for positions in alignments)
+        assert result.score == max(1, best)
+        positions = [p for start, length in result.spans for p in range(start, start + length)]
+        assert scoring._path_score(sr, positions) == best
+
+
+def test_scoring_fzf_v2_length_cutoff(monkeypatch):
+    monkeypatch.setattr(scoring, "V2_MAX_CELLS", 10)
+    result = scoring_fzf_v2("abc", "xaxbxc abc")
+    # the greedy match is scored instead
+    assert result.matches == [(1, "a"), (3, "b"), (5, "c")]
+    assert result.score == scoring._path_score(result, [1, 3, 5])
+
+
+def test_scoring_extended_plan():
+    plan = CompiledQuery("src 'util ^tests !.pyc | !.pyo py$ ^").plan
+    assert [[(t.kind, t.text, t.inverse) for t in group] for group in plan] == [
+        [("exact", ".pyc", True), ("exact", ".pyo", True)],
+        [("exact", "util", False)],
+        [("prefix", "tests", False)],
+        [("suffix", "py", False)],
+        [("fuzzy", "src", False)],
+    ]
+    assert CompiledQuery("^Ab$ | 'c").plan == ((_Term("equal", "ab", False), _Term("exact", "c", False)),)
+    assert CompiledQuery(" ! ' ^ $ ").plan == ()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", ["src/util/strings.py", "tests/test_util.py", "src/util.pyc", "README.md"]),
+    ("utl", ["src/util/strings.py", "tests/test_util.py", "src/util.pyc"]),
+    ("'util", ["src/util/strings.py", "tests/test_util.py", "src/util.pyc"]),
+    ("'utl", []),
+    ("^src", ["src/util/strings.py", "src/util.pyc"]),
+    (".py$", ["src/util/strings.py", "tests/test_util.py"]),
+    ("^readme.md$", ["README.md"]),
+    ("util !.pyc", ["src/util/strings.py", "tests/test_util.py"]),
+    ("!^src !.md$", ["tests/test_util.py"]),
+    ("^tests | .md$", ["tests/test_util.py", "README.md"]),
+    ("str | rdm py", ["src/util/strings.py"]),
+])
+def test_scoring_extended(query, expected):
+    items = ["src/util/strings.py", "tests/test_util.py", "src/util.pyc", "README.md"]
+    assert [item for item in items if scoring_extended(query, item) > 0] == expected
+
+
+def test_scoring_extended_matches():
+    result = scoring_extended("'util ^src !tests", "src/util/strings.py")
+    assert sorted(result.matches) == [(0, "src"), (4, "util")]
+    # exact terms are scored like a single scoring_fzf match
+    assert scoring_extended("^src", "src/util/strings.py").score == scoring_fzf("src", "src/util/strings.py").score
+    assert scoring_extended("'util", "src/util/strings.py") > scoring_extended("'il", "src/util/strings.py")
+    assert scoring_extended("!tests", "src/util").score == 100
+    rejected = scoring_extended("src !util", "src/util/strings.py")
+    assert rejected.score == 0
+    assert rejected.matches == []
+
+
+def test_scoring_extended_refines():
+    refines = scoring_extended.refines
+    assert refines("src", "src util")
+    assert refines("'ut", "'util")
+    assert not refines("src", "sr")
+    assert not refines("src", "src !util")
+    assert not refines("src", "src | util")
+    assert not refines("py$", "py$x")
+
+
+@pytest.mark.parametrize("score", [scoring_fzf, scoring_full_words])
+def test_scoring_score_batch(score, henry, fox, banana):
+    candidates = [henry.candidate, fox.candidate, banana.candidate, "", "Fox, brown"]
+    for query in ["", "me", "fox bro", "BRO", "xyz"]:
+        results = list(score.score_batch(query, candidates))
+        expected = [score(query, candidate) for candidate in candidates]
+        assert [int(r) for r in results] == [int(r) for r in expected]
+        assert [r.matches for r in results if r > 0] == [r.matches for r in expected if r > 0]
+    # rejected candidates don't need a ScoringResult
+    assert list(score.score_batch("xyz", candidates)) == [0] * len(candidates)
+
+
+def test_scoring_fzf_rejected():
+    result = scoring_fzf("xyz", "Henry is at home")
+    assert result.score == 0
+    assert result._candidate_lower is None and result._matches is None and result._spans is None
+
+
+def test_scoring_refines():
+    assert scoring_fzf.refines("ab", "abc")
+    assert scoring_fzf.refines("ab", "aXb")
+    assert scoring_fzf.refines("AB", "xaby")
+    assert scoring_fzf.refines("", "a")
+    assert not scoring_fzf.refines("abc", "ab")
+    assert not scoring_fzf.refines("ab", "ba")
+    assert scoring_full_words.refines("ab", "abc")
+    assert scoring_full_words.refines("ab", "ab c")
+    assert not scoring_full_words.refines("ab cd", "abx cd")
+    assert not scoring_full_words.refines("abc", "ab")
+
+
+def test_scoring_full_words_long_word_refines():
+    # a 1 character match in a very long word rounds down to a tiny score,
+    # which must not reject the candidate, a refined query matches it again
+    candidate = "x" * 150 + "a"
+    assert scoring_full_words("a", candidate).score > 0
+    assert scoring_full_words("xa", candidate).score > 0
+    results = scoring_full_words.score_batch("a", [candidate, "b"])
+    assert [getattr(sr, "score", sr) > 0 for sr in results] == [True, False]
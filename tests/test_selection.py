@@ -0,0 +1,100 @@
+import pytest
+from collections.abc import MutableSequence
+from curses_fzf import FuzzyFinder, ScoringResult
+from curses_fzf.selection import Selection
+
+
+def test_selection():
+    selection = Selection(["b", "a", "b"])
+    assert selection == ["b", "a"]
+    assert len(selection) == 2
+    assert "a" in selection
+    assert "c" not in selection
+    assert selection[1] == "a"
+    assert selection[:1] == ["b"]
+    selection.append("c")
+    selection.remove("b")
+    assert selection == ["a", "c"]
+    with pytest.raises(ValueError):
+        selection.remove("b")
+    selection.discard("b")
+    assert selection.toggle("b") is True
+    assert selection.toggle("a") is False
+    assert selection == ("c", "b")
+    assert repr(selection) == "Selection(['c', 'b'])"
+    selection.clear()
+    assert selection == []
+
+
+def test_selection_list_methods():
+    selection = Selection(["a", "b", "c"])
+    assert isinstance(selection, MutableSequence)
+    selection.insert(0, "d")
+    selection.insert(1, "c")
+    assert selection == ["d", "a", "b", "c"]
+    assert selection.index("b") == 2
+    with pytest.raises(ValueError):
+        selection.index("b", 0, 2)
+    with pytest.raises(ValueError):
+        selection.index("x")
+    assert selection.count("a") == 1
+    assert selection.count("x") == 0
+    assert selection.pop() == "c"
+    assert selection.pop(0) == "d"
+    assert selection == ["a", "b"]
+    selection[0] = "e"
+    assert selection == ["e", "b"]
+    # assigning an already selected item keeps its first occurrence
+    selection[1] = "e"
+    assert selection == ["e"]
+    selection += ["z", "y", "x"]
+    selection.sort()
+    assert selection == ["e", "x", "y", "z"]
+    selection.sort(key=lambda item: item == "y", reverse=True)
+    assert selection == ["y", "e", "x", "z"]
+    selection.reverse()
+    assert selection == ["z", "x", "e", "y"]
+    assert list(reversed(selection)) == ["y", "e", "x", "z"]
+    del selection[1:3]
+    assert selection == ["z", "y"]
+    assert "x" not in selection
+    assert selection + ["a"] == ["z", "y", "a"]
+    copy = selection.copy()
+    copy.append("a")
+    assert selection == ["z", "y"]
+    with pytest.raises(IndexError):
+        Selection().pop()
+    with pytest.raises(IndexError):
+        selection.pop(5)
+
+
+def test_selection_unhashable_items():
+    apple, banana = {"name": "apple"}, {"name": "banana"}
+    selection = Selection([apple, banana])
+    assert apple in selection
+    # unhashable items are identified by identity
+    assert {"name": "apple"} not in selection
+    selection.remove(apple)
+    assert selection == [banana]
+    # or by a key function
+    selection = Selection([apple], key=lambda item: item["name"])
+    assert {"name": "apple"} in selection
+    selection.append({"name": "apple"})
+    assert len(selection) == 1
+
+
+def test_fuzzyfinder_selection_key():
+    sr = ScoringResult("", "")
+    items = [{"id": i} for i in range(5)]
+    fzf = FuzzyFinder(multi=True, key=lambda item: item["id"])
+    fzf.filtered = [(item, sr) for item in items]
+    fzf.selected = [{"id": 3}]
+    assert isinstance(fzf.selected, Selection)
+    fzf.kb_select_all()
+    assert fzf.selected == [{"id": 3}, items[0], items[1], items[2], items[4]]
+    fzf.kb_move_items_cursor_absolute(3)
+    fzf.kb_toggle_selection()
+    assert items[3] not in fzf.selected
+    assert fzf._get_return_value() == [items[0], items[1], items[2], items[4]]
+    fzf.kb_deselect_all()
+    assert fzf.selected == []
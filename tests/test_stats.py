@@ -0,0 +1,69 @@
+import curses
+from unittest.mock import MagicMock, patch
+from curses_fzf import FuzzyFinder, ScoringEngine
+from curses_fzf.candidates import CandidateIndex
+from curses_fzf.scoring import scoring_fzf
+from curses_fzf.stats import FrameStats, Stats
+
+
+def test_stats():
+    frame = FrameStats()
+    frame.input, frame.filter, frame.render, frame.preview = 0.001, 0.01, 0.002, 0.003
+    frame.display = 0.005
+    frame.items_scored = 10
+    assert abs(frame.total - 0.016) < 1e-9
+    stats = Stats()
+    stats.record(frame)
+    stats.record(frame)
+    assert stats.frames == 2
+    assert stats.last is frame
+    assert stats.totals.items_scored == 20
+    assert abs(stats.max_frame - 0.016) < 1e-9
+    assert "items_scored=10" in repr(frame)
+    stats.reset()
+    assert stats.frames == 0
+    assert stats.last is None
+    assert stats.totals.items_scored == 0
+
+
+def test_engine_counters():
+    engine = ScoringEngine()
+    items = ["apple", "banana", "cherry"]
+    candidates = CandidateIndex(items, str)
+    assert [index for index, _ in engine.score(scoring_fzf, "an", candidates, range(3))] == [1]
+    assert (engine.scored, engine.rejected) == (1, 2)
+    # without prefiltering all candidates are scored
+    list(engine.score(lambda query, candidate: scoring_fzf(query, candidate), "an", candidates, [0, 2]))
+    assert (engine.scored, engine.rejected) == (3, 2)
+
+
+def test_main_loop_stats():
+    frames = []
+    fzf = FuzzyFinder(on_frame=frames.append, show_stats=True)
+    mock_stdscr = MagicMock(spec=curses.window)
+    mock_stdscr.get_wch.side_effect = ["a", curses.error("no input"), "\n", curses.error("no input")]
+    footers = []
+
+    def base_window(stdscr, title, footer, color_theme):
+        footers.append(footer)
+        return (24, 80)
+    with patch("curses.wrapper", side_effect=lambda f: f(mock_stdscr)), \
+            patch("curses_fzf.fuzzyfinder._init_curses"), \
+            patch("curses_fzf.fuzzyfinder._base_window", side_effect=base_window), \
+            patch("curses.color_pair", side_effect=lambda x: x):
+        assert fzf.find(["apple", "banana", "cherry"]) == ["apple"]
+    assert fzf.stats.frames == len(frames) == 2
+    assert fzf.stats.last is frames[-1]
+    # all items match the empty query without scoring, "a" scores them
+    assert frames[0].items_scored == 0
+    assert frames[1].items_scored + frames[1].prefilter_rejected == 3
+    assert frames[1].prefilter_rejected == 1
+    assert frames[1].input > 0
+    assert all(frame.filter > 0 and frame.render > 0 and frame.rows_rewritten > 0 for frame in frames)
+    # the footer shows the latency of the last frame
+    assert footers[0].startswith("0 selected")
+    assert footers[1].startswith(f"{frames[0].total * 1000:.1f}ms | ")
+    # stats are reset by find
+    with patch("curses.wrapper"):
+        fzf.find(["x"])
+    assert fzf.stats.frames == 0
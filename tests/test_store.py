@@ -0,0 +1,56 @@
+import io
+import mmap
+import pytest
+from curses_fzf.store import LineStore, StringStore
+
+
+def test_line_store():
+    store = LineStore(b"apple\nbanana\r\n\ngr\xffpe")
+    assert len(store) == 4
+    assert list(store) == ["apple", "banana", "", "gr�pe"]
+    assert store[-1] == "gr�pe"
+    assert store[1:3] == ["banana", ""]
+    with pytest.raises(IndexError):
+        store[4]
+    assert len(LineStore(b"")) == 0
+    assert list(LineStore(b"a\n")) == ["a"]
+    assert list(LineStore(b"\n\n")) == ["", ""]
+    assert repr(store) == "LineStore(4 lines)"
+
+
+def test_line_store_from_file(tmp_path):
+    path = tmp_path / "items.txt"
+    path.write_bytes(b"one\ntwo\nthree\n")
+    with open(path, "rb") as file:
+        store = LineStore.from_file(file)
+    assert isinstance(store._data, mmap.mmap)
+    with store:
+        assert list(store) == ["one", "two", "three"]
+    assert store._data.closed
+    # empty files can't be mapped
+    path.write_bytes(b"")
+    with open(path, "rb") as file:
+        assert len(LineStore.from_file(file)) == 0
+    # pipes and other streams are read
+    store = LineStore.from_file(io.BytesIO(b"x\ny"))
+    assert isinstance(store._data, bytes)
+    assert list(store) == ["x", "y"]
+
+
+def test_string_store():
+    items = ["apple", "", "grüße", "\udcff", "🍎"]
+    store = StringStore(items)
+    assert len(store) == 5
+    assert list(store) == items
+    assert store[-1] == "🍎"
+    assert store[1:3] == ["", "grüße"]
+    with pytest.raises(IndexError):
+        store[5]
+    store.append("banana")
+    assert store[5] == "banana"
+    assert len(store._data) == sum(len(item.encode("utf-8", "surrogatepass")) for item in store)
+    assert repr(store) == "StringStore(6 items)"
+    # fixed width
+    store = StringStore(items, encoding="utf-32-le")
+    assert list(store) == items
+    assert len(store._data) == 4 * sum(len(item) for item in items)